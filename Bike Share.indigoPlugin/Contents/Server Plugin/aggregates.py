@@ -0,0 +1,144 @@
+"""
+System-wide aggregate statistics
+
+The aggregates.py module computes system-level numbers (total bikes and e-bikes available, the share of stations that
+are empty or full, the disabled dock ratio and per-region totals) once per `station_status` download. The station
+index is converted to column arrays and the statistics are computed from the columns in a single pass. NumPy is used
+when it's installed; otherwise the columns are held in `array` objects and reduced with built-ins.
+"""
+
+# ================================== IMPORTS ==================================
+
+# Built-in modules
+from array import array
+from typing import Optional
+
+# Third-party modules
+try:
+    import numpy as np  # NumPy is optional; the plugin falls back to `array` when it isn't installed.
+except ImportError:
+    np = None
+
+COUNT_COLUMNS = {
+    'bikes': 'num_bikes_available',
+    'ebikes': 'num_ebikes_available',
+    'docks': 'num_docks_available',
+    'bikes_disabled': 'num_bikes_disabled',
+    'docks_disabled': 'num_docks_disabled',
+}
+
+
+# =============================================================================
+def _count(value) -> int:
+    """Coerce a feed count to int (missing or malformed values count as 0)."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+# =============================================================================
+def region_names(system_data: dict) -> dict:
+    """Return the region names published in the `system_regions` feed.
+
+    Args:
+        system_data (dict): The downloaded feeds keyed by feed name.
+
+    Returns:
+        dict: A dict of {region_id: region name}.
+    """
+    try:
+        regions = system_data['system_regions']['data']['regions']
+    except (KeyError, TypeError):
+        return {}
+    return {str(region['region_id']): str(region.get('name', region['region_id'])) for region in regions}
+
+
+# =============================================================================
+def station_columns(status: dict, info: dict) -> tuple[dict, list]:
+    """Convert the station index into column arrays.
+
+    Each column is filled straight from the station records (`np.fromiter()` or `array()` over a generator), without
+    building an intermediate list per column. The records are Python objects, so reading their fields is still one
+    Python-level pass per column.
+
+    Args:
+        status (dict): The `station_status` index ({station_id: status dict}).
+        info (dict): The `station_information` index ({station_id: info dict}).
+
+    Returns:
+        tuple: ({column name: array}, [region id for each row]).
+    """
+    stations = list(status.values())
+    regions  = [str((info.get(station_id) or {}).get('region_id') or "") for station_id in status]
+    if np is not None:
+        columns = {
+            name: np.fromiter((_count(station.get(key)) for station in stations), dtype=np.int64, count=len(stations))
+            for name, key in COUNT_COLUMNS.items()
+        }
+    else:
+        columns = {
+            name: array('q', (_count(station.get(key)) for station in stations)) for name, key in COUNT_COLUMNS.items()
+        }
+    return columns, regions
+
+
+# =============================================================================
+def compute_system_stats(status: dict, info: dict, names: Optional[dict] = None) -> dict:
+    """Compute system-wide statistics from the station indexes.
+
+    Args:
+        status (dict): The `station_status` index ({station_id: status dict}).
+        info (dict): The `station_information` index ({station_id: info dict}).
+        names (dict): Region names keyed by region id (from `region_names()`).
+
+    Returns:
+        dict: The system statistics. `regions` maps each region id to its display name, station count and bike/dock
+              totals (stations without a region are totalled under the id "").
+    """
+    names = names or {}
+    columns, regions = station_columns(status, info)
+    count = len(regions)
+
+    if np is not None:
+        totals = {name: int(column.sum()) for name, column in columns.items()}
+        empty  = int(np.count_nonzero(columns['bikes'] == 0))
+        full   = int(np.count_nonzero(columns['docks'] == 0))
+
+        region_totals = {}
+        if any(regions):
+            keys, index = np.unique(np.asarray(regions), return_inverse=True)
+            bikes    = np.bincount(index, weights=columns['bikes'], minlength=len(keys))
+            docks    = np.bincount(index, weights=columns['docks'], minlength=len(keys))
+            stations = np.bincount(index, minlength=len(keys))
+            for i, key in enumerate(keys):
+                region_totals[str(key)] = (int(stations[i]), int(bikes[i]), int(docks[i]))
+    else:
+        totals = {name: sum(column) for name, column in columns.items()}
+        empty  = columns['bikes'].tolist().count(0)
+        full   = columns['docks'].tolist().count(0)
+
+        region_totals = {}
+        if any(regions):
+            for key, bikes, docks in zip(regions, columns['bikes'], columns['docks']):
+                stations_, bikes_, docks_ = region_totals.get(key, (0, 0, 0))
+                region_totals[key] = (stations_ + 1, bikes_ + bikes, docks_ + docks)
+
+    all_docks = totals['docks'] + totals['docks_disabled']
+    return {
+        'station_count': count,
+        'total_bikes': totals['bikes'],
+        'total_ebikes': totals['ebikes'],
+        'total_docks': totals['docks'],
+        'total_bikes_disabled': totals['bikes_disabled'],
+        'total_docks_disabled': totals['docks_disabled'],
+        'stations_empty_pct': round(100 * empty / count, 1) if count else 0.0,
+        'stations_full_pct': round(100 * full / count, 1) if count else 0.0,
+        'disabled_dock_ratio': round(totals['docks_disabled'] / all_docks, 3) if all_docks else 0.0,
+        'regions': {
+            key: {'name': names.get(key, key or "Unassigned"), 'stations': stations, 'bikes': bikes, 'docks': docks}
+            for key, (stations, bikes, docks) in sorted(
+                region_totals.items(), key=lambda item: (names.get(item[0], item[0]), item[0])
+            )
+        },
+    }
@@ -0,0 +1,174 @@
+"""
+GBFS system catalogue cache
+
+The catalogue.py module maintains the list of bike sharing systems published by NABSA (`systems.csv`). The sorted
+list is kept in memory and persisted to disk so that the plugin configuration dialog can be populated instantly,
+including when the network is unavailable. Once the cached copy is older than its TTL, it's still served immediately
+and a background thread revalidates it (using the `ETag` from the previous download where possible).
+"""
+
+# ================================== IMPORTS ==================================
+
+# Built-in modules
+import csv
+import json
+import logging
+import os
+import threading
+import time
+from typing import Optional
+from urllib.parse import quote
+
+# Third-party modules
+import httpx  # httpx is automatically installed by the Indigo installer
+
+# My modules
+from constants import GBFS_SYSTEMS_CSV_URL  # noqa
+
+
+# =============================================================================
+def parse_systems_csv(text: str) -> list[tuple[str, str]]:
+    """Convert the NABSA `systems.csv` file into a sorted list of systems.
+
+    Args:
+        text (str): The decoded CSV file.
+
+    Returns:
+        list: A sorted list of (url, name) tuples for each available system.
+    """
+    # convert the DictReader object to a list because DictReader objects are not subscriptable.
+    new_dict = list(csv.DictReader(text.splitlines()))
+
+    # construct the combined name for a dropdown list.
+    for system in new_dict:
+        name = system['Name'].lstrip(' ')
+        loc  = system['Location']
+        system["Combined Name"] = f"{name} ({loc})"
+
+    # convert iterator into list and collapse any spaces in the URL field.
+    list_li = [(_["Auto-Discovery URL"].replace(" ", ""), _["Combined Name"]) for _ in new_dict]
+    list_li = [(quote(k, safe="%:/"), v) for (k, v) in list_li]
+
+    return sorted(list_li, key=lambda tup: tup[1].lower())
+
+
+# =============================================================================
+class SystemCatalogue:
+    """In-memory and on-disk cache of the available bike sharing systems."""
+    def __init__(self, fetcher, file_path: str, ttl: float, logger: Optional[logging.Logger] = None):
+        """Catalogue initialization.
+
+        Args:
+            fetcher (feeds.FeedFetcher): The fetcher that owns the shared HTTP client.
+            file_path (str): The path of the on-disk cache file.
+            ttl (float): The number of seconds before the cached list is revalidated.
+            logger (logging.Logger): The plugin logger.
+        """
+        self.fetcher   = fetcher
+        self.file_path = file_path
+        self.ttl       = ttl
+        self.logger    = logger or logging.getLogger("Plugin")
+
+        self.entries: list = []
+        self.etag: Optional[str] = None
+        self.fetched_at = 0.0
+
+        self._lock = threading.Lock()
+        self._refresh_thread: Optional[threading.Thread] = None
+
+    # =============================================================================
+    def load(self) -> bool:
+        """Load the catalogue from disk.
+
+        Returns:
+            bool: True if a cached catalogue was loaded.
+        """
+        try:
+            with open(self.file_path, 'r', encoding="utf-8") as in_file:
+                cached = json.load(in_file)
+            with self._lock:
+                self.entries    = [tuple(entry) for entry in cached['systems']]
+                self.etag       = cached.get('etag')
+                self.fetched_at = float(cached.get('fetched_at', 0))
+            return bool(self.entries)
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError, KeyError, TypeError):
+            self.logger.warning("Unable to read the cached system list. It will be downloaded again.")
+            return False
+
+    # =============================================================================
+    def save(self) -> None:
+        """Write the catalogue to disk."""
+        with self._lock:
+            cached = {'fetched_at': self.fetched_at, 'etag': self.etag, 'systems': self.entries}
+        try:
+            temp_path = f"{self.file_path}.tmp"
+            with open(temp_path, 'w', encoding="utf-8") as out_file:
+                json.dump(cached, out_file)
+            os.replace(temp_path, self.file_path)
+        except OSError:
+            self.logger.warning("Unable to save the system list to %s." % self.file_path)
+
+    # =============================================================================
+    def is_stale(self) -> bool:
+        """Return True if the cached catalogue is older than its TTL."""
+        return time.time() - self.fetched_at > self.ttl
+
+    # =============================================================================
+    def refresh(self) -> bool:
+        """Download (or revalidate) the catalogue and save it to disk.
+
+        Returns:
+            bool: True if the catalogue is current.
+        """
+        try:
+            headers = {'If-None-Match': self.etag} if self.etag and self.entries else {}
+            response = self.fetcher.get(GBFS_SYSTEMS_CSV_URL, headers=headers)
+            if response.status_code == httpx.codes.NOT_MODIFIED:
+                with self._lock:
+                    self.fetched_at = time.time()
+                self.logger.debug("System list unchanged.")
+            else:
+                entries = parse_systems_csv(response.content.decode("utf-8"))
+                with self._lock:
+                    self.entries    = entries
+                    self.etag       = response.headers.get('ETag')
+                    self.fetched_at = time.time()
+                self.logger.debug("%s bike sharing systems available." % len(entries))
+            self.save()
+            return True
+
+        except (httpx.HTTPError, ValueError, KeyError) as err:
+            self.logger.warning("Unable to update the system list (%s). Will try again later." % err)
+            return False
+
+    # =============================================================================
+    def refresh_in_background(self) -> None:
+        """Revalidate the catalogue on a background thread (if a revalidation isn't already running)."""
+        with self._lock:
+            if self._refresh_thread and self._refresh_thread.is_alive():
+                return
+            self._refresh_thread = threading.Thread(target=self.refresh, name="bikeshare-catalogue", daemon=True)
+            self._refresh_thread.start()
+
+    # =============================================================================
+    def systems(self) -> list[tuple[str, str]]:
+        """Return the sorted list of available systems.
+
+        Serves the cached catalogue immediately when one is available (revalidating it in the background if it's
+        stale). The catalogue is only downloaded in the foreground if nothing has ever been cached.
+
+        Returns:
+            list: A sorted list of (url, name) tuples.
+        """
+        if not self.entries:
+            self.load()
+
+        if not self.entries:
+            self.refresh()
+        elif self.is_stale():
+            self.refresh_in_background()
+
+        with self._lock:
+            return list(self.entries)
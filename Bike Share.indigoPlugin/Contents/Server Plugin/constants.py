@@ -18,6 +18,63 @@ DEBUG_LABELS = {
     50: "Critical Errors Only"
 }
 
+CIRCUIT_COOLDOWN     = 60  # Seconds requests to a failing host are paused after the circuit breaker opens.
+CIRCUIT_FAILURE_THRESHOLD = 5  # Consecutive failed requests to a host before its circuit breaker opens.
+CIRCUIT_MAX_COOLDOWN = 1800  # The cooldown doubles each time a host fails again after a pause, up to this limit.
+DEFAULT_SYSTEM       = "default"  # Device `bikeSystem` value for "use the system selected in the plugin config".
+DUMP_KEEP_FILES      = 10  # Maximum number of data dumps kept in the plugin's log folder.
+DUMP_MAX_BYTES       = 100 * 1024 * 1024  # Maximum total size of the data dumps kept (the newest is always kept).
+FEED_MAX_TTL         = 86400  # Upper bound (in seconds) on the TTL honored for any single feed.
+FEED_MAX_WORKERS     = 6  # Maximum number of GBFS feeds downloaded at the same time.
+FEED_MIN_POLL_INTERVAL = 30  # Shortest wait (in seconds) between polls when following the `station_status` TTL.
+FEED_PROJECTIONS     = {  # {feed: (record list key, fields kept)}. Projected feeds keep only these fields.
+    'station_information': ('stations', ('station_id', 'name', 'lat', 'lon', 'capacity', 'region_id')),
+    'station_status': ('stations', (
+        'station_id', 'is_installed', 'is_renting', 'is_returning', 'last_reported', 'num_bikes_available',
+        'num_bikes_disabled', 'num_docks_available', 'num_docks_disabled', 'num_ebikes_available',
+    )),
+    'system_regions': ('regions', ('region_id', 'name')),
+    'free_bike_status': ('bikes', (  # GBFS v2 name for `vehicle_status`.
+        'bike_id', 'lat', 'lon', 'is_reserved', 'is_disabled', 'station_id', 'vehicle_type_id', 'current_range_meters',
+        'current_fuel_percent',
+    )),
+    'vehicle_status': ('vehicles', (
+        'vehicle_id', 'lat', 'lon', 'is_reserved', 'is_disabled', 'station_id', 'vehicle_type_id', 'current_range_meters',
+        'current_fuel_percent',
+    )),
+    'vehicle_types': ('vehicle_types', ('vehicle_type_id', 'form_factor', 'propulsion_type', 'max_range_meters')),
+}
+FEED_REGISTRY = {  # {feature: feeds the feature needs}. Device type IDs are features while a device of the type exists.
+    # 'vehicles' is enabled while a Bike Share Station device has vehicle states turned on.
+    'station_menus': ('station_information',),
+    'history': ('station_status',),
+    'triggers': ('station_information', 'station_status'),
+    'shareDock': ('station_information', 'station_status'),
+    'stationArea': ('station_information', 'station_status'),
+    'systemSummary': ('station_information', 'station_status', 'system_regions'),
+    'vehicles': ('station_information', 'free_bike_status', 'vehicle_status', 'vehicle_types'),
+}
+FEED_RETRIES         = 2  # Retries for a request that fails with a transient error.
 GBFS_SYSTEMS_CSV_URL = "https://raw.githubusercontent.com/NABSA/gbfs/master/systems.csv"
+HISTORY_DOWNSAMPLE_AGE = 7 * 86400  # History older than this (in seconds) is kept at hourly resolution.
+HISTORY_PRUNE_INTERVAL = 3600       # Minimum time (in seconds) between history retention passes.
+HTTP_KEEPALIVE_EXPIRY          = 120  # Seconds an idle pooled connection is kept for reuse.
+HTTP_MAX_CONNECTIONS           = 10
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 6
+HTTP_RETRY_BACKOFF  = 0.5  # Base delay (in seconds) for jittered exponential backoff between retries.
+HTTP_RETRY_STATUS   = (429, 500, 502, 503, 504)  # Response codes treated as transient failures.
 HTTP_TIMEOUT        = 10
+LATENCY_SAMPLES     = 100  # Number of recent request latencies kept for the HTTP client stats.
+MENU_SYSTEM_HOLD    = 600  # Seconds a system loaded for a dialog's station menu is kept while no device uses it.
+PROFILE_STATS_LINES = 60  # Number of functions listed in the Profile Refresh report.
+REFRESH_MAX_DELAY    = 10  # Longest (in seconds) a refresh request is held while more requests keep arriving.
+REFRESH_MERGE_WINDOW = 2  # Refresh requests arriving within this many seconds of each other share one download.
+SNAPSHOT_FEEDS      = ('station_information', 'station_status', 'system_regions')  # Feeds kept in the warm-start snapshot.
+SPATIAL_CELL_SIZE   = 500  # Approximate edge length (in meters) of the spatial index grid cells.
+STATION_MENU_NEAREST = 25  # Number of stations listed when the station menu is limited to those near a point.
+SYSTEM_MAX_WORKERS  = 4  # Maximum number of bike sharing systems refreshed at the same time.
 TIMESTAMP_FORMAT    = "%Y-%m-%d %H:%M:%S"
+TIMING_SAMPLES      = 50  # Number of recent timings kept for each refresh phase.
+VEHICLE_MIN_RANGE   = 5000  # Remaining range (in meters) an e-bike needs to be counted as range-qualified.
+VEHICLE_NEARBY_RADIUS = 250  # Dockless vehicles within this many meters of a station are counted as nearby.
+WAKE_CHECK_INTERVAL = 60  # Longest single sleep (in seconds) before the concurrent thread checks for new prefs.
@@ -0,0 +1,136 @@
+"""
+Refresh coordinator
+
+The coordinator.py module serializes data refreshes. Refresh requests can come from device starts, the plugin config
+dialog, the Refresh action, the Refresh Data Now menu item and the concurrent thread. Rather than each caller
+downloading the data itself, requests are queued and requests that arrive close together are merged into a single
+refresh that runs on the coordinator's worker thread. Only one refresh runs at a time.
+"""
+
+# ================================== IMPORTS ==================================
+
+# Built-in modules
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+# My modules
+from constants import REFRESH_MAX_DELAY, REFRESH_MERGE_WINDOW  # noqa
+
+
+# =============================================================================
+class RefreshCoordinator:
+    """Queue, merge and run refresh requests on a single worker thread.
+
+    Pending requests are merged into one batch: `all_devices` is True if any request asked for every device,
+    `device_ids` is the union of the specific devices requested and `force` is True if any request was forced. The
+    batch is passed to the refresh callable as keyword arguments. `running` is held while a batch runs; code that
+    refreshes outside the coordinator (e.g., a profiled refresh) holds it to avoid overlapping a batch.
+    """
+    def __init__(self, refresh: Callable[..., None], window: float = REFRESH_MERGE_WINDOW,
+                 max_delay: float = REFRESH_MAX_DELAY, logger: Optional[logging.Logger] = None):
+        """Coordinator initialization.
+
+        Args:
+            refresh (callable): Called as `refresh(all_devices=bool, device_ids=set, force=bool)` for each batch.
+            window (float): A batch runs once no new request has arrived for this many seconds.
+            max_delay (float): The longest (in seconds) a request is held while more requests keep arriving.
+            logger (logging.Logger): The plugin logger.
+        """
+        self.refresh   = refresh
+        self.window    = window
+        self.max_delay = max_delay
+        self.logger    = logger or logging.getLogger("Plugin")
+        self.batches   = 0
+        self.requests  = 0
+        self.running   = threading.Lock()
+
+        self._cond = threading.Condition()
+        self._pending: Optional[dict] = None
+        self._first_request = 0.0
+        self._last_request  = 0.0
+        self._queued_batch  = 1  # The number of the batch that new requests join.
+        self._done_batch    = 0  # The number of the last batch that finished.
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+
+    # =============================================================================
+    def start(self) -> None:
+        """Start the worker thread."""
+        with self._cond:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stopped = False
+            self._thread  = threading.Thread(target=self._run, name="bikeshare-refresh", daemon=True)
+            self._thread.start()
+
+    # =============================================================================
+    def stop(self) -> None:
+        """Stop the worker thread (a refresh that's already running is allowed to finish)."""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+    # =============================================================================
+    def request(self, device_ids: Optional[set] = None, force: bool = False, wait: bool = False) -> None:
+        """Queue a refresh.
+
+        Args:
+            device_ids (set): The IDs of specific devices to refresh. If None, all devices are refreshed.
+            force (bool): If True, download every feed and update devices regardless of the download interval.
+            wait (bool): If True, block until the refresh that includes this request has finished.
+        """
+        with self._cond:
+            now = time.monotonic()
+            if self._pending is None:
+                self._pending = {'all_devices': False, 'device_ids': set(), 'force': False}
+                self._first_request = now
+            self._last_request = now
+            if device_ids is None:
+                self._pending['all_devices'] = True
+            else:
+                self._pending['device_ids'].update(device_ids)
+            self._pending['force'] = self._pending['force'] or force
+            self.requests += 1
+
+            batch = self._queued_batch
+            self._cond.notify_all()
+            if wait:
+                while self._done_batch < batch and not self._stopped:
+                    self._cond.wait(1)
+
+    # =============================================================================
+    def _run(self) -> None:
+        """Worker thread: wait for requests, let them settle, then run them as one batch."""
+        while True:
+            with self._cond:
+                while self._pending is None and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+
+                # Hold the batch open until requests stop arriving (or it's been held for `max_delay`).
+                while not self._stopped:
+                    deadline  = min(self._last_request + self.window, self._first_request + self.max_delay)
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if self._stopped:
+                    return
+
+                pending, self._pending = self._pending, None
+                batch = self._queued_batch
+                self._queued_batch += 1
+
+            try:
+                with self.running:
+                    self.refresh(**pending)
+            except Exception:  # noqa
+                self.logger.exception("There was a problem refreshing the data. Will try on next cycle.")
+
+            with self._cond:
+                self.batches += 1
+                self._done_batch = batch
+                self._cond.notify_all()
@@ -0,0 +1,138 @@
+"""
+Data dumps
+
+The dump.py module writes the plugin's current data to gzip-compressed NDJSON files (one JSON object per line) for
+troubleshooting. Lines are encoded and compressed as they're written, so a dump never holds more than one record in
+memory as text. Each dump starts with a `header` line and has one `system` line per system in use. A full dump then has
+a `feed` line per feed (the feed's metadata and any non-list data) and a `record` line per record in the feed's lists
+(e.g., each station in `station_status`). A stations-only dump has a `station` line per station instead, with the
+station's information and status merged. Old dumps are removed so that at most `DUMP_KEEP_FILES` dumps using at most
+`DUMP_MAX_BYTES` are kept.
+"""
+
+# ================================== IMPORTS ==================================
+
+# Built-in modules
+import glob
+import gzip
+import json
+import logging
+import os
+from typing import Optional
+
+# My modules
+from constants import DUMP_KEEP_FILES, DUMP_MAX_BYTES  # noqa
+from records import json_default  # noqa
+from stations import StationView  # noqa
+
+DUMP_SUFFIX = ".ndjson.gz"
+
+
+# =============================================================================
+def dump_lines(systems: list, stations_only: bool = False, header: Optional[dict] = None):
+    """Generate the lines of a dump.
+
+    Each system's indexes and data set are read once up front. A refresh replaces them rather than changing them, so a
+    dump written alongside a refresh is consistent for each system.
+
+    Args:
+        systems (list): The systems to dump (`systems.BikeSystem`).
+        stations_only (bool): If True, write merged station lines instead of the feeds.
+        header (dict): Extra fields for the header line.
+
+    Yields:
+        dict: One object per line.
+    """
+    yield {'type': "header", 'stations_only': stations_only, **(header or {})}
+
+    for system in systems:
+        system_data, info, status = system.system_data, system.stations.info, system.stations.status
+        yield {
+            'type': "system",
+            'system': system.source,
+            'stale': system.data_stale,
+            'feeds': sorted(system_data),
+            'stats': system.system_stats,
+        }
+
+        if stations_only:
+            for station_id in sorted(info.keys() | status.keys()):
+                yield {'type': "station", 'system': system.source,
+                       **StationView(info.get(station_id), status.get(station_id)).as_dict()}
+            continue
+
+        for feed, payload in system_data.items():
+            payload = payload if isinstance(payload, dict) else {'data': payload}
+            data    = payload.get('data')
+            lists   = {}
+            if isinstance(data, dict):
+                lists = {key: value for key, value in data.items() if isinstance(value, list)}
+            line    = {key: value for key, value in payload.items() if key != 'data'}
+            line['data']    = {key: value for key, value in data.items() if key not in lists} if lists else data
+            line['records'] = {key: len(value) for key, value in lists.items()}
+            yield {'type': "feed", 'system': system.source, 'feed': feed, **line}
+
+            for key, records in lists.items():
+                for record in records:
+                    yield {'type': "record", 'system': system.source, 'feed': feed, 'list': key, 'record': record}
+
+
+# =============================================================================
+def write_dump(file_path: str, systems: list, stations_only: bool = False, header: Optional[dict] = None) -> int:
+    """Write a dump file.
+
+    The dump is written to a temporary file that replaces `file_path` once it's complete.
+
+    Args:
+        file_path (str): The path of the dump file (ending in `.ndjson.gz`).
+        systems (list): The systems to dump (`systems.BikeSystem`).
+        stations_only (bool): If True, write merged station lines instead of the feeds.
+        header (dict): Extra fields for the header line.
+
+    Returns:
+        int: The number of lines written.
+    """
+    temp_path = f"{file_path}.tmp"
+    lines = 0
+    try:
+        with gzip.open(temp_path, 'wt', encoding="utf-8", compresslevel=5) as out_file:
+            for line in dump_lines(systems, stations_only=stations_only, header=header):
+                out_file.write(json.dumps(line, separators=(',', ':'), default=json_default))
+                out_file.write("\n")
+                lines += 1
+        os.replace(temp_path, file_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return lines
+
+
+# =============================================================================
+def rotate_dumps(folder: str, keep: int = DUMP_KEEP_FILES, max_bytes: int = DUMP_MAX_BYTES,
+                 logger: Optional[logging.Logger] = None) -> list:
+    """Remove the oldest dumps so that at most `keep` dumps using at most `max_bytes` remain.
+
+    The newest dump is always kept.
+
+    Args:
+        folder (str): The folder the dumps are written to.
+        keep (int): The maximum number of dumps kept.
+        max_bytes (int): The maximum total size (in bytes) of the dumps kept.
+        logger (logging.Logger): The plugin logger.
+
+    Returns:
+        list: The paths of the dumps removed.
+    """
+    logger = logger or logging.getLogger("Plugin")
+    dumps  = sorted(glob.glob(os.path.join(glob.escape(folder), f"*{DUMP_SUFFIX}")), key=os.path.getmtime, reverse=True)
+
+    removed, total = [], 0
+    for index, path in enumerate(dumps):
+        total += os.path.getsize(path)
+        if index and (index >= keep or total > max_bytes):
+            try:
+                os.remove(path)
+                removed.append(path)
+            except OSError:
+                logger.warning("Unable to remove old data dump %s." % path)
+    return removed
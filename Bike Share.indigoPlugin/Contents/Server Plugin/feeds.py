@@ -0,0 +1,851 @@
+"""
+GBFS feed download engine
+
+The feeds.py module handles retrieval of the GBFS auto-discovery document and the feeds that it lists. Feeds are
+downloaded concurrently using a bounded thread pool so that a single refresh costs roughly the latency of the slowest
+feed rather than the sum of all feed latencies. Each feed is fetched independently; a failure in one feed is recorded
+and reported, but does not discard the feeds that were downloaded successfully.
+
+Each `FeedFetcher` owns one long-lived, pooled `httpx.Client`, so connections to the bike share host are kept alive
+and reused between refreshes instead of paying the TCP/TLS handshake on every poll. Every bike system has its own
+fetcher (see `systems.BikeSystem`) and the plugin has another one for the system list, so there is one client per
+system. Systems are normally served from different hosts, so a single client shared by all of them wouldn't reuse any
+more connections, and closing a system that's no longer in use releases its connections with it. The client is created
+and replaced under a lock; a client that's replaced (e.g., when HTTP/2 is turned on or off) or closed while requests are
+still using it is closed once the last of those requests finishes.
+
+GBFS documents carry `ttl` and `last_updated` fields that say when fresh data can be expected. `FeedSchedule` tracks
+when each feed next becomes stale so that near-static feeds (e.g., `station_information`) are only downloaded when
+their TTL expires rather than on every poll.
+
+When a feed is due, `FeedCache` sends the validators (`ETag` / `Last-Modified`) from the previous response. If the
+server answers `304 Not Modified`, the previously decoded payload is reused without downloading or parsing it again.
+
+Requests that fail with a transient error (a network error, a timeout, or a 429/5xx response) are retried a few times
+with jittered exponential backoff. A per-host `CircuitBreaker` stops requests to a host that keeps failing for a
+cooldown period (which grows while the outage lasts), so a struggling operator isn't polled at the download interval.
+Failure, retry and latency counters are included in `FeedFetcher.stats()`.
+
+Only the feeds needed by the plugin's enabled features are downloaded (see `FEED_REGISTRY`). Feeds with a projection
+(see `FEED_PROJECTIONS`) are streamed and decoded with only the fields the plugin uses.
+"""
+
+# ================================== IMPORTS ==================================
+
+# Built-in modules
+from collections import Counter, deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+import datetime as dt
+import logging
+import random
+import threading
+import time
+from typing import Callable, Optional
+
+# Third-party modules
+import httpx  # httpx is automatically installed by the Indigo installer
+
+try:
+    import h2  # noqa  HTTP/2 support is optional and requires the `h2` package.
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# My modules
+from constants import (CIRCUIT_COOLDOWN, CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_MAX_COOLDOWN, FEED_MAX_TTL,  # noqa
+                       FEED_MAX_WORKERS, FEED_PROJECTIONS, FEED_REGISTRY, FEED_RETRIES, HTTP_KEEPALIVE_EXPIRY,
+                       HTTP_MAX_CONNECTIONS, HTTP_MAX_KEEPALIVE_CONNECTIONS, HTTP_RETRY_BACKOFF, HTTP_RETRY_STATUS,
+                       HTTP_TIMEOUT, LATENCY_SAMPLES)
+from projection import decode_feed  # noqa
+from records import RECORD_TYPES  # noqa
+from timing import PhaseTimings  # noqa
+
+
+# =============================================================================
+def last_updated_epoch(payload: dict) -> Optional[float]:
+    """Return a GBFS document's `last_updated` value as POSIX seconds.
+
+    GBFS v1/v2 publish `last_updated` as POSIX seconds; v3 publishes an RFC 3339 timestamp.
+
+    Args:
+        payload (dict): A decoded GBFS document.
+
+    Returns:
+        float: The last updated time, or None if it is missing or can't be parsed.
+    """
+    value = payload.get('last_updated') if isinstance(payload, dict) else None
+    try:
+        if isinstance(value, str) and not value.isdigit():
+            return dt.datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+# =============================================================================
+def required_feeds(features: set, extra_feeds: str = "") -> set:
+    """Return the feeds needed by a set of enabled features (see `FEED_REGISTRY`).
+
+    Args:
+        features (set): The enabled feature names.
+        extra_feeds (str): A comma-separated list of additional feed names to download.
+
+    Returns:
+        set: The feed names to download.
+    """
+    feeds = set()
+    for feature in features:
+        feeds.update(FEED_REGISTRY.get(feature, ()))
+    feeds.update(name.strip() for name in extra_feeds.split(",") if name.strip())
+    return feeds
+
+
+# =============================================================================
+class CircuitOpenError(httpx.HTTPError):
+    """Raised instead of sending a request to a host whose circuit breaker is open."""
+
+
+# =============================================================================
+class CircuitBreaker:
+    """Per-host circuit breaker.
+
+    After `threshold` consecutive failed requests to a host, the host's circuit opens and requests to it are refused
+    for `cooldown` seconds. Once the cooldown has passed the circuit is half-open: exactly one trial request is allowed
+    through and other requests to the host wait until it returns. If the trial fails, the circuit opens again with
+    double the cooldown (up to `max_cooldown`); if it succeeds, the circuit closes. The cooldown is escalated at most
+    once per open period, so requests that were already in flight when the circuit opened don't add to the backoff.
+    """
+    def __init__(self, threshold: int = CIRCUIT_FAILURE_THRESHOLD, cooldown: float = CIRCUIT_COOLDOWN,
+                 max_cooldown: float = CIRCUIT_MAX_COOLDOWN):
+        self.threshold    = threshold
+        self.cooldown     = cooldown
+        self.max_cooldown = max_cooldown
+        self.hosts: dict  = {}  # {host: {'failures': int, 'open_until': float, 'cooldown': float, 'trial': int}}
+        self._lock = threading.Lock()
+        self._trial_done = threading.Condition(self._lock)
+
+    # =============================================================================
+    def allow(self, host: str, now: Optional[float] = None) -> bool:
+        """Return True if a request to the host may be sent.
+
+        While the host's circuit is half-open, the first caller is let through as the trial request and other callers
+        block until the trial has been recorded (see `record_success()`, `record_failure()` and `finish()`).
+
+        Args:
+            host (str): The host name.
+            now (float): The current monotonic time (defaults to `time.monotonic()`).
+        """
+        now = time.monotonic() if now is None else now
+        with self._trial_done:
+            while True:
+                state = self.hosts.get(host)
+                if state is None or state['failures'] < self.threshold:
+                    return True
+                if state['open_until'] > now:
+                    return False
+                if state['trial'] is None:
+                    state['trial'] = threading.get_ident()
+                    return True
+                self._trial_done.wait()
+
+    # =============================================================================
+    def record_success(self, host: str) -> bool:
+        """Close the host's circuit.
+
+        Args:
+            host (str): The host name.
+
+        Returns:
+            bool: True if the circuit had been open (i.e., the host has recovered).
+        """
+        with self._trial_done:
+            state = self.hosts.pop(host, None)
+            self._trial_done.notify_all()
+        return bool(state and state['failures'] >= self.threshold)
+
+    # =============================================================================
+    def record_failure(self, host: str, now: Optional[float] = None) -> float:
+        """Count a failed request to the host, opening its circuit once the threshold is reached.
+
+        The circuit is opened when the threshold is first reached and reopened (with a longer cooldown) when the
+        half-open trial request fails. Other failures only add to the count.
+
+        Args:
+            host (str): The host name.
+            now (float): The current monotonic time (defaults to `time.monotonic()`).
+
+        Returns:
+            float: The number of seconds the circuit was opened for (0 if it wasn't opened by this failure).
+        """
+        now = time.monotonic() if now is None else now
+        with self._trial_done:
+            state = self.hosts.setdefault(host, {'failures': 0, 'open_until': 0.0, 'cooldown': 0.0, 'trial': None})
+            state['failures'] += 1
+            if state['trial'] == threading.get_ident():
+                state['trial'] = None
+                self._trial_done.notify_all()
+            elif state['failures'] != self.threshold:
+                return 0
+            state['cooldown']   = min(state['cooldown'] * 2 or self.cooldown, self.max_cooldown)
+            state['open_until'] = now + state['cooldown']
+            return state['cooldown']
+
+    # =============================================================================
+    def finish(self, host: str) -> None:
+        """End the calling thread's half-open trial without recording an outcome (e.g., the host answered 404).
+
+        The next request to the host becomes the trial. Does nothing if the calling thread isn't running the trial.
+
+        Args:
+            host (str): The host name.
+        """
+        with self._trial_done:
+            state = self.hosts.get(host)
+            if state and state['trial'] == threading.get_ident():
+                state['trial'] = None
+                self._trial_done.notify_all()
+
+    # =============================================================================
+    def open_hosts(self, now: Optional[float] = None) -> dict:
+        """Return the hosts whose circuit is open and the seconds until each allows a trial request.
+
+        Args:
+            now (float): The current monotonic time (defaults to `time.monotonic()`).
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            return {
+                host: round(state['open_until'] - now) for host, state in self.hosts.items()
+                if state['open_until'] > now
+            }
+
+
+# =============================================================================
+class FeedSchedule:
+    """Track when each GBFS feed is next due for download based on its `ttl` and `last_updated` values."""
+    def __init__(self):
+        self.due_at: dict = {}
+        self._lock = threading.Lock()
+
+    # =============================================================================
+    def clear(self) -> None:
+        """Forget all schedule information (e.g., when the bike system changes)."""
+        with self._lock:
+            self.due_at.clear()
+
+    # =============================================================================
+    def record(self, name: str, payload: dict, now: Optional[float] = None) -> float:
+        """Record a successful download and compute when the feed next becomes stale.
+
+        The feed is considered fresh until `last_updated + ttl`. If the publisher's clock is ahead of ours, or the
+        `last_updated` value is missing, the TTL is measured from the time of download instead.
+
+        Args:
+            name (str): The feed name.
+            payload (dict): The decoded feed document.
+            now (float): The current POSIX time (defaults to `time.time()`).
+
+        Returns:
+            float: The POSIX time at which the feed is next due.
+        """
+        now = time.time() if now is None else now
+        try:
+            ttl = min(max(float(payload.get('ttl', 0)), 0), FEED_MAX_TTL)
+        except (AttributeError, TypeError, ValueError):
+            ttl = 0
+
+        updated = last_updated_epoch(payload)
+        if updated is None or updated > now:
+            updated = now
+
+        due = updated + ttl
+        with self._lock:
+            self.due_at[name] = due
+        return due
+
+    # =============================================================================
+    def is_due(self, name: str, now: Optional[float] = None) -> bool:
+        """Return True if the feed has never been downloaded or its TTL has expired.
+
+        Args:
+            name (str): The feed name.
+            now (float): The current POSIX time (defaults to `time.time()`).
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            return self.due_at.get(name, 0) <= now
+
+    # =============================================================================
+    def seconds_until_due(self, name: str, now: Optional[float] = None) -> float:
+        """Return the number of seconds until the feed is next due (0 if it is already due).
+
+        Args:
+            name (str): The feed name.
+            now (float): The current POSIX time (defaults to `time.time()`).
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            return max(self.due_at.get(name, 0) - now, 0)
+
+
+# =============================================================================
+class FeedCache:
+    """Conditional GET cache keyed by URL.
+
+    Stores the `ETag` and `Last-Modified` validators from each response along with the decoded payload, so that a
+    `304 Not Modified` reply can be answered from memory.
+    """
+    def __init__(self):
+        self.entries: dict = {}
+        self.hits   = 0
+        self.misses = 0
+        self._lock  = threading.Lock()
+
+    # =============================================================================
+    def clear(self) -> None:
+        """Discard all cached responses."""
+        with self._lock:
+            self.entries.clear()
+
+    # =============================================================================
+    def discard(self, url: str) -> None:
+        """Discard the cached response for a URL."""
+        with self._lock:
+            self.entries.pop(url, None)
+
+    # =============================================================================
+    def request_headers(self, url: str) -> dict:
+        """Return the conditional request headers for a URL.
+
+        Args:
+            url (str): The URL to be requested.
+
+        Returns:
+            dict: `If-None-Match` / `If-Modified-Since` headers, or an empty dict if nothing is cached.
+        """
+        with self._lock:
+            entry = self.entries.get(url)
+        if not entry:
+            return {}
+        headers = {}
+        if entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    # =============================================================================
+    def cached(self, url: str) -> Optional[dict]:
+        """Record a cache hit and return the cached payload for a URL.
+
+        Args:
+            url (str): The URL that returned `304 Not Modified`.
+
+        Returns:
+            dict: The previously decoded payload, or None if nothing is cached.
+        """
+        with self._lock:
+            entry = self.entries.get(url)
+            if entry:
+                self.hits += 1
+                return entry['payload']
+            return None
+
+    # =============================================================================
+    def store(self, url: str, reply: httpx.Response, payload: dict) -> None:
+        """Record a cache miss and save the response validators and decoded payload.
+
+        Responses without validators are counted but not stored since they can't be revalidated.
+
+        Args:
+            url (str): The requested URL.
+            reply (httpx.Response): The full (200) server response.
+            payload (dict): The decoded payload.
+        """
+        etag          = reply.headers.get('ETag')
+        last_modified = reply.headers.get('Last-Modified')
+        with self._lock:
+            self.misses += 1
+            if etag or last_modified:
+                self.entries[url] = {'etag': etag, 'last_modified': last_modified, 'payload': payload}
+            else:
+                self.entries.pop(url, None)
+
+
+# =============================================================================
+class FetchResult:
+    """Container for the outcome of a feed download cycle."""
+    def __init__(self):
+        self.data: dict = {}
+        self.errors: dict = {}
+
+    @property
+    def ok(self) -> bool:
+        """True if every requested feed was downloaded successfully."""
+        return not self.errors
+
+
+# =============================================================================
+class FeedFetcher:
+    """Download GBFS feeds concurrently with per-feed timeouts over the fetcher's pooled HTTP client."""
+    def __init__(self, logger: Optional[logging.Logger] = None, timeout: float = HTTP_TIMEOUT,
+                 max_workers: int = FEED_MAX_WORKERS, timings: Optional[PhaseTimings] = None):
+        """Fetcher initialization.
+
+        Args:
+            logger (logging.Logger): The plugin logger.
+            timeout (float): The timeout (in seconds) applied to each individual feed request.
+            max_workers (int): The maximum number of feeds to download at the same time.
+            timings (PhaseTimings): Where the discovery, fetch and decode phase timings are recorded.
+        """
+        self.logger      = logger or logging.getLogger("Plugin")
+        self.timeout     = timeout
+        self.max_workers = max(1, int(max_workers))
+        self.client: Optional[httpx.Client] = None
+        self.http2       = False
+
+        self.schedule    = FeedSchedule()
+        self.cache       = FeedCache()
+        self.discovery_url: Optional[str] = None
+        self.feed_urls: dict = {}
+        self.projections = dict(FEED_PROJECTIONS)
+        self.retries     = FEED_RETRIES
+        self.breaker     = CircuitBreaker()
+        self.feed_failures = Counter()  # {feed name: consecutive failed downloads}
+        self.timings     = timings or PhaseTimings()
+
+        self._client_lock  = threading.Lock()
+        self._in_use       = Counter()  # {client: requests using it}
+        self._stats_lock   = threading.Lock()
+        self._requests     = 0
+        self._connections  = 0
+        self._failures     = 0
+        self._retried      = 0
+        self._refused      = 0
+        self._latencies    = deque(maxlen=LATENCY_SAMPLES)
+
+    # =============================================================================
+    def open(self, http2: bool = False) -> httpx.Client:
+        """Create (or replace) the shared HTTP client.
+
+        The client keeps idle connections alive long enough to be reused by the next poll. HTTP/2 is only enabled if it
+        was requested and the optional `h2` package is installed. The new client is swapped in before the previous one
+        is retired, so requests already in flight finish on the previous client (see `_retire()`).
+
+        Args:
+            http2 (bool): If True, negotiate HTTP/2 where the server supports it.
+
+        Returns:
+            httpx.Client: The shared client.
+        """
+        if http2 and not HTTP2_AVAILABLE:
+            self.logger.warning("HTTP/2 requested but the 'h2' package is not installed. Using HTTP/1.1.")
+
+        with self._client_lock:
+            self.http2 = http2 and HTTP2_AVAILABLE
+            previous, self.client = self.client, self._new_client()
+            self._retire(previous)
+            return self.client
+
+    # =============================================================================
+    def _new_client(self) -> httpx.Client:
+        """Build an HTTP client with the fetcher's settings."""
+        return httpx.Client(
+            http2=self.http2,
+            timeout=self.timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+            ),
+        )
+
+    # =============================================================================
+    def _retire(self, client: Optional[httpx.Client]) -> None:
+        """Close a client that is no longer the shared client, or leave it for its last request to close.
+
+        Call with `_client_lock` held.
+        """
+        if client is not None and not self._in_use[client]:
+            self._in_use.pop(client, None)
+            client.close()
+
+    # =============================================================================
+    @contextmanager
+    def _client(self):
+        """Yield the shared client (created if needed) for the duration of a request.
+
+        The client is counted as in use until the request finishes, so a client replaced or closed in the meantime is
+        only closed afterward.
+        """
+        with self._client_lock:
+            if self.client is None:
+                self.client = self._new_client()
+            client = self.client
+            self._in_use[client] += 1
+        try:
+            yield client
+        finally:
+            with self._client_lock:
+                self._in_use[client] -= 1
+                if client is not self.client:
+                    self._retire(client)
+                elif not self._in_use[client]:
+                    del self._in_use[client]
+
+    # =============================================================================
+    def close(self) -> None:
+        """Close the fetcher's HTTP client and release its pooled connections.
+
+        A client still in use by a request is closed when that request finishes.
+        """
+        with self._client_lock:
+            previous, self.client = self.client, None
+            self._retire(previous)
+
+    # =============================================================================
+    def _trace(self, event_name: str, info: dict) -> None:
+        """Count new connections using the httpcore trace extension.
+
+        Args:
+            event_name (str): The httpcore trace event name.
+            info (dict): The trace event details (unused).
+        """
+        if event_name == "connection.connect_tcp.started":
+            with self._stats_lock:
+                self._connections += 1
+
+    # =============================================================================
+    def get(self, url: str, headers: Optional[dict] = None) -> httpx.Response:
+        """Issue a GET request over the shared client.
+
+        Args:
+            url (str): The URL to retrieve.
+            headers (dict): Additional request headers.
+
+        Returns:
+            httpx.Response: The server response.
+
+        Raises:
+            httpx.HTTPStatusError: If the server returns an error status (`304 Not Modified` is not an error).
+            CircuitOpenError: If the host's circuit breaker is open.
+        """
+        def attempt() -> httpx.Response:
+            with self._client() as client:
+                reply = client.get(url, headers=headers, extensions={"trace": self._trace})
+            if reply.status_code != httpx.codes.NOT_MODIFIED:
+                reply.raise_for_status()
+            return reply
+
+        return self.call(url, attempt)
+
+    # =============================================================================
+    def call(self, url: str, attempt: Callable):
+        """Run a request with retries, subject to the host's circuit breaker.
+
+        Transient failures (network errors, timeouts and `HTTP_RETRY_STATUS` responses) are retried up to
+        `self.retries` times with full-jitter exponential backoff. A request that still fails counts against the host's
+        circuit breaker. While the host's circuit is half-open, only one request is sent and others wait for its result.
+
+        Args:
+            url (str): The URL being requested (used to identify the host).
+            attempt (callable): Sends the request and returns the result; raises `httpx.HTTPError` on failure.
+
+        Returns:
+            The result of `attempt()`.
+
+        Raises:
+            httpx.HTTPError: If the request fails.
+            CircuitOpenError: If the host's circuit breaker is open.
+        """
+        host = httpx.URL(url).host
+        if not self.breaker.allow(host):
+            with self._stats_lock:
+                self._refused += 1
+            raise CircuitOpenError(f"requests to {host} are paused after repeated failures")
+
+        try:
+            tries = 0
+            while True:
+                with self._stats_lock:
+                    self._requests += 1
+                start = time.monotonic()
+                try:
+                    result = attempt()
+                except (httpx.TransportError, httpx.HTTPStatusError) as err:
+                    transient = (
+                        isinstance(err, httpx.TransportError) or err.response.status_code in HTTP_RETRY_STATUS
+                    )
+                    if transient and tries < self.retries:
+                        tries += 1
+                        with self._stats_lock:
+                            self._retried += 1
+                        time.sleep(random.uniform(0, HTTP_RETRY_BACKOFF * 2 ** tries))
+                        continue
+                    with self._stats_lock:
+                        self._failures += 1
+                    if transient:
+                        cooldown = self.breaker.record_failure(host)
+                        if cooldown:
+                            self.logger.warning(
+                                "%s isn't responding. Pausing requests for %s seconds." % (host, round(cooldown))
+                            )
+                    raise
+
+                with self._stats_lock:
+                    self._latencies.append(time.monotonic() - start)
+                if self.breaker.record_success(host):
+                    self.logger.info("%s is responding again." % host)
+                return result
+        finally:
+            # End a half-open trial that ended without a transient failure or a success (e.g., a 404).
+            self.breaker.finish(host)
+
+    # =============================================================================
+    def get_projected(self, url: str, list_key: str, fields: tuple, record_type: Callable = dict,
+                      feed: str = "") -> dict:
+        """Stream, decode and project a GBFS document, revalidating against the conditional GET cache.
+
+        The document is decoded while it downloads. The time spent decoding (the stream's total time less the time
+        spent waiting for data) is recorded as the `decode:<feed>` phase.
+
+        Args:
+            url (str): The URL to retrieve.
+            list_key (str): The name of the record list under `data` (e.g., `stations`).
+            fields (tuple): The record fields to keep.
+            record_type (callable): Builds each projected record (e.g., a slotted record class).
+            feed (str): The feed name used to label the decode timing (not recorded if empty).
+
+        Returns:
+            dict: The projected document (from the cache if the server replied `304 Not Modified`).
+
+        Raises:
+            httpx.HTTPStatusError: If the server returns an error status.
+            CircuitOpenError: If the host's circuit breaker is open.
+            ValueError: If the document isn't valid JSON.
+        """
+        def attempt() -> Optional[dict]:
+            headers = self.cache.request_headers(url)
+            with (
+                self._client() as client,
+                client.stream("GET", url, headers=headers, extensions={"trace": self._trace}) as reply,
+            ):
+                if reply.status_code == httpx.codes.NOT_MODIFIED:
+                    return self.cache.cached(url)
+                reply.raise_for_status()
+                waited = 0.0
+
+                def chunks():
+                    nonlocal waited
+                    stream = reply.iter_bytes()
+                    while True:
+                        wait_start = time.perf_counter()
+                        chunk = next(stream, None)
+                        waited += time.perf_counter() - wait_start
+                        if chunk is None:
+                            return
+                        yield chunk
+
+                start   = time.perf_counter()
+                payload = decode_feed(chunks(), list_key, fields, record_type)
+                if feed:
+                    self.timings.record(f"decode:{feed}", time.perf_counter() - start - waited)
+                self.cache.store(url, reply, payload)
+                return payload
+
+        payload = self.call(url, attempt)
+        if payload is None:
+            # The server answered a conditional request we didn't make; fetch the full document.
+            self.cache.discard(url)
+            payload = self.call(url, attempt)
+        return payload
+
+    # =============================================================================
+    def stats(self) -> dict:
+        """Report connection reuse metrics for the shared client.
+
+        Returns:
+            dict: The number of requests issued, connections opened, and the share of requests that reused an existing
+                  connection, along with failure, retry and latency counters and any hosts whose circuit is open.
+        """
+        with self._stats_lock:
+            requests, connections = self._requests, self._connections
+            latencies = sorted(self._latencies)
+            failures, retried, refused = self._failures, self._retried, self._refused
+        reused = max(requests - connections, 0)
+        return {
+            'requests': requests,
+            'connections': connections,
+            'reuse_ratio': round(reused / requests, 3) if requests else 0.0,
+            'http2': self.http2,
+            'cache_hits': self.cache.hits,
+            'cache_misses': self.cache.misses,
+            'failures': failures,
+            'retries': retried,
+            'refused': refused,
+            'latency_ms_median': round(latencies[len(latencies) // 2] * 1000) if latencies else None,
+            'latency_ms_max': round(latencies[-1] * 1000) if latencies else None,
+            'open_circuits': self.breaker.open_hosts(),
+        }
+
+    # =============================================================================
+    def get_json(self, url: str, feed: str = "") -> dict:
+        """Retrieve and decode a JSON document, revalidating against the conditional GET cache.
+
+        Args:
+            url (str): The URL to retrieve.
+            feed (str): The feed name used to label the decode timing (`decode:<feed>`; not recorded if empty).
+
+        Returns:
+            dict: The decoded document (from the cache if the server replied `304 Not Modified`).
+        """
+        reply = self.get(url, headers=self.cache.request_headers(url))
+        if reply.status_code == 304:
+            payload = self.cache.cached(url)
+            if payload is not None:
+                return payload
+            # The server answered a conditional request we didn't make; fetch the full document.
+            reply = self.get(url)
+
+        start   = time.perf_counter()
+        payload = reply.json()
+        if feed:
+            self.timings.record(f"decode:{feed}", time.perf_counter() - start)
+        self.cache.store(url, reply, payload)
+        return payload
+
+    # =============================================================================
+    def discover(self, auto_discovery_url: str, lang: str = "en", force: bool = False) -> dict:
+        """Download the GBFS auto-discovery document and return the listed feeds.
+
+        The auto-discovery document has a TTL of its own; the feed list from the previous download is reused until it
+        expires. Switching to a different system discards all schedule information.
+
+        Args:
+            auto_discovery_url (str): The URL of the system's `gbfs.json` document.
+            lang (str): The preferred feed language.
+            force (bool): If True, download the document even if its TTL hasn't expired.
+
+        Returns:
+            dict: A dict of {feed name: feed url}.
+
+        Raises:
+            httpx.HTTPError: If the discovery document can't be retrieved.
+            KeyError: If the discovery document doesn't contain the expected structure.
+        """
+        key = f"{auto_discovery_url}|{lang}"
+        if key != self.discovery_url:
+            self.schedule.clear()
+            self.cache.clear()
+            self.feed_urls = {}
+            self.discovery_url = key
+
+        if force or not self.feed_urls or self.schedule.is_due('_auto_discovery'):
+            with self.timings.phase('discovery'):
+                payload = self.get_json(auto_discovery_url)
+            self.feed_urls = {feed['name']: feed['url'] for feed in payload['data'][lang]['feeds']}
+            self.schedule.record('_auto_discovery', payload)
+        return self.feed_urls
+
+    # =============================================================================
+    def due(self, feeds: dict, force: bool = False) -> dict:
+        """Return the subset of feeds whose TTL has expired.
+
+        Args:
+            feeds (dict): A dict of {feed name: feed url}.
+            force (bool): If True, every feed is considered due.
+
+        Returns:
+            dict: A dict of {feed name: feed url} for the feeds to download now.
+        """
+        if force:
+            return dict(feeds)
+        now = time.time()
+        return {name: url for name, url in feeds.items() if self.schedule.is_due(name, now)}
+
+    # =============================================================================
+    def fetch_feed(self, name: str, url: str) -> dict:
+        """Download and decode a single feed.
+
+        The download (including decoding and any retries) is recorded as the `fetch:<feed>` phase.
+
+        Args:
+            name (str): The feed name (e.g., `station_status`).
+            url (str): The feed URL.
+
+        Returns:
+            dict: The decoded feed payload. Feeds with a projection hold compact records (see `records.py`).
+        """
+        with self.timings.phase(f"fetch:{name}"):
+            if name in self.projections:
+                list_key, fields = self.projections[name]
+                return self.get_projected(url, list_key, fields, RECORD_TYPES.get(name, dict), feed=name)
+            return self.get_json(url, feed=name)
+
+    # =============================================================================
+    def fetch(self, feeds: dict) -> FetchResult:
+        """Download a set of feeds concurrently.
+
+        Every feed is given its own request timeout and the cycle as a whole is bounded so that a stalled feed can't
+        hold the refresh indefinitely. Feeds that fail for any reason (or don't finish in time) are reported in
+        `FetchResult.errors`; the feeds that succeeded are returned in `FetchResult.data`.
+
+        Args:
+            feeds (dict): A dict of {feed name: feed url}.
+
+        Returns:
+            FetchResult: The downloaded feeds and any per-feed errors.
+        """
+        result = FetchResult()
+        if not feeds:
+            return result
+
+        workers = min(self.max_workers, len(feeds))
+        # Allow each "wave" of workers its full per-feed timeout (including retries and backoff), plus a little slack.
+        per_feed = self.timeout * (self.retries + 1) + HTTP_RETRY_BACKOFF * (2 ** (self.retries + 1))
+        deadline = per_feed * (-(-len(feeds) // workers)) + 1
+
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bikeshare-feed")
+        futures  = {executor.submit(self.fetch_feed, name, url): name for name, url in feeds.items()}
+        try:
+            for future in as_completed(futures, timeout=deadline):
+                name = futures[future]
+                try:
+                    result.data[name] = future.result()
+                    self.schedule.record(name, result.data[name])
+                except httpx.HTTPStatusError as err:
+                    result.errors[name] = f"HTTP {err.response.status_code}"
+                except (httpx.HTTPError, ValueError) as err:
+                    result.errors[name] = f"{type(err).__name__}: {err}"
+                except Exception as err:  # noqa
+                    # e.g., a document that isn't shaped like a GBFS feed. Keep the other feeds' results.
+                    if self.feed_failures[name]:
+                        self.logger.debug("Unexpected error downloading %s feed." % name, exc_info=True)
+                    else:
+                        self.logger.exception("Unexpected error downloading %s feed." % name)
+                    result.errors[name] = f"{type(err).__name__}: {err}"
+        except FuturesTimeoutError:
+            for future, name in futures.items():
+                if not future.done():
+                    future.cancel()
+                    result.errors[name] = "Timed out"
+        finally:
+            # Don't block the refresh waiting on stragglers; they'll finish (or time out) on their own.
+            executor.shutdown(wait=False)
+
+        # Warn when a feed starts failing (not on every poll while it stays down), and note when it recovers.
+        for name in result.data:
+            if self.feed_failures.pop(name, 0):
+                self.logger.info("The %s feed is available again." % name)
+        for name, error in result.errors.items():
+            self.feed_failures[name] += 1
+            if self.feed_failures[name] == 1:
+                self.logger.warning("Unable to download %s feed (%s). Using the last data received." % (name, error))
+            else:
+                self.logger.debug(
+                    "Unable to download %s feed (%s, %s failures in a row)." % (name, error, self.feed_failures[name])
+                )
+
+        return result
@@ -0,0 +1,217 @@
+"""
+Station availability history
+
+The history.py module keeps a local time series of station availability in an SQLite database (WAL mode). One compact
+row is written per station per report, in a single transaction per poll. Rows are keyed by station and the station's
+`last_reported` time, so polls that return a station's previous report don't add duplicate rows. A retention policy
+downsamples older rows to one per station per hour and deletes rows past the retention period so the file stays
+bounded. Each retention pass only downsamples the hours that have aged past `HISTORY_DOWNSAMPLE_AGE` since the previous
+pass.
+"""
+
+# ================================== IMPORTS ==================================
+
+# Built-in modules
+import logging
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+# My modules
+from constants import HISTORY_DOWNSAMPLE_AGE, HISTORY_PRUNE_INTERVAL  # noqa
+
+HISTORY_COLUMNS = (
+    'station_id', 'ts', 'bikes', 'ebikes', 'docks', 'bikes_disabled', 'docks_disabled', 'is_renting', 'is_returning'
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS station_history (
+    station_id     TEXT    NOT NULL,
+    ts             INTEGER NOT NULL,
+    bikes          INTEGER,
+    ebikes         INTEGER,
+    docks          INTEGER,
+    bikes_disabled INTEGER,
+    docks_disabled INTEGER,
+    is_renting     INTEGER,
+    is_returning   INTEGER,
+    PRIMARY KEY (station_id, ts)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS station_history_ts ON station_history (ts);
+"""
+
+
+# =============================================================================
+def _as_int(value) -> Optional[int]:
+    """Coerce a feed value to int, or None if it isn't numeric."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+# =============================================================================
+class HistoryStore:
+    """SQLite-backed station availability history."""
+    def __init__(self, file_path: str, retention_days: int = 30, logger: Optional[logging.Logger] = None):
+        """History store initialization.
+
+        Args:
+            file_path (str): The path of the SQLite database file.
+            retention_days (int): The number of days of history to keep.
+            logger (logging.Logger): The plugin logger.
+        """
+        self.file_path          = file_path
+        self.retention_days     = retention_days
+        self.logger             = logger or logging.getLogger("Plugin")
+        self.last_pruned        = 0.0
+        self.downsampled_before = 0  # Rows older than this (POSIX time) have already been downsampled.
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(file_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    # =============================================================================
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            self._conn.close()
+
+    # =============================================================================
+    def record(self, status: dict, now: Optional[float] = None) -> int:
+        """Write one row per station in a single transaction.
+
+        Args:
+            status (dict): The `station_status` index ({station_id: status dict}).
+            now (float): The poll time, used for stations that don't provide `last_reported`.
+
+        Returns:
+            int: The number of new rows written.
+        """
+        now  = int(time.time() if now is None else now)
+        rows = []
+        for station_id, station in status.items():
+            rows.append((
+                station_id,
+                _as_int(station.get('last_reported')) or now,
+                _as_int(station.get('num_bikes_available')),
+                _as_int(station.get('num_ebikes_available')),
+                _as_int(station.get('num_docks_available')),
+                _as_int(station.get('num_bikes_disabled')),
+                _as_int(station.get('num_docks_disabled')),
+                _as_int(station.get('is_renting')),
+                _as_int(station.get('is_returning')),
+            ))
+
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO station_history VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+                )
+                self._conn.execute("COMMIT")
+            except sqlite3.Error:
+                self._conn.execute("ROLLBACK")
+                raise
+            written = self._conn.total_changes - before
+
+        if now - self.last_pruned > HISTORY_PRUNE_INTERVAL:
+            self.prune(now)
+        return written
+
+    # =============================================================================
+    def prune(self, now: Optional[float] = None) -> None:
+        """Apply the retention policy.
+
+        Rows older than the retention period are deleted. Rows older than `HISTORY_DOWNSAMPLE_AGE` are reduced to the
+        first row per station per hour. Only the whole hours that have aged out since the previous pass are downsampled
+        (everything older than the downsampling age on the first pass after startup), and the rows to delete are found
+        with a single window query over that range rather than a subquery per row.
+
+        Args:
+            now (float): The current POSIX time.
+        """
+        now = int(time.time() if now is None else now)
+        expire_before     = now - int(self.retention_days * 86400)
+        downsample_before = (now - HISTORY_DOWNSAMPLE_AGE) // 3600 * 3600
+        downsample_after  = max(self.downsampled_before, expire_before // 3600 * 3600)
+
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute("DELETE FROM station_history WHERE ts < ?", (expire_before,))
+                if downsample_after < downsample_before:
+                    self._conn.execute(
+                        """
+                        DELETE FROM station_history
+                        WHERE (station_id, ts) IN (
+                          SELECT station_id, ts FROM (
+                            SELECT station_id, ts,
+                                   ROW_NUMBER() OVER (PARTITION BY station_id, ts / 3600 ORDER BY ts) AS position
+                            FROM station_history
+                            WHERE ts >= :after AND ts < :before
+                          ) WHERE position > 1
+                        )
+                        """,
+                        {'after': downsample_after, 'before': downsample_before},
+                    )
+                self._conn.execute("COMMIT")
+            except sqlite3.Error:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self.downsampled_before = max(self.downsampled_before, downsample_before)
+        self.last_pruned = now
+
+    # =============================================================================
+    def query(self, station_id: str, start: Optional[float] = None, end: Optional[float] = None,
+              limit: Optional[int] = None) -> list[dict]:
+        """Return a station's history, oldest first.
+
+        Args:
+            station_id (str): The GBFS station id.
+            start (float): Only return rows at or after this POSIX time.
+            end (float): Only return rows at or before this POSIX time.
+            limit (int): The maximum number of (most recent) rows to return.
+
+        Returns:
+            list: A list of dicts keyed by `HISTORY_COLUMNS`.
+        """
+        sql    = "SELECT * FROM station_history WHERE station_id = ? AND ts >= ? AND ts <= ? ORDER BY ts DESC"
+        params = [str(station_id), int(start or 0), int(end if end is not None else 2 ** 62)]
+        if limit:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [dict(zip(HISTORY_COLUMNS, row)) for row in reversed(rows)]
+
+    # =============================================================================
+    def summary(self, station_id: str, start: Optional[float] = None, end: Optional[float] = None) -> dict:
+        """Return utilisation statistics for a station over a time range.
+
+        Args:
+            station_id (str): The GBFS station id.
+            start (float): The start of the range (POSIX time).
+            end (float): The end of the range (POSIX time).
+
+        Returns:
+            dict: Row count, the average/min/max bikes and docks available, and the share of reports in which the
+                  station was empty or renting. The statistics are 0 when there are no reports in the range.
+        """
+        sql = """
+            SELECT COUNT(*), AVG(bikes), MIN(bikes), MAX(bikes), AVG(docks), MIN(docks), MAX(docks),
+                   AVG(bikes = 0), AVG(is_renting)
+            FROM station_history WHERE station_id = ? AND ts >= ? AND ts <= ?
+        """
+        params = (str(station_id), int(start or 0), int(end if end is not None else 2 ** 62))
+        with self._lock:
+            row = self._conn.execute(sql, params).fetchone()
+        keys = ('reports', 'avg_bikes', 'min_bikes', 'max_bikes', 'avg_docks', 'min_docks', 'max_docks',
+                'empty_ratio', 'renting_ratio')
+        return dict(zip(keys, (0 if value is None else value for value in row)))
@@ -14,20 +14,35 @@ this plugin, please feel free to post to the BikeShare Plugin forum on the Indig
 # ================================== IMPORTS ==================================
 
 # Built-in modules
+from concurrent.futures import ThreadPoolExecutor
+import cProfile
 import datetime as dt
+import io
 import logging
-import csv
+import math
+import os
+import pstats
+import threading
+import time
 from typing import Optional
-from urllib.parse import quote
 
 # Third-party modules
-import httpx  # httpx is automatically installed by the Indigo installer
 import indigo  # noqa
 
 # My modules
 import DLFramework.DLFramework as Dave
-from constants import DEBUG_LABELS, GBFS_SYSTEMS_CSV_URL, HTTP_TIMEOUT, TIMESTAMP_FORMAT  # noqa
+from catalogue import SystemCatalogue  # noqa
+from coordinator import RefreshCoordinator  # noqa
+from constants import (DEBUG_LABELS, DEFAULT_SYSTEM, FEED_MIN_POLL_INTERVAL, MENU_SYSTEM_HOLD,  # noqa
+                       PROFILE_STATS_LINES, STATION_MENU_NEAREST, SYSTEM_MAX_WORKERS, TIMESTAMP_FORMAT, WAKE_CHECK_INTERVAL)
+from dump import DUMP_SUFFIX, rotate_dumps, write_dump  # noqa
+from feeds import FeedFetcher, required_feeds  # noqa
+from history import HistoryStore  # noqa
 from plugin_defaults import kDefaultPluginPrefs  # noqa
+from snapshot import load_snapshot, save_snapshot, snapshot_name  # noqa
+from systems import BikeSystem  # noqa
+from timing import PhaseTimings  # noqa
+from vehicles import VEHICLE_TOTALS  # noqa
 
 # =================================== HEADER ==================================
 __author__    = Dave.__author__
@@ -35,7 +50,7 @@ __copyright__ = Dave.__copyright__
 __license__   = Dave.__license__
 __build__     = Dave.__build__
 __title__     = 'BikeShare Plugin for Indigo'
-__version__   = '2025.2.3'
+__version__   = '2025.3.0'
 
 
 # =============================================================================
@@ -56,10 +71,22 @@ class Plugin(indigo.PluginBase):
         # ============================ Instance Attributes =============================
         self.open_for_business       = None
         self.download_interval       = int(self.pluginPrefs.get('downloadInterval', 900))
-        self.master_trigger_dict     = {}
+        self.master_trigger_dict     = {}  # {station_id: {trigger_id, ...}}
+        self.station_renting         = {}  # {station_id: last seen is_renting value}
+        self.refresh_server_calls    = 0
         self.plugin_is_initializing  = True
         self.plugin_is_shutting_down = False
-        self.system_data             = {}
+        self.systems                 = {}  # {`<auto-discovery url>|<language>`: BikeSystem} for each system in use.
+        self._systems_lock           = threading.Lock()
+        self.menu_systems            = {}  # {source: time a station menu last listed the system}
+        self._menu_loads             = {}  # {source: thread loading the system for a station menu}
+        self.wake_event              = threading.Event()
+        self._business_window        = None
+        self.timings                 = PhaseTimings()  # Rolling timings of each refresh phase.
+        self.fetcher                 = FeedFetcher(logger=self.logger, timings=self.timings)  # For the system list.
+        self.catalogue: Optional[SystemCatalogue] = None
+        self.history: Optional[HistoryStore] = None
+        self.refresher               = RefreshCoordinator(self.perform_refresh, logger=self.logger)
 
         # =============================== Debug Logging ================================
         self.plugin_file_handler.setFormatter(logging.Formatter(Dave.LOG_FORMAT, datefmt='%Y-%m-%d %H:%M:%S'))
@@ -113,10 +140,20 @@ class Plugin(indigo.PluginBase):
             indigo.server.log(f"Debugging on (Level: {DEBUG_LABELS[self.debug_level]} ({self.debug_level}))")
 
             # Plugin-specific actions
+            self._business_window  = None
             self.download_interval = int(values_dict.get('downloadInterval', 900))
+            self.open_history()
+            if self.catalogue:
+                self.catalogue.ttl = float(values_dict.get('systemListTtl', 86400))
+            http2 = bool(values_dict.get('http2', False))
+            if http2 != self.fetcher.http2:
+                self.fetcher.open(http2=http2)
+                for system in list(self.systems.values()):
+                    system.fetcher.open(http2=http2)
             self.logger.debug("Plugin prefs saved.")
 
             self.refresh_bike_data()
+            self.wake_event.set()
 
         else:
             self.logger.debug("Plugin prefs cancelled.")
@@ -131,9 +168,43 @@ class Plugin(indigo.PluginBase):
             dev (indigo.Device): The Indigo device instance.
         """
         dev.updateStateOnServer('onOffState', value=False, uiValue="Starting")
-        # We send a copy of the device to the refresh_bike_data method here so that the plugin doesn't do a global
-        # update of all devices for each device started.
-        self.refresh_bike_data(device=dev, force=True)
+
+        # Rebuild the device's state list only when the device definition may have changed (i.e., the device was last
+        # started under a different plugin version).
+        if dev.pluginProps.get('stateListVersion', "") != self.pluginVersion:
+            dev.stateListOrDisplayStateIdChanged()
+            props = dev.pluginProps
+            props['stateListVersion'] = self.pluginVersion
+            dev.replacePluginPropsOnServer(props)
+            self.logger.debug("[%s] Device state list updated." % dev.name)
+
+        # Populate the device right away from the last known data (restored from the snapshot or downloaded for a
+        # device started earlier). It's refreshed with current data below.
+        system = self.systems.get(self.device_source(dev))
+        if system and system.system_data:
+            self.refresh_device(dev)
+
+        # Devices are usually started in batches (e.g., when the plugin starts). The refresh coordinator merges the
+        # requests so the devices started together are refreshed with a single download.
+        self.refresh_bike_data(device_ids={dev.id})
+
+    # =============================================================================
+    @staticmethod
+    def did_device_comm_property_change(orig_dev: indigo.Device, new_dev: indigo.Device) -> bool:  # noqa
+        """Standard Indigo method called when a device's props change.
+
+        Ignores the plugin's own `stateListVersion` bookkeeping so that recording it doesn't restart device comm.
+
+        Args:
+            orig_dev (indigo.Device): The device before the change.
+            new_dev (indigo.Device): The device after the change.
+
+        Returns:
+            bool: True if device comm should be restarted.
+        """
+        orig_props = {k: v for k, v in orig_dev.pluginProps.items() if k != 'stateListVersion'}
+        new_props  = {k: v for k, v in new_dev.pluginProps.items() if k != 'stateListVersion'}
+        return orig_props != new_props
 
     # =============================================================================
     @staticmethod
@@ -146,6 +217,38 @@ class Plugin(indigo.PluginBase):
         dev.updateStateOnServer('onOffState', value=False, uiValue="Disabled")
         dev.updateStateImageOnServer(indigo.kStateImageSel.SensorOff)
 
+    # =============================================================================
+    def validate_device_config_ui(self, values_dict: indigo.Dict = None, type_id: str = "", dev_id: int = 0) -> tuple:  # noqa
+        """Standard Indigo method called when a device configuration dialog is closed.
+
+        Args:
+            values_dict (indigo.Dict): The values from the device configuration dialog.
+            type_id (str): The device type ID.
+            dev_id (int): The Indigo device ID.
+
+        Returns:
+            tuple: (True, values_dict) if valid, otherwise (False, values_dict, error_msg_dict).
+        """
+        error_msg_dict = indigo.Dict()
+
+        if type_id == 'shareDock' and not values_dict.get('stationName', ""):
+            error_msg_dict['stationName'] = "Please select a station."
+
+        if type_id == 'stationArea':
+            lat, lon = values_dict.get('latitude', ""), values_dict.get('longitude', "")
+            if (lat or lon) and not self.parse_location(f"{lat},{lon}"):
+                error_msg_dict['latitude'] = "Please enter a valid latitude and longitude (or leave both blank)."
+                error_msg_dict['longitude'] = error_msg_dict['latitude']
+            try:
+                if float(values_dict.get('radius', 0)) <= 0:
+                    raise ValueError
+            except ValueError:
+                error_msg_dict['radius'] = "Please enter a radius in meters greater than zero."
+
+        if len(error_msg_dict) > 0:
+            return False, values_dict, error_msg_dict
+        return True, values_dict
+
     # =============================================================================
     def get_prefs_config_ui_values(self) -> indigo.Dict:  # noqa
         """Standard Indigo method for when plugin preferences dialog is opened.
@@ -174,11 +277,16 @@ class Plugin(indigo.PluginBase):
 
         try:
             while True:
+                self.download_interval = int(self.pluginPrefs.get('downloadInterval', 900))
                 if self.business_hours():
-                    self.refresh_bike_data(force=False)
+                    self.refresh_bike_data(force=False, wait=True)
                     self.process_triggers()
-                self.download_interval = int(self.pluginPrefs.get('downloadInterval', 900))
-                self.sleep(self.download_interval)
+                    delay = self.next_poll_delay()
+                else:
+                    # Closed for business; sleep until the next opening time.
+                    delay = self.seconds_until_open()
+                    self.logger.debug("Sleeping %s until business hours resume." % dt.timedelta(seconds=int(delay)))
+                self.wait(delay)
 
         except self.StopThread:
             self.logger.debug("Stopping concurrent thread.")
@@ -202,6 +310,13 @@ class Plugin(indigo.PluginBase):
     def shutdown(self) -> None:
         """Standard Indigo method for when the plugin is shut down."""
         self.plugin_is_shutting_down = True
+        self.refresher.stop()
+        self.fetcher.close()
+        with self._systems_lock:
+            for system in self.systems.values():
+                system.close()
+        if self.history:
+            self.history.close()
 
     # =============================================================================
     def startup(self) -> None:
@@ -209,6 +324,26 @@ class Plugin(indigo.PluginBase):
         # =========================== Audit Indigo Version ============================
         self.fogbert.audit_server_version(min_ver=2022)
 
+        # ========================= System List HTTP Client ===========================
+        self.fetcher.open(http2=self.pluginPrefs.get('http2', False))
+
+        # ============================= System Catalogue ==============================
+        self.catalogue = SystemCatalogue(
+            fetcher=self.fetcher,
+            file_path=os.path.join(self.data_folder(), "systems.json"),
+            ttl=float(self.pluginPrefs.get('systemListTtl', 86400)),
+            logger=self.logger,
+        )
+
+        # ============================== Station History ==============================
+        self.open_history()
+
+        # ============================ Warm-Start Snapshot ============================
+        self.restore_snapshots()
+
+        # ============================ Refresh Coordinator ============================
+        self.refresher.start()
+
     # =============================================================================
     def trigger_start_processing(self, trigger: indigo.Trigger) -> None:  # noqa
         """Standard Indigo method called when a trigger is enabled.
@@ -216,7 +351,10 @@ class Plugin(indigo.PluginBase):
         Args:
             trigger (indigo.Trigger): The Indigo trigger instance.
         """
-        self.master_trigger_dict[trigger.pluginProps['listOfStations']] = trigger.id
+        # A trigger may have been edited to watch a different station, so drop any existing registration first.
+        self.trigger_stop_processing(trigger)
+        station_id = trigger.pluginProps.get('listOfStations', "")
+        self.master_trigger_dict.setdefault(station_id, set()).add(trigger.id)
 
     # =============================================================================
     def trigger_stop_processing(self, trigger: indigo.Trigger) -> None:  # noqa
@@ -225,6 +363,11 @@ class Plugin(indigo.PluginBase):
         Args:
             trigger (indigo.Trigger): The Indigo trigger instance.
         """
+        for station_id in list(self.master_trigger_dict):
+            self.master_trigger_dict[station_id].discard(trigger.id)
+            if not self.master_trigger_dict[station_id]:
+                del self.master_trigger_dict[station_id]
+                self.station_renting.pop(station_id, None)
 
     # =============================================================================
     # ============================ BikeShare Methods ==============================
@@ -232,32 +375,105 @@ class Plugin(indigo.PluginBase):
     def business_hours(self) -> bool:
         """Test to see if current time is within plugin operation hours.
 
-        Tests whether the current time falls within the operation hours set in the plugin configuration dialog.
+        Tests whether the current time falls within the operation hours set in the plugin configuration dialog. The
+        `businessHours` device state is only written when the plugin moves between open and closed.
 
         Returns:
             bool: True if within business hours, False otherwise.
         """
-        now = dt.datetime.now()
-        start_updating = self.pluginPrefs.get('start_time', "00:00")
-        start_time     = now.replace(hour=int(start_updating[0:2]), minute=int(start_updating[3:5]))
-        stop_updating  = self.pluginPrefs.get('stop_time', "23:59")
-        if stop_updating == "24:00":
-            stop_time = now.replace(hour=23, minute=59, second=59)
-        else:
-            stop_time = now.replace(hour=int(stop_updating[0:2]), minute=int(stop_updating[3:5]))
+        value = self.is_business_hours()
 
-        # Otherwise, let's check to see if we're open for business.
-        if start_time <= now <= stop_time:
-            value = True
-        else:
-            self.logger.info("Closed for business.")
-            value = False
+        if value != self.open_for_business:
+            if value:
+                self.logger.debug("Open for business.")
+            else:
+                self.logger.info("Closed for business.")
+
+            self.open_for_business = value
+            for dev in indigo.devices.iter("self"):
+                self.update_device_states(dev, [{'key': 'businessHours', 'value': value, 'uiValue': str(value)}])
 
-        self.open_for_business = value
-        for dev in indigo.devices.iter("self"):
-            dev.updateStateOnServer('businessHours', value=value)
         return value
 
+    # =============================================================================
+    def business_window(self) -> tuple[int, int]:
+        """Return the plugin operation hours as seconds after midnight.
+
+        The window is parsed from the plugin preferences once and cached until the preferences are saved again. The
+        stop time is inclusive of its final minute; "24:00" means the end of the day.
+
+        Returns:
+            tuple: (start, stop) in seconds after midnight.
+        """
+        if self._business_window is None:
+            start_updating = self.pluginPrefs.get('start_time', "00:00")
+            stop_updating  = self.pluginPrefs.get('stop_time', "23:59")
+            start = int(start_updating[0:2]) * 3600 + int(start_updating[3:5]) * 60
+            if stop_updating == "24:00":
+                stop = 86399
+            else:
+                stop = int(stop_updating[0:2]) * 3600 + int(stop_updating[3:5]) * 60 + 59
+            self._business_window = (start, stop)
+
+        return self._business_window
+
+    # =============================================================================
+    def is_business_hours(self, now: Optional[dt.datetime] = None) -> bool:
+        """Test whether a time falls within plugin operation hours without updating any state.
+
+        Args:
+            now (dt.datetime): The time to test (defaults to the current time).
+
+        Returns:
+            bool: True if within business hours, False otherwise.
+        """
+        start, stop = self.business_window()
+        now = now or dt.datetime.now()
+        seconds = now.hour * 3600 + now.minute * 60 + now.second
+
+        if start <= stop:
+            return start <= seconds <= stop
+        # The window spans midnight (e.g., 22:00 to 06:00).
+        return seconds >= start or seconds <= stop
+
+    # =============================================================================
+    def seconds_until_open(self, now: Optional[dt.datetime] = None) -> float:
+        """Return the number of seconds until business hours next begin (0 if currently open).
+
+        Args:
+            now (dt.datetime): The time to measure from (defaults to the current time).
+
+        Returns:
+            float: The number of seconds to wait.
+        """
+        start, _ = self.business_window()
+        now = now or dt.datetime.now()
+        seconds = now.hour * 3600 + now.minute * 60 + now.second + now.microsecond / 1_000_000
+
+        if self.is_business_hours(now):
+            return 0
+        if seconds < start:
+            return start - seconds
+        return 86400 - seconds + start
+
+    # =============================================================================
+    def wait(self, seconds: float) -> None:
+        """Sleep the concurrent thread, waking early if the plugin preferences are saved.
+
+        Sleeps in short increments so that a new schedule (or business hours window) takes effect without waiting out
+        a long sleep.
+
+        Args:
+            seconds (float): The number of seconds to sleep.
+        """
+        self.wake_event.clear()
+        deadline = time.monotonic() + seconds
+        while not self.wake_event.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            self.sleep(min(remaining, WAKE_CHECK_INTERVAL))
+
     # =============================================================================
     def commsKillAll(self, action: indigo.actionGroup = None) -> None:  # noqa
         """Deprecated. Use comms_kill_all() instead.
@@ -293,21 +509,173 @@ class Plugin(indigo.PluginBase):
             indigo.device.enable(dev, value=True)
 
     # =============================================================================
-    def dump_bike_data(self, action: indigo.actionGroup = None) -> None:
-        """Dump current bike data to a log file."""
-        debug_level = int(self.pluginPrefs.get('showDebugLevel', "30"))
-        time_stamp  = dt.datetime.now().strftime("%Y-%m-%d %H.%M")
-        log_path    = indigo.server.getLogsFolderPath()
-        file_name   = f"{log_path}/com.fogbert.indigoplugin.bikeShare/{time_stamp} BikeShare data.txt"
+    def dump_bike_data(self, action: indigo.actionGroup = None, stations_only: bool = False) -> None:
+        """Dump current bike data to a log file.
 
-        with open(file_name, 'w', encoding="utf-8") as out_file:
-            out_file.write("BikeShare Plugin Data\n")
-            out_file.write(f"{time_stamp}\n")
-            out_file.write(f"{self.system_data}")
+        The data is written to a gzip-compressed NDJSON file in the plugin's log folder on a background thread (see
+        `dump.py`). Old dumps are rotated out. The Indigo log includes a report of the memory used by each system's
+        in-memory station records.
+
+        Args:
+            action (indigo.actionGroup): The action instance. A `stationsOnly` action prop writes one merged line per
+                                         station instead of the feeds.
+            stations_only (bool): If True, write one merged line per station instead of the feeds.
+        """
+        stations_only = stations_only or bool(getattr(action, 'props', {}).get('stationsOnly', False))
+        time_stamp    = dt.datetime.now().strftime("%Y-%m-%d %H.%M.%S")
+        folder        = os.path.join(indigo.server.getLogsFolderPath(), "com.fogbert.indigoplugin.bikeShare")
+        kind          = "stations" if stations_only else "data"
+        file_name     = os.path.join(folder, f"{time_stamp} BikeShare {kind}{DUMP_SUFFIX}")
+        systems       = list(self.systems.values())
+        header        = {
+            'written_at': time_stamp, 'plugin_version': self.pluginVersion, 'timings': self.timings.summary()
+        }
+
+        def write() -> None:
+            try:
+                os.makedirs(folder, exist_ok=True)
+                start = time.perf_counter()
+                lines = write_dump(file_name, systems, stations_only=stations_only, header=header)
+                rotate_dumps(folder, logger=self.logger)
+                indigo.server.log(
+                    f"Data written to {file_name} ({lines} lines, {round(os.path.getsize(file_name) / 1024, 1)} KB, "
+                    f"{time.perf_counter() - start:.1f} seconds)."
+                )
+            except Exception:  # noqa
+                self.logger.exception("Unable to write the data dump.")
+
+        # The report is logged with `indigo.server.log()` so it's shown at any debug level without changing the shared
+        # log handler's level while other threads are logging.
+        for system in systems:
+            memory = system.stations.memory_report()
+            record_bytes = sum(memory[feed]['record_bytes'] for feed in ('station_information', 'station_status'))
+            dict_bytes   = sum(memory[feed]['dict_bytes'] for feed in ('station_information', 'station_status'))
+            indigo.server.log(
+                f"[{system.url}] Station records: {len(system.stations)} stations, {round(record_bytes / 1024, 1)} KB "
+                f"({round(dict_bytes / 1024, 1)} KB as dicts), indexes {round(memory['index_bytes'] / 1024, 1)} KB."
+            )
+        threading.Thread(target=write, name="bikeshare-dump", daemon=True).start()
+
+    # =============================================================================
+    def dump_station_data(self, action: indigo.actionGroup = None) -> None:
+        """Dump the merged station data (one line per station) to a log file. See `dump_bike_data()`."""
+        self.dump_bike_data(action, stations_only=True)
+
+    # =============================================================================
+    def data_folder(self) -> str:
+        """Return the folder where the plugin keeps its cached data, creating it if needed.
 
-        self.indigo_log_handler.setLevel(20)
-        self.logger.info("Data written to %s" % file_name)
-        self.indigo_log_handler.setLevel(debug_level)
+        Returns:
+            str: The path to the plugin's data folder.
+        """
+        path = os.path.join(indigo.server.getInstallFolderPath(), "Preferences", "Plugins", self.pluginId)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    # =============================================================================
+    def default_source(self) -> str:
+        """Return the system selected in the plugin config (`<auto-discovery url>|<language>`, or "" if none)."""
+        return self.source_for(self.pluginPrefs.get('bike_system', ""))
+
+    # =============================================================================
+    def default_system(self) -> Optional[BikeSystem]:
+        """Return the system selected in the plugin config (or None if it hasn't been loaded)."""
+        return self.systems.get(self.default_source())
+
+    # =============================================================================
+    def device_source(self, dev: indigo.Device) -> str:
+        """Return the system a device reports on (`<auto-discovery url>|<language>`, or "" if none).
+
+        Devices that don't select a system of their own use the system selected in the plugin config.
+
+        Args:
+            dev (indigo.Device): The Indigo device instance.
+
+        Returns:
+            str: The system's source key.
+        """
+        url = dev.pluginProps.get('bikeSystem', DEFAULT_SYSTEM)
+        if url in ("", DEFAULT_SYSTEM):
+            return self.default_source()
+        return self.source_for(url)
+
+    # =============================================================================
+    def source_for(self, url: str) -> str:
+        """Return the source key for an auto-discovery URL in the configured language ("" if there's no URL)."""
+        return f"{url}|{self.pluginPrefs.get('language', 'en')}" if url else ""
+
+    # =============================================================================
+    def get_system(self, source: str) -> BikeSystem:
+        """Return the system for a source key, creating it if it isn't loaded.
+
+        Args:
+            source (str): The system's source key (`<auto-discovery url>|<language>`).
+
+        Returns:
+            BikeSystem: The system.
+        """
+        with self._systems_lock:
+            system = self.systems.get(source)
+            if system is None:
+                url, lang = source.rsplit("|", 1)
+                system = BikeSystem(
+                    url, lang, logger=self.logger, timings=self.timings, http2=self.pluginPrefs.get('http2', False)
+                )
+                self.systems[source] = system
+            return system
+
+    # =============================================================================
+    def prune_systems(self, sources) -> None:
+        """Drop the loaded systems that aren't in use (and their snapshots) to free their data.
+
+        A system listed by a station menu in the last `MENU_SYSTEM_HOLD` seconds is kept, so that a system selected in
+        a device dialog isn't dropped before the device is saved.
+
+        Args:
+            sources (iterable): The source keys of the systems in use.
+        """
+        now = time.time()
+        with self._systems_lock:
+            for source, listed in list(self.menu_systems.items()):
+                if now - listed > MENU_SYSTEM_HOLD:
+                    del self.menu_systems[source]
+            unused = [source for source in self.systems if source not in sources and source not in self.menu_systems]
+            for source in unused:
+                self.systems.pop(source).close()
+                self._menu_loads.pop(source, None)
+                try:
+                    os.remove(self.snapshot_path(source))
+                except OSError:
+                    pass
+                self.logger.debug("Dropped unused system %s." % source)
+
+    # =============================================================================
+    def system_features(self) -> dict:
+        """Return the plugin features in use (the keys of `FEED_REGISTRY`) for each system in use.
+
+        A system is in use while the plugin config selects it or an enabled device reports on it. Station menus are
+        always enabled. Each device type is enabled for a system while at least one enabled device of that type reports
+        on the system. Vehicle feeds are enabled for a system while at least one enabled Bike Share Station device on
+        the system has vehicle states turned on. Triggers and history use the system selected in the plugin config; they're enabled while there
+        are station triggers or history is turned on.
+
+        Returns:
+            dict: A dict of {source key: set of enabled feature names}.
+        """
+        default  = self.default_source()
+        features = {default: {'station_menus'}} if default else {}
+        for dev in indigo.devices.iter(filter="self"):
+            source = self.device_source(dev)
+            if dev.enabled and source:
+                features.setdefault(source, {'station_menus'}).add(dev.deviceTypeId)
+                if dev.pluginProps.get('vehicleStates', False):
+                    features[source].add('vehicles')
+        if default:
+            if self.master_trigger_dict:
+                features[default].add('triggers')
+            if self.history:
+                features[default].add('history')
+        return features
 
     # =============================================================================
     @staticmethod
@@ -326,38 +694,68 @@ class Plugin(indigo.PluginBase):
         return [(f"{hour:02.0f}:00", f"{hour:02.0f}:00") for hour in range(0, 25)]
 
     # =============================================================================
-    def get_bike_data(self) -> Optional[dict]:
-        """Download the necessary JSON data from the bike sharing service.
+    def get_bike_data(self, force: bool = False) -> dict:
+        """Download the necessary JSON data from each bike sharing service in use.
 
-        Reaches out to the bike share server and downloads the JSON data.
+        Each system in use (see `system_features()`) is downloaded once no matter how many devices report on it, and
+        the systems are downloaded concurrently. Each system keeps its own feed schedule: when the "Honor Feed TTL"
+        preference is enabled, only feeds whose `ttl` has expired are downloaded. Only the feeds needed by the features
+        in use for the system are downloaded (see `refresh_system()` and `BikeSystem.refresh()`). Systems no longer in
+        use are dropped. Called by `perform_refresh()` on the refresh coordinator's thread.
+
+        Args:
+            force (bool): If True, download every feed regardless of its TTL.
 
         Returns:
-            dict: The system data dict, or None on error.
+            dict: A dict of {source key: system data} for each system in use.
         """
-        self.system_data = {}
+        features = self.system_features()
+        self.prune_systems(features)
+        if not features:
+            # Waiting for pluginPrefs to be written to server upon first install.
+            self.logger.debug("Waiting for bike system data.")
+            return {}
 
-        try:
-            # Get the selected service from the plugin config dict.
-            lang = self.pluginPrefs.get('language', 'en')
-            auto_discovery_url = self.pluginPrefs.get('bike_system', None)
+        systems = [(self.get_system(source), wanted) for source, wanted in features.items()]
+        if len(systems) == 1:
+            self.refresh_system(*systems[0], force=force)
+        else:
+            with ThreadPoolExecutor(max_workers=min(len(systems), SYSTEM_MAX_WORKERS),
+                                    thread_name_prefix="bikeshare-system") as executor:
+                for system, wanted in systems:
+                    executor.submit(self.refresh_system, system, wanted, force)
 
-            # Waiting for pluginPrefs to be written to server upon first install.
-            while not auto_discovery_url:
-                self.sleep(4)
-                auto_discovery_url = self.pluginPrefs.get('bike_system', None)
-                self.logger.debug("Waiting for bike system data.")
-
-            # Go and get the data from the bike sharing service.
-            self.logger.debug("Auto-discovery URL: %s" % auto_discovery_url)
-            reply = httpx.get(auto_discovery_url, timeout=HTTP_TIMEOUT)
-            for feed in reply.json()['data'][lang]['feeds']:
-                self.system_data[feed['name']] = httpx.get(feed['url'], timeout=HTTP_TIMEOUT).json()
-            return self.system_data
-
-        # ======================== Communication Error Handling ========================
-        except (httpx.HTTPStatusError, httpx.RequestError, Exception):  # noqa
-            self.logger.exception("Communication error. Will try again later.")
-            return None
+        return {system.source: system.system_data for system, _ in systems}
+
+    # =============================================================================
+    def refresh_system(self, system: BikeSystem, features: set, force: bool = False) -> None:
+        """Download one system's data, then record its station history and save its snapshot.
+
+        The last good data is kept (and marked as stale) if the service can't be reached; see `BikeSystem.refresh()`.
+
+        Args:
+            system (BikeSystem): The system.
+            features (set): The features in use for the system (see `system_features()`).
+            force (bool): If True, download every feed regardless of its TTL.
+        """
+        wanted = required_feeds(features, self.pluginPrefs.get('extraFeeds', ""))
+        try:
+            with system.lock:
+                changed = system.refresh(wanted, force=force, honor_ttl=self.pluginPrefs.get('honorFeedTtl', True))
+        except Exception:  # noqa
+            self.logger.exception("There was a problem refreshing %s. Will try on next cycle." % system.url)
+            return
+
+        if not changed:
+            return
+        if self.history and system.source == self.default_source():
+            try:
+                written = self.history.record(system.stations.status)
+                self.logger.debug("%s station history rows written." % written)
+            except Exception:  # noqa
+                self.logger.exception("Unable to write station history.")
+        if not system.data_stale:
+            save_snapshot(self.snapshot_path(system.source), system.system_data, system.source, logger=self.logger)
 
     # =============================================================================
     def get_system_list(self, filter: str = "", type_id: int = 0, values_dict: Optional[indigo.Dict] = None, target_id: int = 0) -> list[tuple[str, str]]:  # noqa
@@ -369,137 +767,378 @@ class Plugin(indigo.PluginBase):
             values_dict (indigo.Dict): The current values dict (unused).
             target_id (int): The target ID (unused).
 
+        The list is served from the system catalogue cache, which is revalidated in the background once it's older
+        than the "System List Refresh" preference.
+
         Returns:
             list: A sorted list of (url, name) tuples for each available system.
         """
         try:
-            response = httpx.get(GBFS_SYSTEMS_CSV_URL, timeout=HTTP_TIMEOUT)
-            response.raise_for_status()
-            csv_dict = csv.DictReader(response.content.decode("utf-8").splitlines())
+            return self.catalogue.systems()
 
-            # convert the DictReader object to a list because DictReader objects are not subscriptable.
-            new_dict = list(csv_dict)
+        except Exception:  # noqa
+            self.logger.exception("Unable to build the system list. Will try again later.")
+            return []
 
-            # construct the combined name for a dropdown list.
-            for system in new_dict:
-                name = system['Name'].lstrip(' ')
-                loc  = system['Location']
-                system["Combined Name"] = f"{name} ({loc})"
+    # =============================================================================
+    def get_device_system_list(self, filter: str = "", type_id: int = 0, values_dict: Optional[indigo.Dict] = None, target_id: int = 0) -> list[tuple[str, str]]:  # noqa
+        """Generate the list of bike sharing systems for device config dialogs.
 
-            # convert iterator into list and collapse any spaces in the URL field.
-            list_li = [(_["Auto-Discovery URL"].replace(" ", ""), _["Combined Name"]) for _ in new_dict]
-            list_li = [(quote(k, safe="%:/"), v) for (k, v) in list_li]
+        The first entry selects the system chosen in the plugin config.
 
-            self.logger.debug("%s bike sharing systems available." % len(list_li))
-            return sorted(list_li, key=lambda tup: tup[1].lower())
+        Args:
+            filter (str): Indigo filter string (unused).
+            type_id (int): The type ID (unused).
+            values_dict (indigo.Dict): The current values dict (unused).
+            target_id (int): The target ID (unused).
 
-        except (httpx.HTTPStatusError, httpx.RequestError, Exception):  # noqa
-            self.logger.exception("Communication error. Will try again later.")
-            return []
+        Returns:
+            list: A list of (url, name) tuples.
+        """
+        return [(DEFAULT_SYSTEM, "Plugin Default")] + self.get_system_list()
 
     # =============================================================================
     def get_station_list(self, filter: str = "", type_id: int = 0, values_dict: Optional[indigo.Dict] = None, target_id: int = 0) -> list[tuple[str, str]]:  # noqa
         """Create a sorted list of bike sharing stations for dropdown menus.
 
+        The sorted list is precomputed once per `station_information` change. If the dialog has a station search
+        field, only stations whose names contain the search text are listed. If a location ("lat, lon") is entered in
+        the dialog's "Near" field, the nearest stations to that point are listed instead, closest first. Stations are
+        listed from the system selected in the dialog (device dialogs) or in the plugin config. A system that isn't
+        loaded yet is restored from its snapshot if there is one, or else downloaded in the background (see
+        `load_menu_system()`) while the menu shows a "Loading stations..." entry; the dialog's Filter Stations button
+        reloads the menu.
+
         Args:
-            filter (str): Indigo filter string (unused).
+            filter (str): Indigo filter string. The name of the menu field (used to keep the current selection).
             type_id (int): The type ID (unused).
-            values_dict (indigo.Dict): The current values dict (unused).
+            values_dict (indigo.Dict): The current values dict.
             target_id (int): The target ID (unused).
 
         Returns:
             list: A sorted list of (station_id, name) tuples.
         """
-        try:
-            station_information = self.system_data['station_information']['data']['stations']
-            return sorted([(key['station_id'], key['name']) for key in station_information], key=lambda x: x[-1])
-        except KeyError:
+        values_dict = values_dict or {}
+        url    = values_dict.get('bikeSystem', DEFAULT_SYSTEM)
+        source = self.default_source() if url in ("", DEFAULT_SYSTEM) else self.source_for(url)
+        system = self.get_system(source) if source else None
+        if system:
+            self.menu_systems[source] = time.time()
+        if system and not system.stations.info and self.load_menu_system(source, system):
+            return [("", "Loading stations...")]
+
+        if not system or not system.stations.info:
             self.logger.warning("Station data unavailable.")
             return []
 
+        near = self.parse_location(values_dict.get('stationNear', ""))
+        if near:
+            return system.stations.nearest_menu_items(
+                *near, count=STATION_MENU_NEAREST, selected=values_dict.get(filter, "") if filter else ""
+            )
+        return system.stations.menu_items(
+            search=values_dict.get('stationSearch', ""),
+            selected=values_dict.get(filter, "") if filter else ""
+        )
+
     # =============================================================================
-    def parse_bike_data(self, dev: Optional[indigo.Device] = None) -> None:
-        """Parse bike data and save values to custom device states.
+    def load_menu_system(self, source: str, system: BikeSystem) -> bool:
+        """Load a system's stations for a station menu without blocking the dialog.
 
-        Takes the JSON data from self.system_data and assigns values to relevant device states. When the service
-        provides a null string value, assigns "Unknown" to alert the user.
+        The system is restored from its snapshot when there is one. Otherwise its station list is downloaded on a
+        background thread, so a slow or unreachable service doesn't freeze the dialog.
 
         Args:
-            dev (indigo.Device): The Indigo device instance to update.
+            source (str): The system's source key.
+            system (BikeSystem): The system.
+
+        Returns:
+            bool: True while the download is in progress; False once the stations are available or the download has
+                  finished without them.
         """
-        states_list = []
-        station_id  = dev.pluginProps['stationName']
+        snapshot = load_snapshot(self.snapshot_path(source), source, logger=self.logger)
+        if snapshot:
+            system.restore(snapshot['feeds'])
+            return False
+
+        with self._systems_lock:
+            loader = self._menu_loads.get(source)
+            if loader is not None:
+                if loader.is_alive():
+                    return True
+                # The last download finished without station data; start another one on the next reload.
+                del self._menu_loads[source]
+                return False
+            loader = threading.Thread(
+                target=self.refresh_system, args=(system, {'station_menus'}), name="bikeshare-menu", daemon=True
+            )
+            self._menu_loads[source] = loader
+        loader.start()
+        return True
 
-        # Station information
-        for station in self.system_data['station_information']['data']['stations']:
-            if station['station_id'] == station_id:
-                for key in ('capacity', 'lat', 'lon', 'name',):
-                    states_list.append({'key': key, 'value': station.get(key, 'Unknown')})
+    # =============================================================================
+    @staticmethod
+    def station_search_changed(values_dict: Optional[indigo.Dict] = None, type_id: str = "", target_id: int = 0) -> indigo.Dict:  # noqa
+        """Refresh the station menu after the station search text changes.
 
-        # Station Status
-        for station in self.system_data['station_status']['data']['stations']:
-            if station['station_id'] == station_id:
-                # Coerce select entries to bool
-                for _ in ('is_renting', 'is_returning'):
-                    station[_] = station[_] == 1
-
-                for key in (
-                    'is_renting',
-                    'is_returning',
-                    'num_bikes_available',
-                    'num_bikes_disabled',
-                    'num_docks_available',
-                    'num_docks_disabled',
-                    'num_ebikes_available',
-                ):
-                    states_list.append({'key': key, 'value': station.get(key, 'Unknown')})
-
-                # ================================== Data Age ==================================
-                try:
-                    last_report = int(station['last_reported'])
-                    last_report_human = dt.datetime.fromtimestamp(last_report).strftime(TIMESTAMP_FORMAT)
+        Args:
+            values_dict (indigo.Dict): The current values dict.
+            type_id (str): The type ID (unused).
+            target_id (int): The target ID (unused).
 
-                    diff_time = dt.datetime.now() - dt.datetime.fromtimestamp(last_report)
+        Returns:
+            indigo.Dict: The values dict.
+        """
+        return values_dict
 
-                    # Sometimes the sharing service clock is ahead of the Indigo server clock. Since the result can't
-                    # be negative by definition, let's make it zero and call it a day.
-                    time_diff = max(diff_time.total_seconds(), 0)
-                    diff = dt.timedelta(seconds=time_diff)
-                    diff_time_str = f"{diff}"
+    # =============================================================================
+    def next_poll_delay(self) -> float:
+        """Determine how long the concurrent thread should sleep before the next poll.
 
-                    states_list.append({'key': 'last_reported', 'value': last_report_human})
-                    states_list.append({'key': 'dataAge', 'value': diff_time_str})
+        When the "Honor Feed TTL" preference is enabled, `station_status` is polled at its own TTL: the thread sleeps
+        until the first system's `station_status` expires, faster or slower than the download interval, but never less
+        than `FEED_MIN_POLL_INTERVAL` so a feed with a very short (or zero) TTL doesn't hammer the service. The download
+        interval set in the plugin configuration is used when the preference is off or no `station_status` has been
+        downloaded yet.
 
-                except Exception:  # noqa
-                    self.logger.exception("Error parsing last_reported timestamp.")
-                    states_list.append({'key': 'last_reported', 'value': "Unknown", 'uiValue': "Unknown"})
-                    states_list.append({'key': 'dataAge', 'value': "Unknown", 'uiValue': "Unknown"})
+        Returns:
+            float: The number of seconds to sleep.
+        """
+        if not self.pluginPrefs.get('honorFeedTtl', True):
+            return self.download_interval
 
-        dev.updateStatesOnServer(states_list)
+        due = [
+            system.fetcher.schedule.seconds_until_due('station_status') for system in self.systems.values()
+            if 'station_status' in system.fetcher.schedule.due_at
+        ]
+        if not due:
+            return self.download_interval
+        return max(min(due), FEED_MIN_POLL_INTERVAL)
 
     # =============================================================================
-    def process_triggers(self) -> None:
-        """Process plugin triggers.
+    def open_history(self) -> None:
+        """Open (or close) the station history store to match the plugin preferences."""
+        enabled   = self.pluginPrefs.get('historyEnabled', False)
+        retention = int(self.pluginPrefs.get('historyRetention', 30))
+
+        if enabled and not self.history:
+            try:
+                self.history = HistoryStore(
+                    file_path=os.path.join(self.data_folder(), "history.sqlite"),
+                    retention_days=retention,
+                    logger=self.logger,
+                )
+            except Exception:  # noqa
+                self.logger.exception("Unable to open the station history database.")
+                self.history = None
+        elif not enabled and self.history:
+            self.history.close()
+            self.history = None
+
+        if self.history:
+            self.history.retention_days = retention
+
+    # =============================================================================
+    def get_station_history(self, station_id: str, hours: float = 24) -> dict:
+        """Return a station's recorded history and utilisation summary.
+
+        Args:
+            station_id (str): The GBFS station id.
+            hours (float): How many hours of history to return.
+
+        Returns:
+            dict: {'rows': [...], 'summary': {...}}, or an empty dict if history isn't enabled.
+        """
+        if not self.history:
+            self.logger.warning("Station history is not enabled.")
+            return {}
+        start = time.time() - float(hours) * 3600
+        return {
+            'rows': self.history.query(station_id, start=start),
+            'summary': self.history.summary(station_id, start=start),
+        }
+
+    # =============================================================================
+    def query_station_history(self, action: indigo.actionGroup = None, dev: Optional[indigo.Device] = None, caller_waiting_for_result: bool = None) -> dict:  # noqa
+        """Return a station's recorded history based on a call from an Indigo Action item.
+
+        Intended to be called with `plugin.executeAction("query_station_history", props={...}, waitUntilDone=True)`.
+        The action props are `station_id` (required) and `hours` (defaults to 24).
+
+        Args:
+            action (indigo.actionGroup): The action instance.
+            dev (indigo.Device): The device (unused).
+            caller_waiting_for_result (bool): True if the caller is waiting for the result.
 
-        Examines the is_renting state of each device, determines whether there is a trigger for any stations
-        that are not renting, and fires the corresponding trigger.
+        Returns:
+            dict: {'rows': [...], 'summary': {...}}, or an empty dict if the action props are invalid.
         """
+        props      = action.props
+        station_id = str(props.get('station_id', "") or "").strip()
+        if not station_id:
+            self.logger.error("Query Station History: a station_id is required.")
+            return {}
+
         try:
-            for dev in indigo.devices.iter(filter='self'):
+            hours = float(props.get('hours', 24) or 24)
+        except (TypeError, ValueError):
+            hours = None
+        if hours is None or not 0 < hours < math.inf:
+            self.logger.error(
+                "Query Station History: invalid hours %r. The hours must be a number greater than 0.", props.get('hours')
+            )
+            return {}
+        return self.get_station_history(station_id, hours)
 
-                station_name   = dev.pluginProps['stationName']
-                station_status = dev.states['is_renting']
-                if station_name in self.master_trigger_dict:
+    # =============================================================================
+    def parse_bike_data(self, dev: Optional[indigo.Device] = None, system: Optional[BikeSystem] = None) -> list[dict]:
+        """Parse bike data into a list of custom device states.
 
-                    if not station_status:
-                        trigger_id = self.master_trigger_dict[station_name]
+        Looks up the device's station in its system's station store and assigns values to relevant device states. When
+        the service provides a null string value, assigns "Unknown" to alert the user. When the device has vehicle
+        states turned on and the system publishes a vehicle feed, the station's free-floating vehicle totals (joined once per download; see `vehicles.py`) are
+        included. The states are returned rather than written so that the caller can send them to the server in a
+        single update.
 
-                        if indigo.triggers[trigger_id].enabled:
+        Args:
+            dev (indigo.Device): The Indigo device instance to parse data for.
+            system (BikeSystem): The device's system (looked up if not given).
+
+        Returns:
+            list: A list of state dicts suitable for `updateStatesOnServer()`.
+        """
+        states_list = []
+        station_id  = dev.pluginProps['stationName']
+        system      = system or self.get_system(self.device_source(dev))
+
+        # Station information
+        station = system.stations.info.get(station_id)
+        if station is not None:
+            for key in ('capacity', 'lat', 'lon', 'name',):
+                states_list.append({'key': key, 'value': station.get(key, 'Unknown')})
+
+        # Station Status
+        station = system.stations.status.get(station_id)
+        if station is not None:
+            for key in (
+                'is_renting',
+                'is_returning',
+                'num_bikes_available',
+                'num_bikes_disabled',
+                'num_docks_available',
+                'num_docks_disabled',
+                'num_ebikes_available',
+            ):
+                states_list.append({'key': key, 'value': station.get(key, 'Unknown')})
+
+            # ================================== Data Age ==================================
+            try:
+                last_report = int(station['last_reported'])
+                last_report_human = dt.datetime.fromtimestamp(last_report).strftime(TIMESTAMP_FORMAT)
+
+                diff_time = dt.datetime.now() - dt.datetime.fromtimestamp(last_report)
+
+                # Sometimes the sharing service clock is ahead of the Indigo server clock. Since the result can't
+                # be negative by definition, let's make it zero and call it a day.
+                time_diff = max(diff_time.total_seconds(), 0)
+                diff = dt.timedelta(seconds=time_diff)
+                diff_time_str = f"{diff}"
+
+                states_list.append({'key': 'last_reported', 'value': last_report_human})
+                states_list.append({'key': 'dataAge', 'value': diff_time_str})
+
+            except (KeyError, TypeError, ValueError, OverflowError, OSError):
+                self.logger.debug("[%s] Station did not report a valid last_reported time." % dev.name)
+                states_list.append({'key': 'last_reported', 'value': "Unknown", 'uiValue': "Unknown"})
+                states_list.append({'key': 'dataAge', 'value': "Unknown", 'uiValue': "Unknown"})
+
+        # ============================ Free-Floating Vehicles ============================
+        if dev.pluginProps.get('vehicleStates', False) and system.stations.has_vehicles:
+            totals = system.stations.vehicles.get(station_id) or dict.fromkeys(VEHICLE_TOTALS, 0)
+            states_list.extend([
+                {'key': 'vehicles_available', 'value': totals['docked'] + totals['nearby']},
+                {'key': 'vehicles_bikes', 'value': totals['bikes']},
+                {'key': 'vehicles_ebikes', 'value': totals['ebikes']},
+                {'key': 'vehicles_scooters', 'value': totals['scooters']},
+                {'key': 'vehicles_other', 'value': totals['other']},
+                {'key': 'ebikes_in_range', 'value': totals['ebikes_in_range']},
+                {'key': 'dockless_nearby', 'value': totals['nearby']},
+            ])
+
+        return states_list
+
+    # =============================================================================
+    def process_triggers(self) -> None:
+        """Process plugin triggers.
+
+        Examines the is_renting status of every station that has a trigger and fires the station's triggers when it
+        stops renting. Triggers are edge-triggered: they fire once when a station goes out of service (or is first
+        seen out of service), not on every poll while it stays that way. Triggers watch stations of the system selected
+        in the plugin config.
+        """
+        system = self.default_system()
+        if not system:
+            return
+
+        with self.timings.phase('triggers'):
+            for station_id, trigger_ids in list(self.master_trigger_dict.items()):
+                status = system.stations.status.get(station_id)
+                if status is None or 'is_renting' not in status:
+                    continue
+
+                is_renting  = status['is_renting']
+                was_renting = self.station_renting.get(station_id, True)
+                self.station_renting[station_id] = is_renting
+
+                if was_renting and not is_renting:
+                    station_name = system.stations.info.get(station_id, {}).get('name', station_id)
+                    indigo.server.log(f"{station_name} location is not in service.")
+                    for trigger_id in list(trigger_ids):
+                        try:
                             indigo.trigger.execute(trigger_id)
-                            indigo.server.log(f"{dev.name} location is not in service.")
+                        except Exception:  # noqa
+                            self.logger.exception("Unable to execute trigger %s." % trigger_id)
 
-        except KeyError:
-            pass
+    # =============================================================================
+    def profile_refresh(self, action: indigo.actionGroup = None) -> None:
+        """Run one forced refresh (including triggers) under cProfile and write the stats to a log file.
+
+        The file is written to the plugin's log folder (next to the `dump_bike_data()` output) and lists the functions
+        with the highest cumulative time, followed by the refresh phase timings. Feeds are downloaded on worker
+        threads, which cProfile doesn't follow; their time shows up as waiting in `fetch()` and in the `fetch:` and
+        `decode:` phase timings.
+        """
+        time_stamp  = dt.datetime.now().strftime("%Y-%m-%d %H.%M")
+        log_path    = indigo.server.getLogsFolderPath()
+        file_name   = f"{log_path}/com.fogbert.indigoplugin.bikeShare/{time_stamp} BikeShare profile.txt"
+
+        profiler = cProfile.Profile()
+        # Hold the coordinator's lock so the profiled refresh doesn't overlap a scheduled one.
+        with self.refresher.running:
+            start = time.perf_counter()
+            profiler.enable()
+            try:
+                self.perform_refresh(all_devices=True, force=True)
+                self.process_triggers()
+            finally:
+                profiler.disable()
+            elapsed = time.perf_counter() - start
+
+        stats = io.StringIO()
+        pstats.Stats(profiler, stream=stats).sort_stats("cumulative").print_stats(PROFILE_STATS_LINES)
+
+        with open(file_name, 'w', encoding="utf-8") as out_file:
+            out_file.write("BikeShare Plugin Refresh Profile\n")
+            out_file.write(f"{time_stamp}\n")
+            out_file.write(
+                f"Refresh took {elapsed:.3f} seconds ({len(self.systems)} system(s), "
+                f"{sum(len(system.stations) for system in self.systems.values())} stations).\n\n"
+            )
+            out_file.write(stats.getvalue())
+            out_file.write("\nRefresh phase timings\n")
+            out_file.write(f"{self.timings.report()}\n")
+
+        indigo.server.log(f"Refresh profile written to {file_name} (refresh took {elapsed:.3f} seconds).")
 
     # =============================================================================
     def refreshBikeAction(self, values_dict: Optional[indigo.Dict] = None) -> None:  # noqa
@@ -522,88 +1161,406 @@ class Plugin(indigo.PluginBase):
         self.refresh_bike_data()
 
     # =============================================================================
-    def refresh_bike_data(self, device: Optional[indigo.Device] = None, force: bool = False) -> None:
+    def refresh_bike_data(self, device_ids: Optional[set] = None, force: bool = False, wait: bool = False) -> None:
         """Refresh bike data based on a call from the Indigo Plugin menu.
 
         Refreshes bike data for all devices. Does not honor the "business hours" limitation, as it is assumed the
-        user wants an update regardless of time of day.
+        user wants an update regardless of time of day. The request is passed to the refresh coordinator, which merges
+        requests that arrive close together into a single download (see `perform_refresh()`).
 
         Args:
-            device (indigo.Device, optional): A specific device to refresh. If None, all devices are refreshed.
+            device_ids (set, optional): The IDs of specific devices to refresh. If None, all devices are refreshed.
             force (bool): If True, forces a refresh even if the interval has not elapsed.
+            wait (bool): If True, block until the refresh has finished.
         """
+        self.refresher.request(device_ids=device_ids, force=force, wait=wait)
+
+    # =============================================================================
+    def perform_refresh(self, all_devices: bool = True, device_ids: Optional[set] = None, force: bool = False) -> None:
+        """Download the data and update devices for a batch of merged refresh requests.
 
+        Called on the refresh coordinator's worker thread, so only one refresh runs at a time. Devices requested by ID
+        are always updated; when all devices are requested, devices are only updated once the download interval has
+        elapsed (unless `force` is True). When the "Honor Feed TTL" preference is enabled, polls follow the
+        `station_status` TTL (see `next_poll_delay()`), so devices are updated once `FEED_MIN_POLL_INTERVAL` has
+        elapsed instead.
+
+        Args:
+            all_devices (bool): If True, refresh all devices.
+            device_ids (set, optional): The IDs of specific devices to refresh.
+            force (bool): If True, forces a refresh even if the interval has not elapsed.
+        """
+        device_ids = device_ids or set()
+        if self.pluginPrefs.get('honorFeedTtl', True):
+            update_after = FEED_MIN_POLL_INTERVAL - 5
+        else:
+            update_after = int(self.pluginPrefs['downloadInterval']) - 5
+        server_calls = 0
+        devices_updated = 0
+        start = time.perf_counter()
         try:
-            self.get_bike_data()
+            self.get_bike_data(force=force)
 
             for dev in indigo.devices.iter(filter="self"):
-                # If the caller has provided a device and the device provided is not the iterated device, we skip it.
-                # This is to ensure that the refresh_bike_data method isn't run for each existing device when
-                # device_start_comm is called (it's the only place that provides a specific device instance).
-                if device and device.id != dev.id:
-                    continue
-
-                # determine if a device update is needed
-                date_diff = (dt.datetime.now() - dev.lastChanged).total_seconds()
-                time_to_refresh = date_diff > (int(self.pluginPrefs['downloadInterval']) - 5)
+                # Devices requested by ID (e.g., devices that have just been started) are always refreshed. Other devices
+                # are only refreshed when all devices were requested.
+                if dev.id not in device_ids:
+                    if not all_devices:
+                        continue
 
-                # It's not time to refresh devices yet. If force is True, we go ahead and update the device anyway.
-                if not force and not time_to_refresh:
-                    self.logger.debug("Not time to refresh devices.")
-                    continue
+                    # determine if a device update is needed
+                    date_diff = (dt.datetime.now() - dev.lastChanged).total_seconds()
+                    time_to_refresh = date_diff > update_after
 
-                states_list = []
-                dev.updateStateOnServer('onOffState', value=True, uiValue="Refreshing")
-                dev.stateListOrDisplayStateIdChanged()
+                    # It's not time to refresh devices yet. If force is True, we go ahead and update the device anyway.
+                    if not force and not time_to_refresh:
+                        self.logger.debug("Not time to refresh devices.")
+                        continue
 
                 if not dev.configured:
                     indigo.server.log(f"[{dev.name}] Skipping device because it is not fully configured.")
                     continue
 
                 elif dev.enabled:
-                    try:
-                        if self.system_data:
-                            self.parse_bike_data(dev)
-
-                            num_bikes = dev.states['num_bikes_available']
-                            num_docks = dev.states['num_docks_available']
-
-                            if dev.states['is_renting']:
-                                if self.pluginPrefs.get('ui_state', 'num_bikes') == 'num_bikes':
-                                    display_val = f"{num_bikes}"
-                                else:
-                                    display_val = f"{num_bikes} / {num_docks}"
-                                states_list.append({'key': 'onOffState', 'value': True, 'uiValue': f"{display_val}"})
-                                dev.updateStateImageOnServer(indigo.kStateImageSel.SensorOn)
-                            else:
-                                states_list.append({'key': 'onOffState', 'value': False, 'uiValue': "Not Renting"})
-                                dev.updateStateImageOnServer(indigo.kStateImageSel.Error)
-
-                        else:
-                            dev.setErrorStateOnServer("No Comm")
-                            self.logger.debug("Comm error. Sleeping until next scheduled poll.")
-                            dev.updateStateImageOnServer(indigo.kStateImageSel.Error)
-
-                    except Exception:  # noqa
-                        states_list.append({
-                            'key': 'onOffState',
-                            'value': False,
-                            'uiValue': f"{dev.states['num_bikes_available']}"
-                            },
-                        )
-                        dev.setErrorStateOnServer("Error")
-                        self.logger.exception("Error refreshing device data.")
-                        self.logger.debug("Sleeping until next scheduled poll.")
-                        dev.updateStateImageOnServer(indigo.kStateImageSel.Error)
-
-                    states_list.append({
-                        'key': 'businessHours',
-                        'value': self.open_for_business,
-                        'uiValue': str(self.open_for_business)
-                        }
-                    )
+                    server_calls += self.refresh_device(dev)
+                    devices_updated += 1
                     self.logger.info("[%s] Data refreshed." % dev.name)
-                    dev.updateStatesOnServer(states_list)
 
         except Exception:  # noqa
             self.logger.exception("There was a problem refreshing the data. Will try on next cycle.")
+
+        self.timings.record('refresh', time.perf_counter() - start)
+        self.refresh_server_calls = server_calls
+        self.logger.debug("Refreshed %s device(s) with %s server call(s)." % (devices_updated, server_calls))
+        self.logger.debug(
+            "Refresh phase timings (p50/p95 ms): %s" % {
+                phase: (stats['p50_ms'], stats['p95_ms']) for phase, stats in self.timings.summary().items()
+            }
+        )
+
+    # =============================================================================
+    def refresh_device(self, dev: indigo.Device) -> int:
+        """Update a device from the current station data.
+
+        Args:
+            dev (indigo.Device): The Indigo device instance.
+
+        Returns:
+            int: The number of server calls made.
+        """
+        server_calls = 0
+        states_list  = []
+        state_image  = None
+        start        = time.perf_counter()
+        system       = self.systems.get(self.device_source(dev))
+        try:
+            if system and system.system_data:
+                if dev.deviceTypeId == 'systemSummary':
+                    states_list, state_image = self.summary_device_states(dev, system)
+                elif dev.deviceTypeId == 'stationArea':
+                    states_list, state_image = self.area_device_states(dev, system)
+                else:
+                    states_list, state_image = self.station_device_states(dev, system)
+
+            else:
+                dev.setErrorStateOnServer("No Comm")
+                server_calls += 1
+                self.logger.debug("Comm error. Sleeping until next scheduled poll.")
+                state_image = indigo.kStateImageSel.Error
+
+        except Exception:  # noqa
+            states_list = [{
+                'key': 'onOffState',
+                'value': False,
+                'uiValue': f"{dev.states.get('num_bikes_available', dev.states.get('total_bikes', ''))}"
+                },
+            ]
+            dev.setErrorStateOnServer("Error")
+            server_calls += 1
+            self.logger.exception("Error refreshing device data.")
+            self.logger.debug("Sleeping until next scheduled poll.")
+            state_image = indigo.kStateImageSel.Error
+
+        states_list.append({
+            'key': 'businessHours',
+            'value': self.open_for_business,
+            'uiValue': str(self.open_for_business)
+            }
+        )
+        data_stale = bool(system and system.data_stale)
+        states_list.append({'key': 'dataStale', 'value': data_stale, 'uiValue': str(data_stale)})
+        self.timings.record('device_parse', time.perf_counter() - start)
+
+        with self.timings.phase('device_update'):
+            return server_calls + self.update_device_states(dev, states_list, state_image)
+
+    # =============================================================================
+    def restore_snapshots(self) -> int:
+        """Restore the last good station data saved by `refresh_system()` for each system in use.
+
+        The restored data is marked as stale (the `dataStale` device state) until the system's first download
+        completes.
+
+        Returns:
+            int: The number of systems restored.
+        """
+        restored = 0
+        for source in self.system_features():
+            snapshot = load_snapshot(self.snapshot_path(source), source, logger=self.logger)
+            if not snapshot:
+                continue
+
+            system = self.get_system(source)
+            system.restore(snapshot['feeds'])
+            saved_at = dt.datetime.fromtimestamp(snapshot['saved_at']).strftime(TIMESTAMP_FORMAT)
+            self.logger.info(
+                "[%s] Restored data for %s stations saved %s." % (system.url, len(system.stations), saved_at)
+            )
+            restored += 1
+        return restored
+
+    # =============================================================================
+    def snapshot_path(self, source: str) -> str:
+        """Return the path of a system's warm-start snapshot file."""
+        return os.path.join(self.data_folder(), snapshot_name(source))
+
+    # =============================================================================
+    def station_device_states(self, dev: indigo.Device, system: BikeSystem) -> tuple[list[dict], object]:
+        """Build the states and state image for a Bike Share Station device.
+
+        Args:
+            dev (indigo.Device): The Indigo device instance.
+            system (BikeSystem): The device's system.
+
+        Returns:
+            tuple: (list of state dicts, indigo.kStateImageSel value).
+        """
+        states_list = self.parse_bike_data(dev, system)
+        new_values  = {state['key']: state['value'] for state in states_list}
+
+        num_bikes = new_values.get('num_bikes_available', dev.states['num_bikes_available'])
+        num_docks = new_values.get('num_docks_available', dev.states['num_docks_available'])
+
+        if new_values.get('is_renting', dev.states['is_renting']):
+            if self.pluginPrefs.get('ui_state', 'num_bikes') == 'num_bikes':
+                display_val = f"{num_bikes}"
+            else:
+                display_val = f"{num_bikes} / {num_docks}"
+            states_list.append({'key': 'onOffState', 'value': True, 'uiValue': f"{display_val}"})
+            return states_list, indigo.kStateImageSel.SensorOn
+
+        states_list.append({'key': 'onOffState', 'value': False, 'uiValue': "Not Renting"})
+        return states_list, indigo.kStateImageSel.Error
+
+    # =============================================================================
+    def area_device_states(self, dev: indigo.Device, system: BikeSystem) -> tuple[list[dict], object]:
+        """Build the states and state image for a Bike Share Area device.
+
+        Totals the bikes and docks at renting stations within the device's radius using the spatial index.
+
+        Args:
+            dev (indigo.Device): The Indigo device instance.
+            system (BikeSystem): The device's system.
+
+        Returns:
+            tuple: (list of state dicts, indigo.kStateImageSel value).
+        """
+        lat, lon = self.device_location(dev)
+        totals   = system.stations.area_totals(lat, lon, float(dev.pluginProps.get('radius', 500)))
+        nearest  = system.stations.info.get(totals['nearest_id'], {}).get('name', "")
+
+        states_list = [
+            {'key': 'station_count', 'value': totals['station_count']},
+            {'key': 'bikes_available', 'value': totals['bikes']},
+            {'key': 'ebikes_available', 'value': totals['ebikes']},
+            {'key': 'docks_available', 'value': totals['docks']},
+            {'key': 'nearest_station', 'value': nearest},
+            {'key': 'nearest_distance', 'value': totals['nearest_distance']},
+        ]
+        if not totals['station_count']:
+            states_list.append({'key': 'onOffState', 'value': False, 'uiValue': "No Stations"})
+            return states_list, indigo.kStateImageSel.Error
+
+        if self.pluginPrefs.get('ui_state', 'num_bikes') == 'num_bikes':
+            display_val = f"{totals['bikes']}"
+        else:
+            display_val = f"{totals['bikes']} / {totals['docks']}"
+        states_list.append({'key': 'onOffState', 'value': True, 'uiValue': display_val})
+        return states_list, indigo.kStateImageSel.SensorOn
+
+    # =============================================================================
+    def device_location(self, dev: indigo.Device) -> tuple[float, float]:
+        """Return the point a Bike Share Area device is centered on.
+
+        Falls back to the Indigo server's location when the device doesn't specify one.
+
+        Args:
+            dev (indigo.Device): The Indigo device instance.
+
+        Returns:
+            tuple: (latitude, longitude).
+        """
+        try:
+            return float(dev.pluginProps['latitude']), float(dev.pluginProps['longitude'])
+        except (KeyError, TypeError, ValueError):
+            return indigo.server.getLatitudeAndLongitude()
+
+    # =============================================================================
+    @staticmethod
+    def parse_location(text: str) -> Optional[tuple[float, float]]:
+        """Parse a "lat, lon" string.
+
+        Args:
+            text (str): The text to parse.
+
+        Returns:
+            tuple: (latitude, longitude), or None if the text isn't a valid location.
+        """
+        try:
+            lat, lon = (float(part) for part in text.split(","))
+        except (AttributeError, ValueError):
+            return None
+        if -90 <= lat <= 90 and -180 <= lon <= 180:
+            return lat, lon
+        return None
+
+    # =============================================================================
+    def stations_near_point(self, action: indigo.actionGroup = None, dev: Optional[indigo.Device] = None, caller_waiting_for_result: bool = None) -> list[dict]:  # noqa
+        """Log (and return) the stations within a radius of a point based on a call from an Indigo Action item.
+
+        The action props are `latitude` and `longitude` (default to the Indigo server's location) and `radius` in
+        meters (defaults to 500). Stations are listed from the system selected in the plugin config. Invalid props are
+        logged as an error.
+
+        Args:
+            action (indigo.actionGroup): The action instance.
+            dev (indigo.Device): The device (unused).
+            caller_waiting_for_result (bool): True if the caller is waiting for the result.
+
+        Returns:
+            list: A list of dicts with each station's id, name, distance and availability, closest first (empty if
+                the action props are invalid).
+        """
+        props = action.props
+        if props.get('latitude', "") in ("", None) and props.get('longitude', "") in ("", None):
+            lat, lon = indigo.server.getLatitudeAndLongitude()
+        else:
+            try:
+                lat, lon = float(props['latitude']), float(props['longitude'])
+            except (KeyError, TypeError, ValueError):
+                lat = lon = None
+            if lat is None or not (-90 <= lat <= 90 and -180 <= lon <= 180):
+                self.logger.error(
+                    "Stations Near Point: invalid location %r, %r. Latitude must be between -90 and 90 and longitude "
+                    "between -180 and 180.", props.get('latitude'), props.get('longitude')
+                )
+                return []
+
+        try:
+            radius = float(props.get('radius', 500) or 500)
+        except (TypeError, ValueError):
+            radius = None
+        if radius is None or not 0 <= radius < math.inf:
+            self.logger.error(
+                "Stations Near Point: invalid radius %r. The radius must be a number of meters (0 or more).",
+                props.get('radius')
+            )
+            return []
+
+        results = []
+        system  = self.default_system()
+        nearby  = system.stations.spatial.within(lat, lon, radius) if system else []
+        for distance, station_id in nearby:
+            station = system.stations.get(station_id) or {}
+            results.append({
+                'station_id': station_id,
+                'name': station.get('name', station_id),
+                'distance': round(distance),
+                'num_bikes_available': station.get('num_bikes_available', 'Unknown'),
+                'num_docks_available': station.get('num_docks_available', 'Unknown'),
+                'is_renting': station.get('is_renting', 'Unknown'),
+            })
+
+        indigo.server.log(f"{len(results)} station(s) within {radius:,.0f} m of {lat}, {lon}.")
+        for result in results:
+            indigo.server.log(
+                f"  {result['name']} ({result['distance']} m): {result['num_bikes_available']} bikes, "
+                f"{result['num_docks_available']} docks"
+            )
+        return results
+
+    # =============================================================================
+    def summary_device_states(self, dev: indigo.Device, system: BikeSystem) -> tuple[list[dict], object]:
+        """Build the states and state image for a System Summary device.
+
+        The system statistics are computed once per `station_status` download (see `BikeSystem.refresh()`).
+
+        Args:
+            dev (indigo.Device): The Indigo device instance.
+            system (BikeSystem): The device's system.
+
+        Returns:
+            tuple: (list of state dicts, indigo.kStateImageSel value).
+        """
+        stats = system.system_stats
+        if not stats:
+            return [{'key': 'onOffState', 'value': False, 'uiValue': "No Data"}], indigo.kStateImageSel.Error
+
+        states_list = [
+            {'key': key, 'value': stats[key]} for key in (
+                'disabled_dock_ratio',
+                'station_count',
+                'stations_empty_pct',
+                'stations_full_pct',
+                'total_bikes',
+                'total_bikes_disabled',
+                'total_docks',
+                'total_docks_disabled',
+                'total_ebikes',
+            )
+        ]
+        region_totals = "; ".join(
+            f"{totals['name']}: {totals['bikes']} / {totals['docks']}" for totals in stats['regions'].values()
+        )
+        states_list.append({'key': 'region_totals', 'value': region_totals})
+        states_list.append({'key': 'onOffState', 'value': True, 'uiValue': f"{stats['total_bikes']}"})
+        return states_list, indigo.kStateImageSel.SensorOn
+
+    # =============================================================================
+    @staticmethod
+    def update_device_states(dev: indigo.Device, states_list: list[dict], state_image=None) -> int:
+        """Send only the changed device states (and state image) to the Indigo server.
+
+        Each state is compared with the device's current value (and, where a `uiValue` is supplied, the current
+        `<state>.ui` value); unchanged states are dropped and the rest are sent in a single `updateStatesOnServer()`
+        call. The state image is only sent when it differs from the device's current image.
+
+        Args:
+            dev (indigo.Device): The Indigo device instance to update.
+            states_list (list): A list of state dicts suitable for `updateStatesOnServer()`.
+            state_image (indigo.kStateImageSel): The desired state image, or None to leave it alone.
+
+        Returns:
+            int: The number of server calls made.
+        """
+        calls   = 0
+        current = dev.states
+        changed = {}
+        for state in states_list:
+            key = state['key']
+            if key in current and current[key] == state['value']:
+                if 'uiValue' not in state or current.get(f"{key}.ui", state['uiValue']) == state['uiValue']:
+                    changed.pop(key, None)
+                    continue
+            # Later entries for the same key win, just as they would on the server.
+            changed[key] = state
+
+        if changed:
+            dev.updateStatesOnServer(list(changed.values()))
+            calls += 1
+
+        if state_image is not None and getattr(dev, 'displayStateImageSel', None) != state_image:
+            dev.updateStateImageOnServer(state_image)
+            calls += 1
+
+        return calls
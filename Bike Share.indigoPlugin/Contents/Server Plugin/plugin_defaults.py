@@ -2,8 +2,14 @@ kDefaultPluginPrefs = {
     'bikeSharingService':  "",
     'bike_system': "",
     'downloadInterval':   895,   # Frequency of updates.
+    'extraFeeds': "",
+    'historyEnabled': False,
+    'historyRetention': "30",
+    'honorFeedTtl': True,
+    'http2': False,
     'language': "en",
     'showDebugLevel':    "30",   # Default logging level
+    'systemListTtl': "86400",
     'ui_state': "num_bikes",
     'start_time': "00:00",
     'stop_time': "23:00"
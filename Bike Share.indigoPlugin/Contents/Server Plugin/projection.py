@@ -0,0 +1,157 @@
+"""
+Streaming GBFS feed decoding with field projection
+
+The projection.py module decodes the GBFS feeds the plugin consumes while keeping only the fields the plugin uses
+(see `FEED_PROJECTIONS`). When the optional `ijson` package is installed, the response body is parsed incrementally as
+it arrives, one station at a time, so the full document is never held in memory. Otherwise the document is decoded with
+`json` and projected afterward.
+
+A projected feed keeps the GBFS document shape (`last_updated`, `ttl`, `version` and `data.<list>`), so the rest of the
+plugin doesn't need to know which path was used.
+"""
+
+# ================================== IMPORTS ==================================
+
+# Built-in modules
+import json
+from typing import Callable, Iterable
+
+# Third-party modules
+try:
+    import ijson  # ijson is optional; feeds are decoded with `json` when it isn't installed.
+except ImportError:
+    ijson = None
+
+DOCUMENT_KEYS = ('last_updated', 'ttl', 'version')
+
+
+# =============================================================================
+class _ChunkReader:
+    """Minimal file-like wrapper that lets `ijson` read from an iterator of byte chunks."""
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._buffer = b""
+
+    # =============================================================================
+    def read(self, size: int = -1) -> bytes:
+        """Return up to `size` bytes (or everything that's left if `size` is negative)."""
+        while size < 0 or len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        if size < 0:
+            data, self._buffer = self._buffer, b""
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+# =============================================================================
+def project_record(record: dict, fields: tuple, record_type: Callable = dict):
+    """Return a copy of a feed record that only contains the projected fields.
+
+    Args:
+        record (dict): A station (or region) record from a GBFS feed.
+        fields (tuple): The field names to keep.
+        record_type (callable): Builds the projected record from a dict of its fields.
+
+    Returns:
+        The projected record.
+    """
+    return record_type({key: record[key] for key in fields if key in record})
+
+
+# =============================================================================
+def project_document(document: dict, list_key: str, fields: tuple, record_type: Callable = dict) -> dict:
+    """Project a decoded GBFS document.
+
+    Args:
+        document (dict): The decoded GBFS document.
+        list_key (str): The name of the record list under `data` (e.g., `stations`).
+        fields (tuple): The record fields to keep.
+        record_type (callable): Builds each projected record from a dict of its fields.
+
+    Returns:
+        dict: The projected document.
+    """
+    projected = {key: document[key] for key in DOCUMENT_KEYS if key in document}
+    records   = (document.get('data') or {}).get(list_key) or []
+    projected['data'] = {list_key: [project_record(record, fields, record_type) for record in records]}
+    return projected
+
+
+# =============================================================================
+def stream_document(chunks: Iterable[bytes], list_key: str, fields: tuple, record_type: Callable = dict) -> dict:
+    """Incrementally decode and project a GBFS document with `ijson`.
+
+    Only the document metadata and the projected fields of each `data.<list_key>` record are materialized; everything
+    else is skipped as it's parsed.
+
+    Args:
+        chunks (iterable): The response body as an iterator of byte chunks.
+        list_key (str): The name of the record list under `data` (e.g., `stations`).
+        fields (tuple): The record fields to keep.
+        record_type (callable): Builds each projected record from a dict of its fields.
+
+    Returns:
+        dict: The projected document.
+
+    Raises:
+        ValueError: If the document isn't valid JSON.
+    """
+    item_prefix = f"data.{list_key}.item"
+    field_keys  = {f"{item_prefix}.{key}": key for key in fields}
+    document = {}
+    records  = []
+    record   = None  # The record being parsed.
+    builder  = None  # Builds a projected field whose value is an object or array.
+    builder_prefix = ""
+
+    try:
+        for prefix, event, value in ijson.parse(_ChunkReader(chunks), use_float=True):
+            if builder is not None:
+                builder.event(event, value)
+                if prefix == builder_prefix and event in ('end_map', 'end_array'):
+                    record[field_keys[prefix]] = builder.value
+                    builder = None
+            elif record is not None:
+                if prefix == item_prefix and event == 'end_map':
+                    records.append(record_type(record))
+                    record = None
+                elif prefix in field_keys:
+                    if event in ('start_map', 'start_array'):
+                        builder, builder_prefix = ijson.ObjectBuilder(), prefix
+                        builder.event(event, value)
+                    else:
+                        record[field_keys[prefix]] = value
+            elif prefix == item_prefix and event == 'start_map':
+                record = {}
+            elif prefix in DOCUMENT_KEYS and event in ('string', 'number', 'integer', 'double'):
+                document[prefix] = value
+    except ijson.JSONError as err:
+        raise ValueError(f"Invalid JSON: {err}") from err
+
+    document['data'] = {list_key: records}
+    return document
+
+
+# =============================================================================
+def decode_feed(chunks: Iterable[bytes], list_key: str, fields: tuple, record_type: Callable = dict) -> dict:
+    """Decode and project a GBFS document, streaming when `ijson` is available.
+
+    Args:
+        chunks (iterable): The response body as an iterator of byte chunks.
+        list_key (str): The name of the record list under `data` (e.g., `stations`).
+        fields (tuple): The record fields to keep.
+        record_type (callable): Builds each projected record from a dict of its fields.
+
+    Returns:
+        dict: The projected document.
+
+    Raises:
+        ValueError: If the document isn't valid JSON.
+    """
+    if ijson is not None:
+        return stream_document(chunks, list_key, fields, record_type)
+    return project_document(json.loads(b"".join(chunks)), list_key, fields, record_type)
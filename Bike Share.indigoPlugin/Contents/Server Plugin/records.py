@@ -0,0 +1,159 @@
+"""
+Compact station records
+
+The records.py module defines the in-memory representation of projected GBFS records. Each feed in `FEED_PROJECTIONS`
+gets a record class whose fields are `__slots__`, so a record carries no per-instance `__dict__` and no hash table of
+keys. Records support the read-only parts of the mapping interface (`get()`, `[]`, `in`, `keys()` and `items()`) so
+they can be used wherever the plugin previously used the decoded feed dicts. A field that wasn't present in the feed
+is simply unset, which `get()` and `in` treat the same way as a missing dict key.
+"""
+
+# ================================== IMPORTS ==================================
+
+# Built-in modules
+import sys
+
+# My modules
+from constants import FEED_PROJECTIONS  # noqa
+
+
+# =============================================================================
+class Record:
+    """Base class for slotted feed records."""
+    __slots__ = ()
+    _fields: frozenset = frozenset()
+
+    def __init__(self, mapping: dict = None):
+        """Record initialization.
+
+        Args:
+            mapping (dict): The field values (keys that aren't record fields are ignored).
+        """
+        for key, value in (mapping or {}).items():
+            if key in self._fields:
+                setattr(self, key, value)
+
+    # =============================================================================
+    def get(self, key: str, default=None):
+        """Return a field's value, or `default` if the field isn't set."""
+        if key in self._fields:
+            return getattr(self, key, default)
+        return default
+
+    # =============================================================================
+    def keys(self) -> list:
+        """Return the names of the fields that are set."""
+        return [key for key in self.__slots__ if hasattr(self, key)]
+
+    # =============================================================================
+    def items(self) -> list:
+        """Return (field, value) pairs for the fields that are set."""
+        return [(key, getattr(self, key)) for key in self.keys()]
+
+    # =============================================================================
+    def as_dict(self) -> dict:
+        """Return the record as a plain dict (e.g., for JSON serialization)."""
+        return dict(self.items())
+
+    # =============================================================================
+    def __getitem__(self, key: str):
+        try:
+            if key in self._fields:
+                return getattr(self, key)
+        except AttributeError:
+            pass
+        raise KeyError(key)
+
+    # =============================================================================
+    def __setitem__(self, key: str, value) -> None:
+        if key not in self._fields:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    # =============================================================================
+    def __contains__(self, key: str) -> bool:
+        return key in self._fields and hasattr(self, key)
+
+    # =============================================================================
+    def __iter__(self):
+        return iter(self.keys())
+
+    # =============================================================================
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    # =============================================================================
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (Record, dict)):
+            return self.as_dict() == dict(other.items())
+        return NotImplemented
+
+    # =============================================================================
+    def __repr__(self) -> str:
+        return repr(self.as_dict())
+
+
+# =============================================================================
+def make_record_type(name: str, fields: tuple) -> type:
+    """Create a slotted record class.
+
+    Args:
+        name (str): The class name.
+        fields (tuple): The record's field names.
+
+    Returns:
+        type: A `Record` subclass with one slot per field.
+    """
+    return type(name, (Record,), {'__slots__': tuple(fields), '_fields': frozenset(fields)})
+
+
+RECORD_TYPES = {
+    feed: make_record_type(
+        "".join(part.title() for part in feed.split("_")) + "Record", fields
+    ) for feed, (_, fields) in FEED_PROJECTIONS.items()
+}
+
+
+# =============================================================================
+def as_record(feed: str, record) -> Record:
+    """Return a feed record as the feed's record class (records that already are are returned unchanged).
+
+    Args:
+        feed (str): The feed name (e.g., `station_status`).
+        record (dict | Record): The record.
+
+    Returns:
+        Record: The compact record.
+    """
+    if isinstance(record, Record):
+        return record
+    return RECORD_TYPES[feed](record)
+
+
+# =============================================================================
+def json_default(value):
+    """`json.dump()` hook that serializes records as plain objects."""
+    if isinstance(value, Record):
+        return value.as_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+# =============================================================================
+def footprint(records) -> dict:
+    """Estimate the memory held by a collection of records.
+
+    Sizes are shallow (`sys.getsizeof()` of each record, not the values it refers to) and are compared with the same
+    records held as dicts.
+
+    Args:
+        records (iterable): The records to measure.
+
+    Returns:
+        dict: The record count, the bytes used by the records, and the bytes the same records would use as dicts.
+    """
+    count, record_bytes, dict_bytes = 0, 0, 0
+    for record in records:
+        count        += 1
+        record_bytes += sys.getsizeof(record)
+        dict_bytes   += sys.getsizeof(record.as_dict() if isinstance(record, Record) else record)
+    return {'records': count, 'record_bytes': record_bytes, 'dict_bytes': dict_bytes}
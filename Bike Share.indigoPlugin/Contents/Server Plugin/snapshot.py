@@ -0,0 +1,96 @@
+"""
+Warm-start snapshot of the last good system data
+
+The snapshot.py module persists the feeds that devices are built from (`station_information`, `station_status` and
+`system_regions`) after each successful download, and restores them when the plugin starts. Devices can then be
+populated immediately from the last known data (marked as stale) while the first download is in progress. The
+snapshot is stored as compact gzipped JSON and is only restored for the system and language it was saved for. Each
+system in use has its own snapshot file (see `snapshot_name()`).
+"""
+
+# ================================== IMPORTS ==================================
+
+# Built-in modules
+import gzip
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Optional
+
+# My modules
+from constants import SNAPSHOT_FEEDS  # noqa
+from records import json_default  # noqa
+
+
+# =============================================================================
+def snapshot_name(source: str) -> str:
+    """Return the snapshot file name for a system.
+
+    Args:
+        source (str): The system (`<auto-discovery url>|<language>`).
+
+    Returns:
+        str: The file name.
+    """
+    return f"snapshot-{hashlib.sha1(source.encode('utf-8')).hexdigest()[:12]}.json.gz"
+
+
+# =============================================================================
+def save_snapshot(file_path: str, system_data: dict, source: str, logger: Optional[logging.Logger] = None) -> bool:
+    """Write the feeds needed to build devices to disk.
+
+    Args:
+        file_path (str): The path of the snapshot file.
+        system_data (dict): The downloaded feeds keyed by feed name.
+        source (str): The system the data belongs to (`<auto-discovery url>|<language>`).
+        logger (logging.Logger): The plugin logger.
+
+    Returns:
+        bool: True if the snapshot was written.
+    """
+    logger = logger or logging.getLogger("Plugin")
+    feeds  = {name: system_data[name] for name in SNAPSHOT_FEEDS if name in system_data}
+    if 'station_status' not in feeds:
+        return False
+
+    temp_path = f"{file_path}.tmp"
+    try:
+        with gzip.open(temp_path, 'wt', encoding="utf-8", compresslevel=5) as out_file:
+            json.dump(
+                {'saved_at': time.time(), 'source': source, 'feeds': feeds},
+                out_file, separators=(',', ':'), default=json_default
+            )
+        os.replace(temp_path, file_path)
+        return True
+    except (OSError, TypeError, ValueError):
+        logger.warning("Unable to save the station data snapshot to %s." % file_path)
+        return False
+
+
+# =============================================================================
+def load_snapshot(file_path: str, source: str, logger: Optional[logging.Logger] = None) -> Optional[dict]:
+    """Read a snapshot written by `save_snapshot()`.
+
+    Args:
+        file_path (str): The path of the snapshot file.
+        source (str): The system the plugin is configured for (`<auto-discovery url>|<language>`).
+        logger (logging.Logger): The plugin logger.
+
+    Returns:
+        dict: {'saved_at': POSIX time, 'feeds': {feed name: payload}}, or None if there is no usable snapshot for
+              the configured system.
+    """
+    logger = logger or logging.getLogger("Plugin")
+    try:
+        with gzip.open(file_path, 'rt', encoding="utf-8") as in_file:
+            snapshot = json.load(in_file)
+        if snapshot.get('source') != source or not isinstance(snapshot.get('feeds'), dict):
+            return None
+        return {'saved_at': float(snapshot.get('saved_at', 0)), 'feeds': snapshot['feeds']}
+    except FileNotFoundError:
+        return None
+    except (OSError, EOFError, ValueError, TypeError, AttributeError):
+        logger.warning("Unable to read the station data snapshot. It will be replaced after the next download.")
+        return None
@@ -0,0 +1,214 @@
+"""
+Spatial index for station locations
+
+The spatial.py module provides a grid hash over station coordinates. Stations are bucketed into roughly square cells
+once whenever `station_information` changes, so radius and nearest-N queries only measure the distance to stations in
+nearby cells instead of every station in the system.
+"""
+
+# ================================== IMPORTS ==================================
+
+# Built-in modules
+import heapq
+import math
+from typing import Iterable, Optional
+
+# My modules
+from constants import SPATIAL_CELL_SIZE  # noqa
+
+EARTH_RADIUS = 6_371_000  # meters
+
+
+# =============================================================================
+def haversine(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Return the great-circle distance between two points in meters.
+
+    Args:
+        lat1 (float): Latitude of the first point.
+        lon1 (float): Longitude of the first point.
+        lat2 (float): Latitude of the second point.
+        lon2 (float): Longitude of the second point.
+
+    Returns:
+        float: The distance in meters.
+    """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi    = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS * math.asin(min(1.0, math.sqrt(a)))
+
+
+# =============================================================================
+class GridIndex:
+    """Grid hash of points keyed by an id."""
+    def __init__(self, points: Iterable[tuple[str, float, float]] = (), cell_size: float = SPATIAL_CELL_SIZE):
+        """Build the index.
+
+        Args:
+            points (iterable): (id, latitude, longitude) tuples.
+            cell_size (float): The approximate cell edge length in meters.
+        """
+        self.cell_size = cell_size
+        self.points: dict = {}
+        self.cells: dict = {}
+
+        points = [(key, float(lat), float(lon)) for key, lat, lon in points]
+        mean_lat = sum(lat for _, lat, _ in points) / len(points) if points else 0.0
+
+        # Cell sizes in degrees. Longitude degrees shrink toward the poles, so scale by the system's mean latitude.
+        self.lat_step = cell_size / 111_320
+        self.lon_step = cell_size / (111_320 * max(math.cos(math.radians(mean_lat)), 0.01))
+        # Cells are narrower (in meters) than `cell_size` at latitudes farther from the equator than the mean.
+        self.max_abs_lat = max((abs(lat) for _, lat, _ in points), default=0.0)
+
+        for key, lat, lon in points:
+            self.points[key] = (lat, lon)
+            self.cells.setdefault(self._cell(lat, lon), []).append(key)
+
+        # The (min row, max row, min col, max col) of the occupied cells, so `nearest()` knows when to stop searching.
+        rows = [row for row, _ in self.cells]
+        cols = [col for _, col in self.cells]
+        self.bounds = (min(rows), max(rows), min(cols), max(cols)) if self.cells else (0, 0, 0, 0)
+
+    # =============================================================================
+    @classmethod
+    def from_stations(cls, info: dict) -> "GridIndex":
+        """Build an index from the `station_information` index.
+
+        Stations without usable coordinates are left out.
+
+        Args:
+            info (dict): The `station_information` index ({station_id: info dict}).
+
+        Returns:
+            GridIndex: The spatial index.
+        """
+        points = []
+        for station_id, station in info.items():
+            try:
+                points.append((station_id, float(station['lat']), float(station['lon'])))
+            except (KeyError, TypeError, ValueError):
+                continue
+        return cls(points)
+
+    # =============================================================================
+    def _cell(self, lat: float, lon: float) -> tuple[int, int]:
+        """Return the grid cell that contains a point."""
+        return math.floor(lat / self.lat_step), math.floor(lon / self.lon_step)
+
+    # =============================================================================
+    def _cell_width(self, lat: float) -> float:
+        """Return the narrowest cell edge in meters between a location and the indexed points.
+
+        A point `ring + 1` cells away from a location is at least `ring * _cell_width(lat)` meters away from it.
+        """
+        widest = min(max(abs(lat), self.max_abs_lat), 90)
+        scale  = math.cos(math.radians(widest)) * 111_320 * self.lon_step / self.cell_size
+        return self.cell_size * min(max(scale, 1e-6), 1.0)
+
+    # =============================================================================
+    def _ring(self, center: tuple[int, int], ring: int) -> Iterable[tuple[int, int]]:
+        """Yield the cells on the square ring `ring` cells away from `center`."""
+        row, col = center
+        if ring == 0:
+            yield center
+            return
+        for d_col in range(-ring, ring + 1):
+            yield row - ring, col + d_col
+            yield row + ring, col + d_col
+        for d_row in range(-ring + 1, ring):
+            yield row + d_row, col - ring
+            yield row + d_row, col + ring
+
+    # =============================================================================
+    def within(self, lat: float, lon: float, radius: float) -> list[tuple[float, str]]:
+        """Return the points within a radius of a location.
+
+        Args:
+            lat (float): The latitude of the location.
+            lon (float): The longitude of the location.
+            radius (float): The search radius in meters.
+
+        Returns:
+            list: (distance in meters, id) tuples sorted by distance.
+        """
+        if not self.points:
+            return []
+        center = self._cell(lat, lon)
+        rings  = int(math.ceil(radius / self._cell_width(lat))) + 1
+        found  = []
+        if (2 * rings + 1) ** 2 > len(self.cells):
+            # A large radius covers more cells than are occupied; check the occupied cells instead of every cell.
+            cells = [cell for cell in self.cells
+                     if max(abs(cell[0] - center[0]), abs(cell[1] - center[1])) <= rings]
+        else:
+            cells = (cell for ring in range(rings + 1) for cell in self._ring(center, ring))
+        for cell in cells:
+            for key in self.cells.get(cell, ()):
+                distance = haversine(lat, lon, *self.points[key])
+                if distance <= radius:
+                    found.append((distance, key))
+        return sorted(found)
+
+    # =============================================================================
+    def nearest(self, lat: float, lon: float, count: int = 1, max_distance: Optional[float] = None) -> list[tuple[float, str]]:
+        """Return the points nearest to a location.
+
+        Rings of cells are searched outward from the location until `count` points have been found and the next ring
+        can't contain anything closer. A ring `r` cells out is at least `r` narrowest cell widths away; cells are
+        narrower than `cell_size` east-west at latitudes farther from the equator than the system's mean.
+
+        Args:
+            lat (float): The latitude of the location.
+            lon (float): The longitude of the location.
+            count (int): The number of points to return.
+            max_distance (float): Optional maximum distance in meters.
+
+        Returns:
+            list: Up to `count` (distance in meters, id) tuples sorted by distance.
+        """
+        if not self.points or count < 1:
+            return []
+        center    = self._cell(lat, lon)
+        best      = []  # max-heap of (-distance, id)
+        min_row, max_row, min_col, max_col = self.bounds
+        max_rings = max(abs(center[0] - min_row), abs(center[0] - max_row),
+                        abs(center[1] - min_col), abs(center[1] - max_col))
+        ring      = 0
+        width     = self._cell_width(lat)
+        # A point is at least `EARTH_RADIUS * latitude difference` away, so points outside this band are skipped without
+        # measuring the distance.
+        lat_reach = math.degrees(max_distance / EARTH_RADIUS) if max_distance is not None else math.inf
+        while ring <= max_rings:
+            # Once a ring has more cells than are occupied (e.g., far from the system), check the remaining occupied
+            # cells directly instead of walking rings of empty cells.
+            last  = 8 * ring > len(self.cells)
+            cells = ([cell for cell in self.cells if max(abs(cell[0] - center[0]), abs(cell[1] - center[1])) >= ring]
+                     if last else self._ring(center, ring))
+            for cell in cells:
+                for key in self.cells.get(cell, ()):
+                    point_lat, point_lon = self.points[key]
+                    if abs(point_lat - lat) > lat_reach:
+                        continue
+                    distance = haversine(lat, lon, point_lat, point_lon)
+                    if max_distance is not None and distance > max_distance:
+                        continue
+                    if len(best) < count:
+                        heapq.heappush(best, (-distance, key))
+                    elif distance < -best[0][0]:
+                        heapq.heapreplace(best, (-distance, key))
+            if last:
+                break
+            # Anything in ring + 1 is at least `ring * width` away.
+            reach = ring * width
+            if len(best) >= count and -best[0][0] <= reach:
+                break
+            if max_distance is not None and reach > max_distance:
+                break
+            ring += 1
+        return sorted((-distance, key) for distance, key in best)
+
+    # =============================================================================
+    def __len__(self) -> int:
+        return len(self.points)
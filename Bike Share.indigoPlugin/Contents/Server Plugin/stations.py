@@ -0,0 +1,318 @@
+"""
+Indexed station store
+
+The stations.py module builds lookup tables from the GBFS `station_information` and `station_status` feeds once per
+download so that device parsing, station menus and triggers can find a station in constant time instead of scanning
+the full feed for every device. When only `station_status` has changed since the previous build, the status index is
+refreshed without rebuilding the station information index.
+
+The sorted (station_id, name) list used by station menus and the spatial index of station locations are computed once
+per `station_information` change. Free-floating vehicles are joined to stations (see `vehicles.py`) once per vehicle
+feed download.
+
+Stations are held as compact slotted records (see `records.py`) keyed by interned station ids. The records in the
+indexes are the same objects as the records in the downloaded feeds, so indexing doesn't copy them.
+"""
+
+# ================================== IMPORTS ==================================
+
+# Built-in modules
+import sys
+import threading
+from typing import Optional
+
+# My modules
+from records import as_record, footprint  # noqa
+from spatial import GridIndex  # noqa
+from vehicles import feed_records, join_vehicles, vehicle_feed  # noqa
+
+
+# =============================================================================
+def feed_stations(system_data: dict, feed: str) -> Optional[list]:
+    """Return the list of stations in a GBFS feed.
+
+    Args:
+        system_data (dict): The downloaded feeds keyed by feed name.
+        feed (str): The feed name (e.g., `station_status`).
+
+    Returns:
+        list: The feed's station list, or None if the feed isn't available.
+    """
+    try:
+        return system_data[feed]['data']['stations']
+    except (KeyError, TypeError):
+        return None
+
+
+# =============================================================================
+class StationView:
+    """Read-only merged view of a station's information and status records.
+
+    Status fields take precedence over information fields with the same name.
+    """
+    __slots__ = ('info', 'status')
+
+    def __init__(self, info=None, status=None):
+        self.info   = info
+        self.status = status
+
+    # =============================================================================
+    def get(self, key: str, default=None):
+        """Return a field's value from the status record, then the information record."""
+        for record in (self.status, self.info):
+            if record is not None and key in record:
+                return record[key]
+        return default
+
+    # =============================================================================
+    def __getitem__(self, key: str):
+        value = self.get(key, StationView)
+        if value is StationView:
+            raise KeyError(key)
+        return value
+
+    # =============================================================================
+    def __contains__(self, key: str) -> bool:
+        return any(record is not None and key in record for record in (self.status, self.info))
+
+    # =============================================================================
+    def as_dict(self) -> dict:
+        """Return the merged station as a plain dict."""
+        return {**dict((self.info or {}).items()), **dict((self.status or {}).items())}
+
+    # =============================================================================
+    def __repr__(self) -> str:
+        return repr(self.as_dict())
+
+
+# =============================================================================
+class StationStore:
+    """Station records keyed by `station_id`.
+
+    `info` holds the `station_information` records and `status` holds the `station_status` records (with `is_renting`
+    and `is_returning` coerced to bool). `get()` returns a merged view of both records for a station. `vehicles` holds
+    the free-floating vehicle totals for each station with vehicles (see `vehicles.join_vehicles()`); `has_vehicles` is
+    True while the system publishes a vehicle feed.
+    """
+    def __init__(self):
+        self.info: dict = {}
+        self.status: dict = {}
+        self.vehicles: dict = {}
+        self.has_vehicles = False
+        self.spatial = GridIndex()
+        self.info_version = 0
+        self.status_version = 0
+
+        self._info_source = None
+        self._status_source = None
+        self._vehicle_sources = (None, None, None)
+        self._menu: list = []
+        self._menu_version = -1
+        self._lock = threading.Lock()
+
+    # =============================================================================
+    @staticmethod
+    def _index(feed: str, stations: list) -> dict:
+        """Index feed records by interned station id.
+
+        Records are converted to the feed's compact record class if they aren't already (e.g., when restored from the
+        warm-start snapshot). Records that already are compact are indexed in place.
+
+        Args:
+            feed (str): The feed name (`station_information` or `station_status`).
+            stations (list): The feed's station list.
+
+        Returns:
+            dict: A dict of {station_id: record}.
+        """
+        index = {}
+        for station in stations:
+            record = as_record(feed, station)
+            station_id = sys.intern(str(record['station_id']))
+            record['station_id'] = station_id
+            if feed == 'station_status':
+                for key in ('is_renting', 'is_returning'):
+                    if key in record:
+                        record[key] = record[key] in (1, True, "1", "true")
+            index[station_id] = record
+        return index
+
+    # =============================================================================
+    def update(self, system_data: dict) -> bool:
+        """Rebuild the indexes from freshly downloaded system data.
+
+        The feed payloads are compared by identity: a feed that was carried forward from the previous download (or
+        answered from the conditional GET cache) is not re-indexed.
+
+        Args:
+            system_data (dict): The downloaded feeds keyed by feed name.
+
+        Returns:
+            bool: True if anything was re-indexed.
+        """
+        info_source   = feed_stations(system_data, 'station_information')
+        status_source = feed_stations(system_data, 'station_status')
+
+        with self._lock:
+            info_changed   = info_source is not self._info_source
+            status_changed = status_source is not self._status_source
+            if not (info_changed or status_changed):
+                return False
+
+            if info_changed:
+                self.info = self._index('station_information', info_source or [])
+                self.spatial = GridIndex.from_stations(self.info)
+                self._info_source = info_source
+                self.info_version += 1
+
+            if status_changed:
+                self.status = self._index('station_status', status_source or [])
+                self._status_source = status_source
+                self.status_version += 1
+            return True
+
+    # =============================================================================
+    def update_vehicles(self, system_data: dict) -> bool:
+        """Rejoin the free-floating vehicles to stations.
+
+        Call after `update()`. The vehicles are only rejoined when the vehicle feed, the `vehicle_types` feed or the
+        station locations have changed (compared by identity, as in `update()`).
+
+        Args:
+            system_data (dict): The downloaded feeds keyed by feed name.
+
+        Returns:
+            bool: True if the vehicles were rejoined.
+        """
+        with self._lock:
+            vehicles = vehicle_feed(system_data)
+            sources  = (vehicles, feed_records(system_data, 'vehicle_types'), self.spatial)
+            if all(new is old for new, old in zip(sources, self._vehicle_sources)):
+                return False
+
+            self.vehicles = join_vehicles(*sources) if vehicles is not None else {}
+            self.has_vehicles = vehicles is not None
+            self._vehicle_sources = sources
+            return True
+
+    # =============================================================================
+    def clear(self) -> None:
+        """Discard all station records."""
+        with self._lock:
+            self.info, self.status, self.vehicles = {}, {}, {}
+            self.has_vehicles = False
+            self.spatial = GridIndex()
+            self._info_source = self._status_source = None
+            self._vehicle_sources = (None, None, None)
+            self.info_version += 1
+            self.status_version += 1
+
+    # =============================================================================
+    def get(self, station_id: str) -> Optional[StationView]:
+        """Return the merged record for a station.
+
+        Args:
+            station_id (str): The GBFS station id.
+
+        Returns:
+            StationView: The merged station record, or None if the station is unknown.
+        """
+        station_id = str(station_id)
+        info, status = self.info.get(station_id), self.status.get(station_id)
+        if info is None and status is None:
+            return None
+        return StationView(info, status)
+
+    # =============================================================================
+    def memory_report(self) -> dict:
+        """Estimate the memory held by the station records (see `records.footprint()`).
+
+        Returns:
+            dict: Per-feed record counts and sizes, plus the size of the indexes themselves.
+        """
+        return {
+            'station_information': footprint(self.info.values()),
+            'station_status': footprint(self.status.values()),
+            'index_bytes': sys.getsizeof(self.info) + sys.getsizeof(self.status),
+        }
+
+    # =============================================================================
+    def menu_items(self, search: str = "", selected: str = "") -> list[tuple[str, str]]:
+        """Return the sorted (station_id, name) list for station menus.
+
+        The full list is built once per `station_information` change. When a search string is supplied, only stations
+        whose names contain it (ignoring case) are returned; the currently selected station is always kept so that an
+        existing selection isn't lost.
+
+        Args:
+            search (str): Optional text to filter station names by.
+            selected (str): The station id currently selected in the menu.
+
+        Returns:
+            list: A sorted list of (station_id, name) tuples.
+        """
+        with self._lock:
+            if self._menu_version != self.info_version:
+                self._menu = sorted(
+                    [(station_id, str(info.get('name', station_id))) for station_id, info in self.info.items()],
+                    key=lambda x: x[-1]
+                )
+                self._menu_version = self.info_version
+            menu = self._menu
+
+        search = search.strip().casefold()
+        if not search:
+            return menu
+        return [item for item in menu if search in item[1].casefold() or item[0] == selected]
+
+    # =============================================================================
+    def nearest_menu_items(self, lat: float, lon: float, count: int, selected: str = "") -> list[tuple[str, str]]:
+        """Return the (station_id, name) menu items for the stations nearest a point, closest first.
+
+        Args:
+            lat (float): The latitude of the point.
+            lon (float): The longitude of the point.
+            count (int): The number of stations to list.
+            selected (str): The station id currently selected in the menu (always kept).
+
+        Returns:
+            list: A list of (station_id, "name (distance)") tuples.
+        """
+        items = []
+        for distance, station_id in self.spatial.nearest(lat, lon, count):
+            items.append((station_id, f"{self.info[station_id].get('name', station_id)} ({distance:,.0f} m)"))
+        if selected and selected in self.info and selected not in {item[0] for item in items}:
+            items.append((selected, str(self.info[selected].get('name', selected))))
+        return items
+
+    # =============================================================================
+    def area_totals(self, lat: float, lon: float, radius: float) -> dict:
+        """Return the bikes and docks available at stations within a radius of a point.
+
+        Args:
+            lat (float): The latitude of the point.
+            lon (float): The longitude of the point.
+            radius (float): The radius in meters.
+
+        Returns:
+            dict: Station count, bike/e-bike/dock totals and the nearest station in the area.
+        """
+        totals = {'station_count': 0, 'bikes': 0, 'ebikes': 0, 'docks': 0, 'nearest_id': "", 'nearest_distance': 0}
+        for distance, station_id in self.spatial.within(lat, lon, radius):
+            status = self.status.get(station_id, {})
+            if not status.get('is_renting', True):
+                continue
+            if not totals['nearest_id']:
+                totals['nearest_id'], totals['nearest_distance'] = station_id, round(distance)
+            totals['station_count'] += 1
+            for total, key in (('bikes', 'num_bikes_available'), ('ebikes', 'num_ebikes_available'),
+                               ('docks', 'num_docks_available')):
+                try:
+                    totals[total] += int(status.get(key, 0))
+                except (TypeError, ValueError):
+                    pass
+        return totals
+
+    # =============================================================================
+    def __len__(self) -> int:
+        return len(self.info.keys() | self.status.keys())
@@ -0,0 +1,155 @@
+"""
+Bike sharing systems
+
+The systems.py module holds the data pipeline for a single bike sharing system. Each `BikeSystem` owns its feed
+fetcher (and with it the system's auto-discovery document, feed TTL schedule, conditional GET cache and circuit
+breaker), its station store and the most recent data set. Devices can report on different systems, so the plugin keeps
+one `BikeSystem` per system in use; systems are refreshed independently (and concurrently), and each system is
+downloaded once per refresh no matter how many devices use it.
+"""
+
+# ================================== IMPORTS ==================================
+
+# Built-in modules
+import logging
+import threading
+from typing import Optional
+
+# Third-party modules
+import httpx  # httpx is automatically installed by the Indigo installer
+
+# My modules
+from aggregates import compute_system_stats, region_names  # noqa
+from feeds import FeedFetcher  # noqa
+from stations import StationStore  # noqa
+from timing import PhaseTimings  # noqa
+
+
+# =============================================================================
+class BikeSystem:
+    """One bike sharing system's feeds, station store and current data set.
+
+    `lock` is held while the system is being refreshed so that a refresh started from a dialog (e.g., to list the
+    stations of a newly selected system) can't overlap one started by the refresh coordinator.
+    """
+    def __init__(self, url: str, lang: str = "en", logger: Optional[logging.Logger] = None,
+                 timings: Optional[PhaseTimings] = None, http2: bool = False):
+        """System initialization.
+
+        Args:
+            url (str): The system's auto-discovery (`gbfs.json`) URL.
+            lang (str): The preferred feed language.
+            logger (logging.Logger): The plugin logger.
+            timings (PhaseTimings): Where the refresh phase timings are recorded.
+            http2 (bool): If True, the system's HTTP client uses HTTP/2.
+        """
+        self.url     = url
+        self.lang    = lang
+        self.logger  = logger or logging.getLogger("Plugin")
+        self.timings = timings or PhaseTimings()
+        self.fetcher = FeedFetcher(logger=self.logger, timings=self.timings)
+        self.fetcher.http2 = http2
+        self.stations      = StationStore()
+        self.system_data   = {}
+        self.data_stale    = False
+        self.comm_failures = 0
+        self.system_stats  = {}
+        self.lock          = threading.Lock()
+
+    # =============================================================================
+    @property
+    def source(self) -> str:
+        """The key that identifies the system (`<auto-discovery url>|<language>`)."""
+        return f"{self.url}|{self.lang}"
+
+    # =============================================================================
+    def close(self) -> None:
+        """Close the system's HTTP client."""
+        self.fetcher.close()
+
+    # =============================================================================
+    def refresh(self, wanted: set, force: bool = False, honor_ttl: bool = True) -> bool:
+        """Download the system's due feeds and swap in the new data set.
+
+        Feeds are downloaded concurrently; if an individual feed can't be retrieved, the remaining feeds are kept and
+        the last good copy of the failed feed (if there is one) is carried forward. If the service can't be reached at
+        all, the last good data continues to be served and is marked as stale. The new data set is built and indexed in
+        full before it replaces `self.system_data`, so readers never see a partially downloaded data set.
+
+        Args:
+            wanted (set): The names of the feeds to download (see `feeds.required_feeds()`).
+            force (bool): If True, download every feed regardless of its TTL.
+            honor_ttl (bool): If False, every feed is downloaded on every refresh.
+
+        Returns:
+            bool: True if the station status changed.
+        """
+        self.logger.debug("Auto-discovery URL: %s" % self.url)
+        try:
+            feeds = self.fetcher.discover(self.url, self.lang)
+
+        # ======================== Communication Error Handling ========================
+        except (httpx.HTTPError, ValueError, KeyError) as err:
+            self.comm_failures += 1
+            if self.comm_failures == 1:
+                self.logger.warning("Communication error (%s). Will try again later." % err)
+            else:
+                self.logger.debug("Communication error (%s, %s failures in a row)." % (err, self.comm_failures))
+
+            # Keep serving the last good data (marked as stale).
+            if self.system_data:
+                self.data_stale = True
+            return False
+
+        if self.comm_failures:
+            self.logger.info("Communication restored after %s failed attempt(s)." % self.comm_failures)
+            self.comm_failures = 0
+
+        # Only the feeds needed by the enabled features (plus any extra feeds the user asked for) are downloaded.
+        feeds     = {name: url for name, url in feeds.items() if name in wanted}
+        due_feeds = self.fetcher.due(feeds, force=force or not honor_ttl)
+        self.logger.debug("Feeds due: %s" % (", ".join(sorted(due_feeds)) or "none"))
+
+        result = self.fetcher.fetch(due_feeds)
+        system_data = {name: self.system_data[name] for name in feeds
+                       if name in self.system_data and name not in result.data}
+        system_data.update(result.data)
+        for name in result.errors:
+            if name in system_data:
+                self.logger.debug("Using previous %s data." % name)
+
+        status_version = self.stations.status_version
+        with self.timings.phase('index'):
+            self.stations.update(system_data)
+        with self.timings.phase('vehicles'):
+            self.stations.update_vehicles(system_data)
+        changed = self.stations.status_version != status_version
+        if changed:
+            with self.timings.phase('aggregates'):
+                self.system_stats = compute_system_stats(
+                    self.stations.status, self.stations.info, region_names(system_data)
+                )
+
+        # Swap in the new data set.
+        self.system_data = system_data
+        if 'station_status' in result.data:
+            self.data_stale = False
+        elif 'station_status' in result.errors:
+            self.data_stale = True
+        self.logger.debug("HTTP client stats: %s" % self.fetcher.stats())
+        return changed
+
+    # =============================================================================
+    def restore(self, feeds: dict) -> None:
+        """Load a saved data set (e.g., from the warm-start snapshot), marked as stale until the next download.
+
+        Args:
+            feeds (dict): A dict of {feed name: payload}.
+        """
+        self.system_data = feeds
+        self.data_stale  = True
+        self.stations.update(self.system_data)
+        self.stations.update_vehicles(self.system_data)
+        self.system_stats = compute_system_stats(
+            self.stations.status, self.stations.info, region_names(self.system_data)
+        )
@@ -0,0 +1,122 @@
+"""
+Refresh phase timings
+
+The timing.py module records how long each phase of a refresh takes (auto-discovery, each feed's download and decode,
+the station index build, each device's state parsing and server update, and trigger processing). The most recent
+`TIMING_SAMPLES` timings of each phase are kept in a ring buffer and summarized as the median (p50) and 95th percentile
+(p95). Feed phases are recorded from the download threads, so recording is thread-safe.
+"""
+
+# ================================== IMPORTS ==================================
+
+# Built-in modules
+from collections import deque
+from contextlib import contextmanager
+import math
+import threading
+import time
+
+# My modules
+from constants import TIMING_SAMPLES  # noqa
+
+
+# =============================================================================
+def percentile(samples: list, share: float) -> float:
+    """Return the nearest-rank percentile of a sorted list of samples.
+
+    Args:
+        samples (list): The samples, sorted ascending (must not be empty).
+        share (float): The percentile as a share (e.g., 0.95).
+
+    Returns:
+        float: The sample at the percentile.
+    """
+    return samples[min(max(math.ceil(share * len(samples)) - 1, 0), len(samples) - 1)]
+
+
+# =============================================================================
+class PhaseTimings:
+    """Rolling timings for named refresh phases.
+
+    Phase names are plain strings. Feed phases are qualified with the feed name (e.g., `fetch:station_status`).
+    """
+    def __init__(self, samples: int = TIMING_SAMPLES):
+        """Timings initialization.
+
+        Args:
+            samples (int): The number of recent timings kept for each phase.
+        """
+        self.samples = samples
+        self._timings: dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+    # =============================================================================
+    def record(self, phase: str, seconds: float) -> None:
+        """Record one timing for a phase.
+
+        Args:
+            phase (str): The phase name.
+            seconds (float): How long the phase took.
+        """
+        with self._lock:
+            timings = self._timings.get(phase)
+            if timings is None:
+                timings = self._timings[phase] = deque(maxlen=self.samples)
+            timings.append(seconds)
+
+    # =============================================================================
+    @contextmanager
+    def phase(self, phase: str):
+        """Time the body of a `with` block as one run of a phase (recorded even if the block raises).
+
+        Args:
+            phase (str): The phase name.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, time.perf_counter() - start)
+
+    # =============================================================================
+    def clear(self) -> None:
+        """Forget all timings."""
+        with self._lock:
+            self._timings.clear()
+
+    # =============================================================================
+    def summary(self) -> dict:
+        """Summarize each phase's recent timings.
+
+        Returns:
+            dict: A dict of {phase: {'count', 'last_ms', 'p50_ms', 'p95_ms', 'max_ms'}}, sorted by phase name.
+        """
+        with self._lock:
+            timings = {phase: list(values) for phase, values in self._timings.items() if values}
+
+        summary = {}
+        for phase in sorted(timings):
+            values = sorted(timings[phase])
+            summary[phase] = {
+                'count': len(values),
+                'last_ms': round(timings[phase][-1] * 1000, 1),
+                'p50_ms': round(percentile(values, 0.5) * 1000, 1),
+                'p95_ms': round(percentile(values, 0.95) * 1000, 1),
+                'max_ms': round(values[-1] * 1000, 1),
+            }
+        return summary
+
+    # =============================================================================
+    def report(self) -> str:
+        """Format the summary as a table (one phase per line).
+
+        Returns:
+            str: The report.
+        """
+        lines = [f"{'phase':<34} {'count':>6} {'last ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}"]
+        for phase, stats in self.summary().items():
+            lines.append(
+                f"{phase:<34} {stats['count']:>6} {stats['last_ms']:>9} {stats['p50_ms']:>9} {stats['p95_ms']:>9} "
+                f"{stats['max_ms']:>9}"
+            )
+        return "\n".join(lines)
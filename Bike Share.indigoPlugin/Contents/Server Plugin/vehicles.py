@@ -0,0 +1,152 @@
+"""
+Free-floating vehicle totals
+
+The vehicles.py module joins the vehicles in the GBFS `vehicle_status` feed (`free_bike_status` in GBFS v2) to stations
+once per download. A vehicle that reports a `station_id` is counted at that station; a dockless vehicle is assigned to
+the nearest station within `VEHICLE_NEARBY_RADIUS` using the station spatial index, so each vehicle only measures the
+distance to stations in the grid cells around it. The vehicle list is walked once per download no matter how many
+devices there are, and devices read their station's totals in constant time.
+
+Vehicles are sorted into bikes, e-bikes, scooters and other vehicles by their `vehicle_types` entry. Systems that don't
+publish `vehicle_types` only list bicycles; a vehicle with a `current_range_meters` (required for motorized vehicles)
+is counted as an e-bike.
+"""
+
+# ================================== IMPORTS ==================================
+
+# Built-in modules
+from typing import Optional
+
+# My modules
+from constants import FEED_PROJECTIONS, VEHICLE_MIN_RANGE, VEHICLE_NEARBY_RADIUS  # noqa
+from spatial import GridIndex  # noqa
+
+VEHICLE_FEEDS  = ('vehicle_status', 'free_bike_status')  # In order of preference.
+VEHICLE_TOTALS = ('bikes', 'ebikes', 'scooters', 'other', 'ebikes_in_range', 'docked', 'nearby')
+
+
+# =============================================================================
+def feed_records(system_data: dict, feed: str) -> Optional[list]:
+    """Return the record list of a projected GBFS feed (see `FEED_PROJECTIONS`).
+
+    Args:
+        system_data (dict): The downloaded feeds keyed by feed name.
+        feed (str): The feed name (e.g., `vehicle_status`).
+
+    Returns:
+        list: The feed's record list, or None if the feed isn't available.
+    """
+    try:
+        return system_data[feed]['data'][FEED_PROJECTIONS[feed][0]]
+    except (KeyError, TypeError):
+        return None
+
+
+# =============================================================================
+def vehicle_feed(system_data: dict) -> Optional[list]:
+    """Return the vehicle list from `vehicle_status` (or `free_bike_status`), or None if neither is available."""
+    for feed in VEHICLE_FEEDS:
+        vehicles = feed_records(system_data, feed)
+        if vehicles is not None:
+            return vehicles
+    return None
+
+
+# =============================================================================
+def vehicle_kind(vehicle, vehicle_type=None) -> str:
+    """Return the total a vehicle is counted in (`bikes`, `ebikes`, `scooters` or `other`).
+
+    Args:
+        vehicle (Record): The `vehicle_status` record.
+        vehicle_type (Record): The vehicle's `vehicle_types` record, if known.
+
+    Returns:
+        str: The total's key.
+    """
+    if vehicle_type is None:
+        return 'ebikes' if vehicle.get('current_range_meters') is not None else 'bikes'
+
+    form_factor = str(vehicle_type.get('form_factor', "")).lower()
+    propulsion  = str(vehicle_type.get('propulsion_type', "human")).lower()
+    if form_factor in ('bicycle', 'cargo_bicycle'):
+        return 'bikes' if propulsion == 'human' else 'ebikes'
+    if form_factor.startswith('scooter'):
+        return 'scooters'
+    return 'other'
+
+
+# =============================================================================
+def vehicle_range(vehicle, vehicle_type=None) -> Optional[float]:
+    """Return a vehicle's remaining range in meters.
+
+    Uses `current_range_meters`, or estimates the range from `current_fuel_percent` and the vehicle type's
+    `max_range_meters` when the vehicle doesn't report it.
+
+    Args:
+        vehicle (Record): The `vehicle_status` record.
+        vehicle_type (Record): The vehicle's `vehicle_types` record, if known.
+
+    Returns:
+        float: The range in meters, or None if it isn't known.
+    """
+    try:
+        return float(vehicle['current_range_meters'])
+    except (KeyError, TypeError, ValueError):
+        pass
+    try:
+        return float(vehicle['current_fuel_percent']) * float(vehicle_type['max_range_meters'])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+# =============================================================================
+def join_vehicles(vehicles: list, vehicle_types: Optional[list] = None, spatial: Optional[GridIndex] = None,
+                  radius: float = VEHICLE_NEARBY_RADIUS, min_range: float = VEHICLE_MIN_RANGE) -> dict:
+    """Total the available vehicles at (or near) each station in a single pass over the vehicle list.
+
+    Reserved and disabled vehicles aren't counted. Dockless vehicles farther than `radius` from every station aren't
+    counted.
+
+    Args:
+        vehicles (list): The `vehicle_status` (or `free_bike_status`) records.
+        vehicle_types (list): The `vehicle_types` records, if the system publishes them.
+        spatial (GridIndex): The station spatial index used to place dockless vehicles.
+        radius (float): The distance in meters within which a dockless vehicle counts as near a station.
+        min_range (float): The remaining range in meters an e-bike needs to be counted in `ebikes_in_range`.
+
+    Returns:
+        dict: A dict of {station_id: {total: count}} (see `VEHICLE_TOTALS`) for stations with vehicles.
+    """
+    types   = {str(record.get('vehicle_type_id')): record for record in vehicle_types or ()}
+    spatial = spatial or GridIndex()
+    totals  = {}
+    for vehicle in vehicles:
+        if any(vehicle.get(key) in (1, True, "1", "true") for key in ('is_reserved', 'is_disabled')):
+            continue
+
+        station_id = vehicle.get('station_id')
+        docked     = station_id not in (None, "")
+        if docked:
+            station_id = str(station_id)
+        else:
+            try:
+                nearest = spatial.nearest(float(vehicle['lat']), float(vehicle['lon']), max_distance=radius)
+            except (KeyError, TypeError, ValueError):
+                continue
+            if not nearest:
+                continue
+            station_id = nearest[0][1]
+
+        station = totals.get(station_id)
+        if station is None:
+            station = totals[station_id] = dict.fromkeys(VEHICLE_TOTALS, 0)
+
+        vehicle_type = types.get(str(vehicle.get('vehicle_type_id')))
+        kind = vehicle_kind(vehicle, vehicle_type)
+        station[kind] += 1
+        station['docked' if docked else 'nearby'] += 1
+        if kind == 'ebikes':
+            remaining = vehicle_range(vehicle, vehicle_type)
+            if remaining is not None and remaining >= min_range:
+                station['ebikes_in_range'] += 1
+    return totals
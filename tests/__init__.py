@@ -2,6 +2,13 @@
 The purpose of this __init__ files is to allow the `tests` folder to function as a module.
 """
 __all__ = [
+    'benchmark',
+    'test_aggregates',
+    'test_coordinator',
+    'test_feeds',
+    'test_history',
+    'test_spatial',
+    'test_vehicles',
     'test_xml',
     'test_plugin'
 ]
@@ -0,0 +1,21 @@
+"""
+Offline benchmarks for the BikeShare plugin.
+
+Unlike the tests in `test_plugin.py`, the benchmarks don't need an Indigo server. The plugin is loaded against an
+in-process stand-in for the `indigo` module (`indigo_stub.py`) that counts server calls, and downloads its data from a
+local fake GBFS service (`fake_gbfs.py`) that serves synthetic systems of any size.
+
+Run the regression checks with:
+
+    python -m unittest tests.benchmark.test_refresh
+
+or print the full wall time / peak memory / server call report with:
+
+    python -m tests.benchmark
+"""
+__all__ = [
+    'fake_gbfs',
+    'harness',
+    'indigo_stub',
+    'test_refresh',
+]
@@ -0,0 +1,41 @@
+"""
+Print the benchmark report.
+
+    python -m tests.benchmark [--stations 100,1000,5000,20000] [--devices 1,50,500] [--latency 0.0] [--vehicles 0]
+"""
+
+# ================================== IMPORTS ==================================
+
+# Built-in modules
+import argparse
+
+# My modules
+from .harness import run_scenario
+
+
+# =============================================================================
+def main() -> None:
+    """Run each stations x devices scenario and print one line per scenario."""
+    parser = argparse.ArgumentParser(description="BikeShare plugin refresh benchmarks.")
+    parser.add_argument("--stations", default="100,1000,5000,20000")
+    parser.add_argument("--devices", default="1,50,500")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds the fake service waits per request.")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Share of feed requests that fail.")
+    parser.add_argument("--vehicles", type=int, default=0, help="Free-floating vehicles in the fake system.")
+    args = parser.parse_args()
+
+    header = f"{'stations':>8} {'devices':>7} {'cold s':>8} {'warm s':>8} {'peak MB':>8} {'cold IPC':>9} {'warm IPC':>9}"
+    print(header)
+    print("-" * len(header))
+    for stations in (int(value) for value in args.stations.split(",")):
+        for devices in (int(value) for value in args.devices.split(",")):
+            result = run_scenario(stations, devices, latency=args.latency, failure_rate=args.failure_rate,
+                                  vehicles=args.vehicles)
+            print(
+                f"{stations:>8} {devices:>7} {result['cold_s']:>8.3f} {result['warm_s']:>8.3f} "
+                f"{result['peak_bytes'] / 1_048_576:>8.2f} {result['cold_ipc']:>9} {result['warm_ipc']:>9}"
+            )
+
+
+if __name__ == "__main__":
+    main()
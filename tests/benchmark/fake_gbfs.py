@@ -0,0 +1,211 @@
+"""
+Local stand-in for a GBFS bike share service.
+
+`FakeGbfsServer` serves an auto-discovery document and the `station_information`, `station_status` and
+`system_regions` feeds for a synthetic system with a configurable number of stations, plus a `free_bike_status` feed
+when the system has free-floating vehicles (`vehicles`; half docked, half dockless). Each response can be delayed
+(`latency`) and a share of feed requests can be made to fail with `503 Service Unavailable` (`failure_rate`).
+`station_information` carries an `ETag` so conditional requests are answered with `304 Not Modified`, like most
+operators' CDNs.
+"""
+
+# ================================== IMPORTS ==================================
+
+# Built-in modules
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import random
+import threading
+import time
+
+
+# =============================================================================
+class _Handler(BaseHTTPRequestHandler):
+    """Request handler for `FakeGbfsServer`."""
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args) -> None:  # noqa
+        """Silence the default per-request logging."""
+
+    # =============================================================================
+    def do_GET(self) -> None:  # noqa
+        """Serve the requested GBFS document."""
+        fake = self.server.fake
+        fake.count(self.path)
+        if fake.latency:
+            time.sleep(fake.latency)
+
+        feed = self.path.strip("/").removesuffix(".json")
+        if feed != "gbfs" and fake.rng.random() < fake.failure_rate:
+            self._send(503, b"")
+            return
+
+        if feed == "station_information" and self.headers.get("If-None-Match") == fake.info_etag:
+            self._send(304, b"", {'ETag': fake.info_etag})
+            return
+
+        body = fake.document(feed)
+        if body is None:
+            self._send(404, b"")
+            return
+
+        headers = {'Content-Type': "application/json"}
+        if feed == "station_information":
+            headers['ETag'] = fake.info_etag
+        self._send(200, body, headers)
+
+    # =============================================================================
+    def _send(self, code: int, body: bytes, headers: dict = None) -> None:
+        """Write a response."""
+        self.send_response(code)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+# =============================================================================
+class FakeGbfsServer:
+    """Synthetic GBFS system served over HTTP on localhost.
+
+    Use as a context manager; `url` is the system's auto-discovery URL.
+    """
+    def __init__(self, stations: int = 1000, latency: float = 0.0, failure_rate: float = 0.0, churn: float = 0.2,
+                 seed: int = 1, vehicles: int = 0):
+        """Server initialization.
+
+        Args:
+            stations (int): The number of stations in the system.
+            latency (float): Seconds to wait before answering each request.
+            failure_rate (float): The share (0-1) of feed requests answered with `503 Service Unavailable`.
+            churn (float): The share (0-1) of stations whose availability changes between `station_status` requests.
+            seed (int): Seed for the synthetic data.
+            vehicles (int): The number of free-floating vehicles (no `free_bike_status` feed if 0).
+        """
+        self.stations     = stations
+        self.latency      = latency
+        self.failure_rate = failure_rate
+        self.churn        = churn
+        self.vehicles     = vehicles
+        self.rng          = random.Random(seed)
+        self.requests: dict = {}
+        self.info_etag    = f'"info-{stations}-{seed}"'
+
+        self._lock   = threading.Lock()
+        self._server = None
+        self._info   = None
+        self._bikes  = [self.rng.randint(0, 15) for _ in range(stations)]
+
+    # =============================================================================
+    def __enter__(self) -> "FakeGbfsServer":
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.fake = self
+        threading.Thread(target=self._server.serve_forever, name="fake-gbfs", daemon=True).start()
+        return self
+
+    # =============================================================================
+    def __exit__(self, *args) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    # =============================================================================
+    @property
+    def url(self) -> str:
+        """The auto-discovery URL."""
+        return f"http://127.0.0.1:{self._server.server_address[1]}/gbfs.json"
+
+    # =============================================================================
+    def count(self, path: str) -> None:
+        """Count a request by path."""
+        with self._lock:
+            self.requests[path] = self.requests.get(path, 0) + 1
+
+    # =============================================================================
+    def document(self, feed: str):
+        """Return the encoded document for a feed (or None if the feed doesn't exist)."""
+        now  = int(time.time())
+        base = self.url.rsplit("/", 1)[0]
+        if feed == "gbfs":
+            names = ("system_information", "station_information", "station_status", "system_regions")
+            names += ("free_bike_status",) if self.vehicles else ()
+            body  = {'ttl': 60, 'last_updated': now, 'version': "2.3",
+                     'data': {'en': {'feeds': [{'name': name, 'url': f"{base}/{name}.json"} for name in names]}}}
+        elif feed == "system_information":
+            body = {'ttl': 86400, 'last_updated': now, 'version': "2.3", 'data': {'system_id': "fake", 'name': "Fake"}}
+        elif feed == "station_information":
+            if self._info is None:
+                self._info = json.dumps(self._station_information(now)).encode()
+            return self._info
+        elif feed == "station_status":
+            body = self._station_status(now)
+        elif feed == "free_bike_status" and self.vehicles:
+            body = self._free_bike_status(now)
+        elif feed == "system_regions":
+            body = {'ttl': 86400, 'last_updated': now, 'version': "2.3",
+                    'data': {'regions': [{'region_id': str(r), 'name': f"Region {r}"} for r in range(10)]}}
+        else:
+            return None
+        return json.dumps(body).encode()
+
+    # =============================================================================
+    def _station_information(self, now: int) -> dict:
+        """Build the `station_information` document (stations on a grid around lower Manhattan)."""
+        side = max(int(self.stations ** 0.5), 1)
+        stations = []
+        for i in range(self.stations):
+            stations.append({
+                'station_id': f"st-{i}",
+                'name': f"Station {i} & {i % 97} Street",
+                'short_name': f"S{i}",
+                'lat': 40.70 + (i // side) * 0.002,
+                'lon': -74.02 + (i % side) * 0.002,
+                'capacity': 20,
+                'region_id': str(i % 10),
+                'rental_methods': ["KEY", "CREDITCARD"],
+                'rental_uris': {'android': f"https://fake/android/{i}", 'ios': f"https://fake/ios/{i}"},
+            })
+        return {'ttl': 86400, 'last_updated': now, 'version': "2.3", 'data': {'stations': stations}}
+
+    # =============================================================================
+    def _station_status(self, now: int) -> dict:
+        """Build the `station_status` document, changing `churn` of the stations since the last request."""
+        with self._lock:
+            for i in self.rng.sample(range(self.stations), int(self.stations * self.churn)):
+                self._bikes[i] = self.rng.randint(0, 15)
+            bikes = list(self._bikes)
+
+        stations = []
+        for i, count in enumerate(bikes):
+            stations.append({
+                'station_id': f"st-{i}",
+                'num_bikes_available': count,
+                'num_ebikes_available': count // 3,
+                'num_bikes_disabled': 0,
+                'num_docks_available': 20 - count,
+                'num_docks_disabled': 0,
+                'is_installed': 1,
+                'is_renting': 1,
+                'is_returning': 1,
+                'last_reported': now - i % 60,
+                'vehicle_types_available': [{'vehicle_type_id': "bike", 'count': count}],
+            })
+        return {'ttl': 10, 'last_updated': now, 'version': "2.3", 'data': {'stations': stations}}
+
+    # =============================================================================
+    def _free_bike_status(self, now: int) -> dict:
+        """Build the `free_bike_status` document (even-numbered vehicles are docked, the rest are scattered)."""
+        side  = max(int(self.stations ** 0.5), 1)
+        bikes = []
+        for i in range(self.vehicles):
+            bike = {'bike_id': f"bk-{i}", 'is_reserved': i % 50 == 0, 'is_disabled': False}
+            if i % 2 == 0:
+                bike['station_id'] = f"st-{self.rng.randrange(self.stations)}"
+            else:
+                bike['lat'] = 40.70 + self.rng.random() * (self.stations // side) * 0.002
+                bike['lon'] = -74.02 + self.rng.random() * side * 0.002
+            if i % 3 == 0:
+                bike['current_range_meters'] = self.rng.randint(0, 40000)
+            bikes.append(bike)
+        return {'ttl': 10, 'last_updated': now, 'version': "2.3", 'data': {'bikes': bikes}}
@@ -0,0 +1,147 @@
+"""
+Benchmark harness.
+
+Loads the plugin against the `indigo` stand-in, points it at a `FakeGbfsServer` and measures refreshes. A refresh is
+measured by calling `Plugin.perform_refresh()` directly (the work the refresh coordinator runs for each batch), so the
+numbers don't include the coordinator's merge window.
+"""
+
+# ================================== IMPORTS ==================================
+
+# Built-in modules
+import logging
+import time
+import tracemalloc
+
+# My modules
+from . import indigo_stub
+from .fake_gbfs import FakeGbfsServer
+
+indigo = indigo_stub.install()
+
+
+# =============================================================================
+def load_plugin_module():
+    """Import the plugin module.
+
+    Raises:
+        ImportError: If the plugin can't be imported against the stand-ins (e.g., a third-party module is missing).
+
+    Returns:
+        module: The plugin module.
+    """
+    try:
+        import plugin  # noqa
+        return plugin
+    except ImportError as err:
+        raise ImportError(f"The plugin can't be imported against the indigo stand-in ({err}).") from err
+
+
+# =============================================================================
+def make_plugin(url: str, **prefs):
+    """Create a plugin instance for the fake system, ready to refresh.
+
+    Args:
+        url (str): The auto-discovery URL.
+        **prefs: Plugin preference overrides.
+
+    Returns:
+        plugin.Plugin: The plugin instance.
+    """
+    plugin = load_plugin_module()
+    from plugin_defaults import kDefaultPluginPrefs  # noqa
+
+    logging.getLogger("Plugin").setLevel(logging.WARNING)
+    plugin_prefs = dict(kDefaultPluginPrefs, bike_system=url, **prefs)
+    instance = plugin.Plugin("com.fogbert.indigoplugin.bikeShare", "Bike Share", "2025.3.0", plugin_prefs)
+    instance.open_for_business = True
+    return instance
+
+
+# =============================================================================
+def add_devices(count: int, stations: int, vehicle_states: bool = False) -> list:
+    """Create station devices spread evenly across the system.
+
+    Args:
+        count (int): The number of devices.
+        stations (int): The number of stations in the system.
+        vehicle_states (bool): If True, the devices report free-floating vehicles (the `vehicleStates` option).
+
+    Returns:
+        list: The devices.
+    """
+    stride = max(stations // max(count, 1), 1)
+    return [
+        indigo.devices.add(indigo.Device(
+            f"Station {i}", "shareDock", {'stationName': f"st-{(i * stride) % stations}", 'vehicleStates': vehicle_states}
+        ))
+        for i in range(count)
+    ]
+
+
+# =============================================================================
+def measure_refresh(plugin, force: bool = True, trace_memory: bool = False) -> dict:
+    """Run one refresh and measure it.
+
+    Args:
+        plugin (plugin.Plugin): The plugin instance.
+        force (bool): Passed to `perform_refresh()`.
+        trace_memory (bool): If True, measure peak memory with `tracemalloc` (which slows the refresh down, so the
+                             wall time of a traced refresh shouldn't be compared with untraced ones).
+
+    Returns:
+        dict: Wall time (seconds), peak memory (bytes, if traced), and server calls made (total and by call).
+    """
+    indigo_stub.CALLS.clear()
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    plugin.perform_refresh(all_devices=True, force=force)
+    wall = time.perf_counter() - start
+    peak = None
+    if trace_memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return {'wall': wall, 'peak': peak, 'ipc': indigo_stub.ipc_calls(), 'calls': dict(indigo_stub.CALLS)}
+
+
+# =============================================================================
+def run_scenario(stations: int, devices: int, latency: float = 0.0, failure_rate: float = 0.0,
+                 vehicles: int = 0) -> dict:
+    """Measure a cold refresh, a warm refresh and the peak memory of a cold refresh.
+
+    Args:
+        stations (int): The number of stations in the fake system.
+        devices (int): The number of station devices.
+        latency (float): Seconds the fake service waits before answering each request.
+        failure_rate (float): The share of feed requests the fake service fails.
+        vehicles (int): The number of free-floating vehicles in the fake system.
+
+    Returns:
+        dict: The scenario results.
+    """
+    indigo_stub.reset()
+    with FakeGbfsServer(stations=stations, latency=latency, failure_rate=failure_rate, vehicles=vehicles) as fake:
+        add_devices(devices, stations, vehicle_states=bool(vehicles))
+
+        plugin = make_plugin(fake.url)
+        cold = measure_refresh(plugin)
+        warm = measure_refresh(plugin)
+        plugin.shutdown()
+
+        plugin = make_plugin(fake.url)
+        traced = measure_refresh(plugin, trace_memory=True)
+        plugin.shutdown()
+
+    return {
+        'stations': stations,
+        'devices': devices,
+        'vehicles': vehicles,
+        'cold_s': cold['wall'],
+        'warm_s': warm['wall'],
+        'peak_bytes': traced['peak'],
+        'cold_ipc': cold['ipc'],
+        'warm_ipc': warm['ipc'],
+        'cold_calls': cold['calls'],
+        'warm_calls': warm['calls'],
+    }
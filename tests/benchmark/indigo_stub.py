@@ -0,0 +1,259 @@
+"""
+In-process stand-in for the `indigo` module.
+
+Provides just enough of the Indigo plugin API for the plugin to be loaded and refreshed outside of Indigo. Every call
+that would cross the plugin/server boundary (IPC) is counted in `CALLS`. Device states are seeded from the plugin's
+`Devices.xml` so devices behave like freshly created Indigo devices.
+
+`install()` also registers a stand-in for the author's `DLFramework` package. Call `install()` before importing the
+plugin.
+"""
+
+# ================================== IMPORTS ==================================
+
+# Built-in modules
+from collections import Counter
+import datetime as dt
+import logging
+import os
+import sys
+import tempfile
+import time
+import types
+import xml.etree.ElementTree as ET
+
+SERVER_PLUGIN_DIR_PATH = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "../../Bike Share.indigoPlugin/Contents/Server Plugin")
+)
+
+CALLS = Counter()
+_DATA_FOLDER = tempfile.mkdtemp(prefix="bikeshare-bench-")
+
+
+# =============================================================================
+def ipc_calls() -> int:
+    """Return the total number of counted server calls."""
+    return sum(CALLS.values())
+
+
+# =============================================================================
+def _state_defaults() -> dict:
+    """Read the default value of each device type's states from Devices.xml."""
+    defaults = {}
+    root = ET.parse(os.path.join(SERVER_PLUGIN_DIR_PATH, "Devices.xml")).getroot()
+    for device in root.iter("Device"):
+        states = {}
+        for state in device.iter("State"):
+            value_type = (state.findtext("ValueType") or "").strip()
+            if value_type != "Separator":
+                states[state.get("id")] = {'Integer': 0, 'Float': 0.0, 'Boolean': False}.get(value_type, "")
+        defaults[device.get("id")] = states
+    return defaults
+
+
+_STATE_DEFAULTS = _state_defaults()
+
+
+# =============================================================================
+class Dict(dict):
+    """Stand-in for `indigo.Dict`."""
+
+
+# =============================================================================
+class kStateImageSel:  # noqa
+    """Stand-in for `indigo.kStateImageSel`."""
+    SensorOn  = "SensorOn"
+    SensorOff = "SensorOff"
+    Error     = "Error"
+
+
+# =============================================================================
+class Device:
+    """Stand-in for a plugin device."""
+    _next_id = 1000
+
+    def __init__(self, name: str, device_type_id: str = "shareDock", props: dict = None):
+        Device._next_id += 1
+        self.id            = Device._next_id
+        self.name          = name
+        self.deviceTypeId  = device_type_id
+        self.pluginProps   = Dict(props or {})
+        self.states        = dict(_STATE_DEFAULTS.get(device_type_id, {}))
+        self.enabled       = True
+        self.configured    = True
+        self.errorState    = ""
+        self.lastChanged   = dt.datetime(2000, 1, 1)
+        self.displayStateImageSel = None
+
+    def updateStateOnServer(self, key, value=None, uiValue=None, **kwargs):  # noqa
+        CALLS['updateStateOnServer'] += 1
+        self.states[key] = value
+        self.lastChanged = dt.datetime.now()
+
+    def updateStatesOnServer(self, states_list):  # noqa
+        CALLS['updateStatesOnServer'] += 1
+        for state in states_list:
+            self.states[state['key']] = state['value']
+        self.lastChanged = dt.datetime.now()
+
+    def updateStateImageOnServer(self, selector):  # noqa
+        CALLS['updateStateImageOnServer'] += 1
+        self.displayStateImageSel = selector
+
+    def setErrorStateOnServer(self, error):  # noqa
+        CALLS['setErrorStateOnServer'] += 1
+        self.errorState = error
+
+    def stateListOrDisplayStateIdChanged(self):  # noqa
+        CALLS['stateListOrDisplayStateIdChanged'] += 1
+
+    def replacePluginPropsOnServer(self, props):  # noqa
+        CALLS['replacePluginPropsOnServer'] += 1
+        self.pluginProps = Dict(props)
+
+
+# =============================================================================
+class _DeviceList(dict):
+    """Stand-in for `indigo.devices`."""
+    def iter(self, filter=None):  # noqa
+        CALLS['devices.iter'] += 1
+        return iter(list(self.values()))
+
+    def add(self, dev: Device) -> Device:
+        """Add a device (test helper)."""
+        self[dev.id] = dev
+        return dev
+
+
+devices = _DeviceList()
+
+
+# =============================================================================
+class _Server:
+    """Stand-in for `indigo.server`."""
+    version    = "2024.2.0"
+    apiVersion = "3.6"
+
+    @staticmethod
+    def log(message, **kwargs):
+        CALLS['server.log'] += 1
+
+    @staticmethod
+    def getInstallFolderPath():  # noqa
+        return _DATA_FOLDER
+
+    @staticmethod
+    def getLogsFolderPath(**kwargs):  # noqa
+        return _DATA_FOLDER
+
+    @staticmethod
+    def getLatitudeAndLongitude():  # noqa
+        return 40.71, -74.0
+
+    @staticmethod
+    def getPlugin(plugin_id):  # noqa
+        return None
+
+
+server = _Server()
+
+
+# =============================================================================
+class _TriggerApi:
+    """Stand-in for `indigo.trigger`."""
+    @staticmethod
+    def execute(trigger_id):
+        CALLS['trigger.execute'] += 1
+
+
+trigger = _TriggerApi()
+
+
+# =============================================================================
+class actionGroup:  # noqa
+    """Stand-in for `indigo.actionGroup`."""
+
+
+# =============================================================================
+class Trigger:
+    """Stand-in for `indigo.Trigger`."""
+
+
+# =============================================================================
+class PluginBase:
+    """Stand-in for `indigo.PluginBase`."""
+    class StopThread(Exception):
+        """Raised by `sleep()` when the plugin is stopping."""
+
+    def __init__(self, plugin_id, plugin_display_name, plugin_version, plugin_prefs):
+        self.pluginId          = plugin_id
+        self.pluginDisplayName = plugin_display_name
+        self.pluginVersion     = plugin_version
+        self.pluginPrefs       = Dict(plugin_prefs or {})
+        self.logger            = logging.getLogger("Plugin")
+        self.plugin_file_handler = logging.NullHandler()
+        self.indigo_log_handler  = logging.NullHandler()
+        self.debug = False
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+    def __del__(self):
+        pass
+
+
+# =============================================================================
+class Fogbert:
+    """Stand-in for `DLFramework.Fogbert`."""
+    def __init__(self, plugin):
+        self.plugin = plugin
+
+    def audit_server_version(self, min_ver: int = 0) -> None:
+        pass
+
+    def pluginEnvironment(self) -> None:  # noqa
+        pass
+
+
+# =============================================================================
+def _install_dlframework() -> None:
+    """Register stand-ins for the `DLFramework` package and its `DLFramework` module.
+
+    The plugin's DLFramework folder holds symlinks into the author's machine, so the real framework can't be imported
+    elsewhere. The benchmarks only need the names `plugin.py` reads at import time and in `Plugin.__init__()`.
+    """
+    framework = types.ModuleType("DLFramework.DLFramework")
+    framework.__author__    = "DaveL17"
+    framework.__copyright__ = "Copyright (c) DaveL17"
+    framework.__license__   = "MIT"
+    framework.__build__     = "benchmark"
+    framework.LOG_FORMAT    = "%(asctime)s.%(msecs)03d\t%(levelname)-10s\t%(name)s.%(funcName)-28s %(message)s"
+    framework.Fogbert       = Fogbert
+
+    package = types.ModuleType("DLFramework")
+    package.__path__    = []
+    package.DLFramework = framework
+    sys.modules['DLFramework'] = package
+    sys.modules['DLFramework.DLFramework'] = framework
+
+
+# =============================================================================
+def install() -> types.ModuleType:
+    """Register this module as `indigo` (and a `DLFramework` stand-in) and put the plugin folder on the import path.
+
+    Returns:
+        module: This module.
+    """
+    module = sys.modules[__name__]
+    sys.modules['indigo'] = module
+    _install_dlframework()
+    if SERVER_PLUGIN_DIR_PATH not in sys.path:
+        sys.path.insert(0, SERVER_PLUGIN_DIR_PATH)
+    return module
+
+
+# =============================================================================
+def reset() -> None:
+    """Forget all devices and call counts."""
+    devices.clear()
+    CALLS.clear()
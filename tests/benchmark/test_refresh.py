@@ -0,0 +1,81 @@
+"""
+Refresh performance regression checks.
+
+Thresholds are deliberately generous; they're meant to catch regressions of an order of magnitude (an extra server
+call per device, a quadratic loop, a document held in memory twice), not to measure small changes. Scale the wall time
+thresholds for slow machines with the `BENCH_TIME_SCALE` environment variable.
+"""
+
+# ================================== IMPORTS ==================================
+
+# Built-in modules
+import os
+import unittest
+
+# My modules
+from .harness import load_plugin_module, run_scenario
+
+TIME_SCALE = float(os.getenv("BENCH_TIME_SCALE", "1"))
+
+# Server calls: at most this many per device, plus a fixed allowance (e.g., `indigo.devices.iter()`).
+MAX_COLD_CALLS_PER_DEVICE = 2
+MAX_WARM_CALLS_PER_DEVICE = 1
+FIXED_CALL_ALLOWANCE      = 5
+
+
+# =============================================================================
+class TestRefreshBenchmarks(unittest.TestCase):
+    """Refresh wall time, peak memory and server calls for representative systems."""
+
+    @classmethod
+    def setUpClass(cls):
+        load_plugin_module()
+
+    # =============================================================================
+    def check_scenario(self, stations: int, devices: int, max_cold_seconds: float, max_peak_mb: float,
+                       vehicles: int = 0) -> dict:
+        """Run a scenario and check it against the thresholds."""
+        result = run_scenario(stations, devices, vehicles=vehicles)
+        label  = f"{stations} stations, {devices} devices, {vehicles} vehicles"
+
+        self.assertLessEqual(result['cold_ipc'], devices * MAX_COLD_CALLS_PER_DEVICE + FIXED_CALL_ALLOWANCE,
+                             f"Too many server calls on a cold refresh ({label}): {result['cold_calls']}")
+        self.assertLessEqual(result['warm_ipc'], devices * MAX_WARM_CALLS_PER_DEVICE + FIXED_CALL_ALLOWANCE,
+                             f"Too many server calls on a warm refresh ({label}): {result['warm_calls']}")
+        self.assertLessEqual(result['cold_s'], max_cold_seconds * TIME_SCALE,
+                             f"Cold refresh too slow ({label}): {result['cold_s']:.3f}s")
+        self.assertLessEqual(result['warm_s'], max_cold_seconds * TIME_SCALE,
+                             f"Warm refresh too slow ({label}): {result['warm_s']:.3f}s")
+        self.assertLessEqual(result['peak_bytes'], max_peak_mb * 1_048_576,
+                             f"Peak memory too high ({label}): {result['peak_bytes'] / 1_048_576:.2f} MB")
+        return result
+
+    # =============================================================================
+    def test_small_system(self):
+        """100 stations, 1 device."""
+        self.check_scenario(100, 1, max_cold_seconds=1.0, max_peak_mb=4)
+
+    # =============================================================================
+    def test_medium_system(self):
+        """1,000 stations, 50 devices."""
+        self.check_scenario(1000, 50, max_cold_seconds=2.0, max_peak_mb=20)
+
+    # =============================================================================
+    def test_large_system(self):
+        """5,000 stations, 500 devices."""
+        self.check_scenario(5000, 500, max_cold_seconds=5.0, max_peak_mb=50)
+
+    # =============================================================================
+    def test_free_floating_vehicles(self):
+        """5,000 stations, 500 devices, 20,000 vehicles (joined to stations once per download, not per device)."""
+        self.check_scenario(5000, 500, max_cold_seconds=6.0, max_peak_mb=60, vehicles=20000)
+
+    # =============================================================================
+    def test_warm_refresh_updates_only_changed_states(self):
+        """A warm refresh makes fewer server calls than a cold one (unchanged states aren't re-sent)."""
+        result = run_scenario(1000, 50)
+        self.assertLess(result['warm_ipc'], result['cold_ipc'])
+
+
+if __name__ == "__main__":
+    unittest.main()
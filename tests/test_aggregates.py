@@ -0,0 +1,89 @@
+"""
+Tests for the System Summary aggregate statistics (aggregates.py).
+
+These tests don't need Indigo. When NumPy is installed, the NumPy and `array` code paths are checked against each other.
+"""
+
+import os
+import sys
+import unittest
+
+SERVER_PLUGIN_DIR_PATH = os.path.abspath(
+    os.path.join(
+        os.path.dirname(__file__),
+        "../Bike Share.indigoPlugin/Contents/Server Plugin"
+    )
+)
+sys.path.insert(0, SERVER_PLUGIN_DIR_PATH)
+
+import aggregates  # noqa
+from aggregates import compute_system_stats, region_names  # noqa
+
+STATUS = {
+    '1': {'num_bikes_available': 0, 'num_ebikes_available': 0, 'num_docks_available': 10, 'num_docks_disabled': 2},
+    '2': {'num_bikes_available': 4, 'num_ebikes_available': 1, 'num_docks_available': 0},
+    '3': {'num_bikes_available': "3", 'num_docks_available': "bad"},
+    '4': {'num_bikes_available': 1, 'num_docks_available': 1, 'num_bikes_disabled': 1},
+}
+INFO = {
+    '1': {'region_id': 10},
+    '2': {'region_id': 11},
+    '3': {'region_id': 10},
+    '4': {'region_id': None},
+}
+NAMES = {'10': "Downtown", '11': "Downtown"}
+
+
+# ============================ compute_system_stats ============================
+class TestSystemStats(unittest.TestCase):
+    """System-wide totals and per-region totals."""
+
+    # ============================= test_totals ================================
+    def test_totals(self):
+        """Counts are totalled; missing or malformed counts count as 0."""
+        stats = compute_system_stats(STATUS, INFO, NAMES)
+        self.assertEqual(stats['station_count'], 4)
+        self.assertEqual(stats['total_bikes'], 8)
+        self.assertEqual(stats['total_ebikes'], 1)
+        self.assertEqual(stats['total_docks'], 11)
+        self.assertEqual(stats['total_bikes_disabled'], 1)
+        self.assertEqual(stats['stations_empty_pct'], 25.0)
+        self.assertEqual(stats['stations_full_pct'], 50.0)
+        self.assertEqual(stats['disabled_dock_ratio'], round(2 / 13, 3))
+
+    # ========================= test_regions_by_id =============================
+    def test_regions_by_id(self):
+        """Regions that share a name are totalled separately, keyed by region id."""
+        regions = compute_system_stats(STATUS, INFO, NAMES)['regions']
+        self.assertEqual(regions['10'], {'name': "Downtown", 'stations': 2, 'bikes': 3, 'docks': 10})
+        self.assertEqual(regions['11'], {'name': "Downtown", 'stations': 1, 'bikes': 4, 'docks': 0})
+        self.assertEqual(regions[''], {'name': "Unassigned", 'stations': 1, 'bikes': 1, 'docks': 1})
+
+    # ============================ test_empty ==================================
+    def test_empty(self):
+        """An empty system doesn't divide by zero."""
+        stats = compute_system_stats({}, {})
+        self.assertEqual(stats['station_count'], 0)
+        self.assertEqual(stats['stations_empty_pct'], 0.0)
+        self.assertEqual(stats['regions'], {})
+
+    # ========================= test_without_numpy =============================
+    def test_without_numpy(self):
+        """The `array` fallback gives the same results as NumPy."""
+        expected = compute_system_stats(STATUS, INFO, NAMES)
+        numpy, aggregates.np = aggregates.np, None
+        try:
+            self.assertEqual(compute_system_stats(STATUS, INFO, NAMES), expected)
+        finally:
+            aggregates.np = numpy
+
+    # =========================== test_region_names ===========================
+    def test_region_names(self):
+        """Region names are read from `system_regions`, keyed by string region id."""
+        system_data = {'system_regions': {'data': {'regions': [{'region_id': 10, 'name': "Downtown"}, {'region_id': 12}]}}}
+        self.assertEqual(region_names(system_data), {'10': "Downtown", '12': "12"})
+        self.assertEqual(region_names({}), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+"""
+Tests for the refresh coordinator (coordinator.py).
+
+These tests don't need Indigo; the refresh callable records the batches it's given.
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+import unittest
+
+SERVER_PLUGIN_DIR_PATH = os.path.abspath(
+    os.path.join(
+        os.path.dirname(__file__),
+        "../Bike Share.indigoPlugin/Contents/Server Plugin"
+    )
+)
+sys.path.insert(0, SERVER_PLUGIN_DIR_PATH)
+
+from coordinator import RefreshCoordinator  # noqa
+
+
+# ============================= RefreshCoordinator =============================
+class TestRefreshCoordinator(unittest.TestCase):
+    """Queueing, merging and running refresh requests."""
+
+    # ================================= setUp ==================================
+    def setUp(self):
+        self.batches = []
+        self.coordinator = RefreshCoordinator(self.refresh, window=0.05, max_delay=0.5,
+                                              logger=logging.getLogger("test"))
+        self.coordinator.start()
+
+    # ================================ tearDown ================================
+    def tearDown(self):
+        self.coordinator.stop()
+
+    # ================================ refresh =================================
+    def refresh(self, **batch):
+        """Record a batch."""
+        self.batches.append(batch)
+
+    # ========================= test_requests_are_merged =======================
+    def test_requests_are_merged(self):
+        """Requests that arrive within the merge window run as one batch."""
+        self.coordinator.request({1})
+        self.coordinator.request({2}, force=True)
+        self.coordinator.request({3}, wait=True)
+        self.assertEqual(self.batches, [{'all_devices': False, 'device_ids': {1, 2, 3}, 'force': True}])
+        self.assertEqual((self.coordinator.requests, self.coordinator.batches), (3, 1))
+
+    # ========================= test_all_devices_wins ==========================
+    def test_all_devices_wins(self):
+        """A request for every device makes the whole batch refresh every device."""
+        self.coordinator.request({1})
+        self.coordinator.request(wait=True)
+        self.assertTrue(self.batches[0]['all_devices'])
+
+    # ========================== test_separate_batches =========================
+    def test_separate_batches(self):
+        """Requests that arrive after a batch has run start a new batch."""
+        self.coordinator.request({1}, wait=True)
+        self.coordinator.request({2}, wait=True)
+        self.assertEqual([batch['device_ids'] for batch in self.batches], [{1}, {2}])
+
+    # ========================== test_max_delay ================================
+    def test_max_delay(self):
+        """A steady stream of requests is still run once `max_delay` has passed."""
+        stop_at = time.monotonic() + 1.2
+        while time.monotonic() < stop_at:
+            self.coordinator.request({1})
+            time.sleep(0.01)
+        self.coordinator.request(wait=True)
+        self.assertGreaterEqual(len(self.batches), 2)
+
+    # ========================= test_refresh_error =============================
+    def test_refresh_error(self):
+        """An exception in one batch is logged and doesn't stop later batches."""
+        calls = []
+
+        def refresh(**batch):
+            calls.append(batch)
+            if len(calls) == 1:
+                raise RuntimeError("boom")
+
+        self.coordinator.refresh = refresh
+        with self.assertLogs("test", level="ERROR"):
+            self.coordinator.request({1}, wait=True)
+        self.coordinator.request({2}, wait=True)
+        self.assertEqual(len(calls), 2)
+
+    # ============================ test_running_lock ===========================
+    def test_running_lock(self):
+        """A batch waits while `running` is held outside the coordinator."""
+        with self.coordinator.running:
+            waiter = threading.Thread(target=self.coordinator.request, kwargs={'wait': True})
+            waiter.start()
+            time.sleep(0.2)
+            self.assertEqual(self.batches, [])
+        waiter.join(2)
+        self.assertEqual(len(self.batches), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+"""
+Tests for the per-host circuit breaker (feeds.py).
+
+These tests don't need Indigo or a network connection; times are passed in explicitly.
+"""
+
+import os
+import sys
+import threading
+import time
+import unittest
+
+SERVER_PLUGIN_DIR_PATH = os.path.abspath(
+    os.path.join(
+        os.path.dirname(__file__),
+        "../Bike Share.indigoPlugin/Contents/Server Plugin"
+    )
+)
+sys.path.insert(0, SERVER_PLUGIN_DIR_PATH)
+
+from feeds import CircuitBreaker  # noqa
+
+HOST = "gbfs.example.com"
+
+
+# =============================== CircuitBreaker ===============================
+class TestCircuitBreaker(unittest.TestCase):
+    """Opening, half-open trials and cooldown escalation."""
+
+    # ================================= setUp ==================================
+    def setUp(self):
+        self.breaker = CircuitBreaker(threshold=3, cooldown=60, max_cooldown=1800)
+
+    # ================================= trip ===================================
+    def trip(self, now: float = 0) -> None:
+        """Fail enough requests to open the circuit at `now`."""
+        for _ in range(self.breaker.threshold):
+            self.breaker.record_failure(HOST, now=now)
+
+    # =============================== waiters ==================================
+    def waiters(self, count: int, now: float) -> tuple[list, list]:
+        """Start `count` threads calling `allow()` at `now`; return (threads, results)."""
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(self.breaker.allow(HOST, now=now))) for _ in range(count)
+        ]
+        for thread in threads:
+            thread.start()
+        return threads, results
+
+    # ============================ test_opens ==================================
+    def test_opens(self):
+        """The circuit opens at the threshold and refuses requests until the cooldown has passed."""
+        self.assertEqual(self.breaker.record_failure(HOST, now=0), 0)
+        self.assertEqual(self.breaker.record_failure(HOST, now=0), 0)
+        self.assertEqual(self.breaker.record_failure(HOST, now=0), 60)
+        self.assertFalse(self.breaker.allow(HOST, now=30))
+        self.assertEqual(self.breaker.open_hosts(now=30), {HOST: 30})
+
+    # ================== test_failures_in_the_same_poll_open_once =================
+    def test_failures_in_the_same_poll_open_once(self):
+        """Requests that were in flight when the circuit opened don't escalate the cooldown."""
+        self.trip()
+        for _ in range(5):
+            self.assertEqual(self.breaker.record_failure(HOST, now=1), 0)
+        self.assertEqual(self.breaker.hosts[HOST]['cooldown'], 60)
+        self.assertEqual(self.breaker.open_hosts(now=1), {HOST: 59})
+
+    # ========================== test_half_open_trial ==========================
+    def test_half_open_trial(self):
+        """Once the cooldown has passed, one request is let through and the others wait for it."""
+        self.trip()
+        self.assertTrue(self.breaker.allow(HOST, now=61))
+        threads, results = self.waiters(3, now=61)
+        time.sleep(0.1)
+        self.assertEqual(results, [], "Requests were let through while the trial was running.")
+
+        # The trial and the requests that were waiting on it fail in the same poll: one escalation.
+        self.assertEqual(self.breaker.record_failure(HOST, now=61), 120)
+        for thread in threads:
+            thread.join(2)
+        self.assertEqual(results, [False, False, False])
+        for _ in range(3):
+            self.assertEqual(self.breaker.record_failure(HOST, now=61), 0)
+        self.assertEqual(self.breaker.hosts[HOST]['cooldown'], 120)
+        self.assertEqual(self.breaker.open_hosts(now=61), {HOST: 120})
+
+    # ======================= test_half_open_trial_succeeds ====================
+    def test_half_open_trial_succeeds(self):
+        """A successful trial closes the circuit and releases the waiting requests."""
+        self.trip()
+        self.assertTrue(self.breaker.allow(HOST, now=61))
+        threads, results = self.waiters(2, now=61)
+        self.assertTrue(self.breaker.record_success(HOST))
+        for thread in threads:
+            thread.join(2)
+        self.assertEqual(results, [True, True])
+        self.assertEqual(self.breaker.open_hosts(now=61), {})
+
+    # ============================ test_finish =================================
+    def test_finish(self):
+        """A trial that ends without an outcome hands the trial to the next request."""
+        self.trip()
+        self.assertTrue(self.breaker.allow(HOST, now=61))
+        threads, results = self.waiters(1, now=61)
+        self.breaker.finish(HOST)
+        threads[0].join(2)
+        self.assertEqual(results, [True])
+
+    # ========================= test_max_cooldown ==============================
+    def test_max_cooldown(self):
+        """Each failed trial doubles the cooldown, up to `max_cooldown`."""
+        self.trip()
+        now, cooldowns = 0, []
+        for _ in range(7):
+            now += self.breaker.hosts[HOST]['cooldown'] + 1
+            self.assertTrue(self.breaker.allow(HOST, now=now))
+            cooldowns.append(self.breaker.record_failure(HOST, now=now))
+        self.assertEqual(cooldowns, [120, 240, 480, 960, 1800, 1800, 1800])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+"""
+Tests for the station availability history store (history.py).
+
+These tests don't need Indigo; they run against a temporary SQLite database.
+"""
+
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+SERVER_PLUGIN_DIR_PATH = os.path.abspath(
+    os.path.join(
+        os.path.dirname(__file__),
+        "../Bike Share.indigoPlugin/Contents/Server Plugin"
+    )
+)
+sys.path.insert(0, SERVER_PLUGIN_DIR_PATH)
+
+from constants import HISTORY_DOWNSAMPLE_AGE  # noqa
+from history import HistoryStore  # noqa
+
+NOW      = 1_800_000_000 // 3600 * 3600  # An hour boundary.
+STATIONS = 250
+INTERVAL = 300  # One report per station every five minutes.
+DAYS     = 9
+
+
+# ================================ HistoryStore ================================
+class TestHistoryStore(unittest.TestCase):
+    """Recording, querying and retention of station history."""
+
+    # ================================= setUp ==================================
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.store  = HistoryStore(os.path.join(self.folder.name, "history.sqlite"), retention_days=30)
+
+    # ================================ tearDown ================================
+    def tearDown(self):
+        self.store.close()
+        self.folder.cleanup()
+
+    # ================================ populate ================================
+    def populate(self, days: int = DAYS, stations: int = STATIONS) -> int:
+        """Write `days` of five-minute reports for `stations` stations ending at `NOW` in a single transaction."""
+        rows = [
+            (str(station), ts, station % 7, 0, 3, 0, 0, 1, 1)
+            for ts in range(NOW - days * 86400, NOW, INTERVAL) for station in range(stations)
+        ]
+        with self.store._conn:
+            self.store._conn.execute("BEGIN")
+            self.store._conn.executemany("INSERT INTO station_history VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    # ============================ max_rows_per_hour ===========================
+    def max_rows_per_hour(self, before: int) -> int:
+        """Return the most rows any station has in a single hour before `before`."""
+        row = self.store._conn.execute(
+            "SELECT MAX(n) FROM (SELECT COUNT(*) AS n FROM station_history WHERE ts < ? GROUP BY station_id, ts / 3600)",
+            (before,)
+        ).fetchone()
+        return row[0] or 0
+
+    # =============================== row_count ================================
+    def row_count(self, where: str = "1", params: tuple = ()) -> int:
+        """Return the number of history rows matching a condition."""
+        return self.store._conn.execute(f"SELECT COUNT(*) FROM station_history WHERE {where}", params).fetchone()[0]
+
+    # ========================= test_record_and_query ==========================
+    def test_record_and_query(self):
+        """Rows are written once per report and returned oldest first."""
+        status = {'a': {'last_reported': 100, 'num_bikes_available': 2, 'is_renting': True}}
+        self.assertEqual(self.store.record(status, now=100), 1)
+        self.assertEqual(self.store.record(status, now=160), 0, "A repeated report was written twice.")
+        status['a']['last_reported'] = 200
+        self.store.record(status, now=200)
+
+        rows = self.store.query('a')
+        self.assertEqual([row['ts'] for row in rows], [100, 200])
+        self.assertEqual(rows[0]['bikes'], 2)
+        self.assertEqual(self.store.summary('a')['reports'], 2)
+
+    # ========================== test_summary_empty ============================
+    def test_summary_empty(self):
+        """A station with no reports in the range is summarized with zeros rather than None."""
+        summary = self.store.summary('missing', start=0)
+        self.assertEqual(summary['reports'], 0)
+        self.assertNotIn(None, summary.values())
+
+    # ======================= test_prune_realistic_volume ======================
+    def test_prune_realistic_volume(self):
+        """Pruning ~650,000 rows downsamples the aged-out days to hourly rows and leaves recent rows alone."""
+        written = self.populate()
+        self.assertEqual(written, STATIONS * DAYS * 86400 // INTERVAL)
+
+        cutoff = NOW - HISTORY_DOWNSAMPLE_AGE
+        recent = self.row_count("ts >= ?", (cutoff,))
+        start  = time.perf_counter()
+        self.store.prune(NOW)
+        elapsed = time.perf_counter() - start
+
+        self.assertLess(elapsed, 15, f"Pruning took {elapsed:.1f}s.")
+        self.assertEqual(self.max_rows_per_hour(cutoff), 1)
+        self.assertEqual(self.row_count("ts < ?", (cutoff,)), STATIONS * (DAYS * 86400 - HISTORY_DOWNSAMPLE_AGE) // 3600)
+        self.assertEqual(self.row_count("ts >= ?", (cutoff,)), recent)
+        self.assertEqual(self.store.downsampled_before, cutoff)
+
+    # ======================== test_prune_is_incremental =======================
+    def test_prune_is_incremental(self):
+        """A later pass only downsamples the hour that has aged out since the previous pass."""
+        self.populate(days=8, stations=50)
+        self.store.prune(NOW)
+        before = self.row_count()
+
+        self.store.prune(NOW + 3600)
+        self.assertEqual(self.store.downsampled_before, NOW + 3600 - HISTORY_DOWNSAMPLE_AGE)
+        self.assertEqual(self.max_rows_per_hour(self.store.downsampled_before), 1)
+        self.assertEqual(before - self.row_count(), 50 * (3600 // INTERVAL - 1))
+
+    # ========================== test_prune_expires_rows =======================
+    def test_prune_expires_rows(self):
+        """Rows older than the retention period are deleted."""
+        self.store.retention_days = 2
+        self.populate(days=3, stations=10)
+        self.store.prune(NOW)
+        self.assertEqual(self.row_count("ts < ?", (NOW - 2 * 86400,)), 0)
+        self.assertGreater(self.row_count(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
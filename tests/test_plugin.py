@@ -78,11 +78,12 @@ class TestPluginMenuItems(APIBase):
 
     # ============================ _execute_action =============================
     @staticmethod
-    def _execute_action(action_id: str) -> bool | httpx.Response:
+    def _execute_action(action_id: str, props: dict = None) -> bool | httpx.Response:
         """Post a plugin.executeAction command to the Indigo Web Server API.
 
         Args:
             action_id (str): The Indigo action ID to execute.
+            props (dict): Optional action props.
 
         Returns:
             bool | httpx.Response: The HTTP response, or False if the request failed.
@@ -94,6 +95,8 @@ class TestPluginMenuItems(APIBase):
                 "pluginId": os.getenv("PLUGIN_ID"),
                 "actionId": action_id,
             }
+            if props:
+                message["props"] = props
             url = f"{os.getenv('URL_PREFIX')}/v2/api/command/?api-key={os.getenv('GOOD_API_KEY')}"
             return httpx.post(url, json=message, verify=False)
         except Exception as e:
@@ -127,6 +130,28 @@ class TestPluginMenuItems(APIBase):
         self.assertIsInstance(result, httpx.Response, "Request failed; no response received.")
         self.assertEqual(result.status_code, 200, "The menu item call was not successful.")
 
+    # ========================= test_dump_station_data =========================
+    def test_dump_station_data(self):
+        """Verify that the 'Write Station Data to File' menu item runs successfully."""
+        result = self._execute_action("dump_station_data")
+        self.assertIsInstance(result, httpx.Response, "Request failed; no response received.")
+        self.assertEqual(result.status_code, 200, "The menu item call was not successful.")
+
+    # ========================= test_profile_refresh ===========================
+    def test_profile_refresh(self):
+        """Verify that the 'Profile Refresh' menu item runs successfully."""
+        result = self._execute_action("profile_refresh")
+        self.assertIsInstance(result, httpx.Response, "Request failed; no response received.")
+        self.assertEqual(result.status_code, 200, "The menu item call was not successful.")
+
+    # ======================= test_query_station_history =======================
+    def test_query_station_history(self):
+        """Verify that the hidden 'Query Station History' action runs successfully for a real station."""
+        props  = {'station_id': os.getenv("STATION_NAME", ""), 'hours': 24}
+        result = self._execute_action("query_station_history", props=props)
+        self.assertIsInstance(result, httpx.Response, "Request failed; no response received.")
+        self.assertEqual(result.status_code, 200, "The action call was not successful.")
+
 
 # ================================ Devices =====================================
 class TestDevices(APIBase):
@@ -229,3 +254,21 @@ class TestDevices(APIBase):
         """Verify that a Bike Share Station device can be created and deleted via the Indigo API."""
         my_props = {'stationName': os.getenv("STATION_NAME", "")}
         self.create_and_delete_device("'bs_unit_test_share_dock_device'", 'shareDock', my_props)
+
+    # ================= Bike Share Station Device (Other System) ===============
+    def test_share_dock_device_other_system_creation(self):
+        """Verify that a Bike Share Station device on a system other than the plugin default can be created."""
+        my_props = {'bikeSystem': os.getenv("OTHER_BIKE_SYSTEM", "default"),
+                    'stationName': os.getenv("OTHER_STATION_NAME", "")}
+        self.create_and_delete_device("'bs_unit_test_share_dock_other_system'", 'shareDock', my_props)
+
+    # ======================= System Summary Device ============================
+    def test_system_summary_device_creation(self):
+        """Verify that a System Summary device can be created and deleted via the Indigo API."""
+        self.create_and_delete_device("'bs_unit_test_system_summary_device'", 'systemSummary', {})
+
+    # ======================= Station Area Device ==============================
+    def test_station_area_device_creation(self):
+        """Verify that a Bike Share Area device can be created and deleted via the Indigo API."""
+        my_props = {'latitude': "", 'longitude': "", 'radius': "500"}
+        self.create_and_delete_device("'bs_unit_test_station_area_device'", 'stationArea', my_props)
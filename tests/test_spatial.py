@@ -0,0 +1,100 @@
+"""
+Tests for the station spatial index (spatial.py).
+
+These tests don't need Indigo; the index is checked against a brute-force distance scan.
+"""
+
+import os
+import random
+import sys
+import unittest
+
+SERVER_PLUGIN_DIR_PATH = os.path.abspath(
+    os.path.join(
+        os.path.dirname(__file__),
+        "../Bike Share.indigoPlugin/Contents/Server Plugin"
+    )
+)
+sys.path.insert(0, SERVER_PLUGIN_DIR_PATH)
+
+from spatial import GridIndex, haversine  # noqa
+
+CENTER = (40.7128, -74.0060)  # New York City
+
+
+# ================================= haversine ==================================
+class TestHaversine(unittest.TestCase):
+    """Great-circle distances."""
+
+    # ========================== test_known_distance ===========================
+    def test_known_distance(self):
+        """One degree of latitude is about 111.2 km."""
+        self.assertAlmostEqual(haversine(0, 0, 1, 0), 111_195, delta=10)
+        self.assertEqual(haversine(*CENTER, *CENTER), 0)
+
+
+# ================================= GridIndex ==================================
+class TestGridIndex(unittest.TestCase):
+    """Radius and nearest-N queries."""
+
+    # ================================= setUp ==================================
+    def setUp(self):
+        rng = random.Random(7)
+        self.points = [
+            (f"S{i}", CENTER[0] + rng.uniform(-0.05, 0.05), CENTER[1] + rng.uniform(-0.05, 0.05)) for i in range(500)
+        ]
+        self.index = GridIndex(self.points)
+
+    # ================================ brute ===================================
+    def brute(self, lat: float, lon: float) -> list:
+        """Return (distance, id) for every point, closest first."""
+        return sorted((haversine(lat, lon, p_lat, p_lon), key) for key, p_lat, p_lon in self.points)
+
+    # ============================= test_within ================================
+    def test_within(self):
+        """`within()` returns exactly the points inside the radius, closest first."""
+        for radius in (0, 250, 1000, 3000):
+            expected = [row for row in self.brute(*CENTER) if row[0] <= radius]
+            self.assertEqual(self.index.within(*CENTER, radius), expected, f"radius {radius}")
+
+    # ========================= test_within_large_radius =======================
+    def test_within_large_radius(self):
+        """A radius far larger than the system returns every point without walking every empty cell."""
+        self.assertEqual(len(self.index.within(0, 0, 20_000_000)), len(self.points))
+
+    # ============================= test_nearest ===============================
+    def test_nearest(self):
+        """`nearest()` matches a brute-force scan, including from outside the system."""
+        for lat, lon in (CENTER, (40.76, -74.0), (40.70, -73.9)):
+            self.assertEqual(self.index.nearest(lat, lon, count=5), self.brute(lat, lon)[:5])
+
+    # ======================== test_nearest_high_latitude ======================
+    def test_nearest_high_latitude(self):
+        """Queries nearer the pole than the system's mean latitude (where cells are narrower) find the true nearest."""
+        rng = random.Random(3)
+        for _ in range(200):
+            points = [(f"S{i}", rng.uniform(55, 78), rng.uniform(10, 11)) for i in range(rng.randint(5, 200))]
+            index  = GridIndex(points)
+            lat, lon = rng.uniform(55, 80), rng.uniform(9.8, 11.2)
+            brute = sorted((haversine(lat, lon, p_lat, p_lon), key) for key, p_lat, p_lon in points)
+            self.assertEqual(index.nearest(lat, lon, count=3), brute[:3])
+            self.assertEqual(index.within(lat, lon, 3000), [row for row in brute if row[0] <= 3000])
+
+    # ======================== test_nearest_max_distance =======================
+    def test_nearest_max_distance(self):
+        """Points farther than `max_distance` aren't returned."""
+        self.assertEqual(self.index.nearest(41.5, -74.0, max_distance=1000), [])
+        for distance, _ in self.index.nearest(*CENTER, count=10, max_distance=400):
+            self.assertLessEqual(distance, 400)
+
+    # =========================== test_from_stations ===========================
+    def test_from_stations(self):
+        """Stations without usable coordinates are left out of the index."""
+        index = GridIndex.from_stations({'a': {'lat': 40.7, 'lon': -74.0}, 'b': {'lat': None, 'lon': 1}, 'c': {}})
+        self.assertEqual(len(index), 1)
+        self.assertEqual(GridIndex().within(*CENTER, 1000), [])
+        self.assertEqual(GridIndex().nearest(*CENTER), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+"""
+Tests for the free-floating vehicle totals (vehicles.py).
+
+These tests don't need Indigo.
+"""
+
+import os
+import sys
+import unittest
+
+SERVER_PLUGIN_DIR_PATH = os.path.abspath(
+    os.path.join(
+        os.path.dirname(__file__),
+        "../Bike Share.indigoPlugin/Contents/Server Plugin"
+    )
+)
+sys.path.insert(0, SERVER_PLUGIN_DIR_PATH)
+
+from spatial import GridIndex  # noqa
+from vehicles import join_vehicles, vehicle_feed, vehicle_kind, vehicle_range  # noqa
+
+STATIONS = GridIndex([('A', 40.7000, -74.0000), ('B', 40.7100, -74.0000)])
+TYPES = [
+    {'vehicle_type_id': 'bike', 'form_factor': 'bicycle', 'propulsion_type': 'human'},
+    {'vehicle_type_id': 'ebike', 'form_factor': 'bicycle', 'propulsion_type': 'electric_assist', 'max_range_meters': 40000},
+    {'vehicle_type_id': 'scooter', 'form_factor': 'scooter_standing', 'propulsion_type': 'electric'},
+    {'vehicle_type_id': 'car', 'form_factor': 'car', 'propulsion_type': 'combustion'},
+]
+
+
+# ================================= vehicles ===================================
+class TestVehicles(unittest.TestCase):
+    """Vehicle classification and the station join."""
+
+    # ============================ test_vehicle_kind ===========================
+    def test_vehicle_kind(self):
+        """Vehicles are sorted by their vehicle type, or by range when there are no types."""
+        types = {record['vehicle_type_id']: record for record in TYPES}
+        self.assertEqual([vehicle_kind({}, types[key]) for key in ('bike', 'ebike', 'scooter', 'car')],
+                         ['bikes', 'ebikes', 'scooters', 'other'])
+        self.assertEqual(vehicle_kind({}), 'bikes')
+        self.assertEqual(vehicle_kind({'current_range_meters': 0}), 'ebikes')
+
+    # =========================== test_vehicle_range ===========================
+    def test_vehicle_range(self):
+        """The range is reported directly or estimated from the fuel level."""
+        self.assertEqual(vehicle_range({'current_range_meters': "1500"}), 1500.0)
+        self.assertEqual(vehicle_range({'current_fuel_percent': 0.5}, TYPES[1]), 20000.0)
+        self.assertIsNone(vehicle_range({}))
+
+    # ============================= test_join ==================================
+    def test_join(self):
+        """Docked vehicles count at their station; dockless vehicles at the nearest station within the radius."""
+        vehicles = [
+            {'vehicle_id': '1', 'station_id': 'A', 'vehicle_type_id': 'bike'},
+            {'vehicle_id': '2', 'station_id': 'A', 'vehicle_type_id': 'ebike', 'current_range_meters': 30000},
+            {'vehicle_id': '3', 'lat': 40.7099, 'lon': -74.0001, 'vehicle_type_id': 'scooter'},
+            {'vehicle_id': '4', 'lat': 40.7001, 'lon': -74.0, 'vehicle_type_id': 'ebike', 'current_fuel_percent': 0.01},
+            {'vehicle_id': '5', 'lat': 41.0, 'lon': -74.0, 'vehicle_type_id': 'bike'},   # Too far from any station.
+            {'vehicle_id': '6', 'station_id': 'A', 'is_reserved': True},                 # Reserved.
+            {'vehicle_id': '7', 'station_id': 'B', 'is_disabled': "true"},               # Disabled.
+            {'vehicle_id': '8', 'lat': "bad", 'lon': -74.0},                             # Unusable location.
+        ]
+        totals = join_vehicles(vehicles, TYPES, STATIONS, radius=200, min_range=1000)
+        self.assertEqual(set(totals), {'A', 'B'})
+        self.assertEqual(totals['A'], {
+            'bikes': 1, 'ebikes': 2, 'scooters': 0, 'other': 0, 'ebikes_in_range': 1, 'docked': 2, 'nearby': 1
+        })
+        self.assertEqual(totals['B']['scooters'], 1)
+        self.assertEqual(totals['B']['nearby'], 1)
+
+    # =========================== test_vehicle_feed ============================
+    def test_vehicle_feed(self):
+        """`vehicle_status` is preferred over the GBFS v2 `free_bike_status` feed."""
+        v2 = {'free_bike_status': {'data': {'bikes': [{'bike_id': '1'}]}}}
+        v3 = dict(v2, vehicle_status={'data': {'vehicles': [{'vehicle_id': '2'}]}})
+        self.assertEqual(vehicle_feed(v2), [{'bike_id': '1'}])
+        self.assertEqual(vehicle_feed(v3), [{'vehicle_id': '2'}])
+        self.assertIsNone(vehicle_feed({}))
+
+
+if __name__ == "__main__":
+    unittest.main()